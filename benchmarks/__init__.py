@@ -0,0 +1,3 @@
+"""
+Benchmark suite for the sphinx_doc_demo modules.
+"""
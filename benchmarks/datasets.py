@@ -0,0 +1,89 @@
+"""
+Benchmark Datasets Module
+
+This module generates reproducible synthetic inputs for the benchmark suite. Every
+generator takes an explicit seed, so the same seed always yields the same data on
+every machine and Python version.
+"""
+
+import random
+from array import array
+from typing import List
+
+SEED = 20260108
+
+# Pseudo-words used to build texts; lengths vary so word counting is realistic
+_VOCABULARY = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud "
+    "exercitation ullamco laboris nisi aliquip ex ea commodo consequat"
+).split()
+
+
+def float_values(size: int, seed: int = SEED, low: float = 0.0, high: float = 10000.0) -> array:
+    """
+    Generate uniformly distributed non-negative float64 values.
+
+    Args:
+        size (int): Number of values
+        seed (int): Random seed (default: SEED)
+        low (float): Lower bound (default: 0.0)
+        high (float): Upper bound (default: 10000.0)
+
+    Returns:
+        array: An ``array('d')`` of values
+
+    Example:
+        >>> float_values(3) == float_values(3)
+        True
+    """
+    generator = random.Random(seed)
+    return array("d", [generator.uniform(low, high) for _ in range(size)])
+
+
+def words(count: int, seed: int = SEED) -> List[str]:
+    """
+    Generate a list of pseudo-words.
+
+    Args:
+        count (int): Number of words
+        seed (int): Random seed (default: SEED)
+
+    Returns:
+        List[str]: The words
+    """
+    generator = random.Random(seed)
+    return generator.choices(_VOCABULARY, k=count)
+
+
+def text(word_count: int, seed: int = SEED) -> str:
+    """
+    Generate a space-separated text of pseudo-words.
+
+    Args:
+        word_count (int): Number of words
+        seed (int): Random seed (default: SEED)
+
+    Returns:
+        str: The text
+
+    Example:
+        >>> len(text(1000).split())
+        1000
+    """
+    return " ".join(words(word_count, seed))
+
+
+def digits(length: int, seed: int = SEED) -> str:
+    """
+    Generate a string of decimal digits.
+
+    Args:
+        length (int): Number of digits
+        seed (int): Random seed (default: SEED)
+
+    Returns:
+        str: The digits
+    """
+    generator = random.Random(seed)
+    return "".join(generator.choices("0123456789", k=length))
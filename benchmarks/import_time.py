@@ -0,0 +1,110 @@
+"""
+Import Time Check Module
+
+This module measures how long it takes to import the package and its most used
+modules in fresh interpreters, using ``python -X importtime``, and fails if any
+import exceeds its budget. Short-lived worker processes pay this cost on every start.
+
+Usage::
+
+    python -m benchmarks.import_time [--repeat 5] [--scale 1.0]
+
+The check exits with status 1 if the best of the repeated measurements of any
+module is over budget.
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# Import time budgets, in milliseconds, of the cumulative import of each module
+BUDGETS = {
+    "src": 5.0,
+    "src.unit_conversions": 5.0,
+    "src.unit_conversions.distance_conversions": 40.0,
+    "src.unit_conversions.weight_conversions": 40.0,
+    "src.simple_string": 25.0,
+}
+
+
+def import_time(module: str) -> float:
+    """
+    Measure the cumulative import time of a module in a fresh interpreter.
+
+    Args:
+        module (str): The dotted module name
+
+    Returns:
+        float: The import time in milliseconds, including the modules it imports
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")
+    # Lines look like "import time:  self [us] | cumulative | imported package", with
+    # nested imports indented; the unindented line for the module holds the total
+    for line in completed.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].rstrip() == f" {module}":
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def check(
+    budgets: Dict[str, float], repeat: int = 5, scale: float = 1.0
+) -> List[Dict[str, object]]:
+    """
+    Measure every budgeted module, keeping the best of several runs.
+
+    Args:
+        budgets (Dict[str, float]): Budgets in milliseconds per module name
+        repeat (int): Number of fresh interpreters per module (default: 5)
+        scale (float): Factor applied to every budget, for slower machines (default: 1.0)
+
+    Returns:
+        List[Dict[str, object]]: Module, milliseconds, budget and whether it is within budget
+    """
+    results = []
+    for module, budget in budgets.items():
+        milliseconds = min(import_time(module) for _ in range(repeat))
+        limit = budget * scale
+        results.append(
+            {"module": module, "ms": milliseconds, "budget": limit, "ok": milliseconds <= limit}
+        )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the import time check from the command line.
+
+    Args:
+        argv (List[str], optional): Command-line arguments (default: sys.argv[1:])
+
+    Returns:
+        int: 0 if every import is within budget, 1 otherwise
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget")
+    args = parser.parse_args(argv)
+
+    results = check(BUDGETS, args.repeat, args.scale)
+    for result in results:
+        status = "ok" if result["ok"] else "OVER BUDGET"
+        print(
+            f"{result['module']:<45} {result['ms']:8.2f} ms  "
+            f"(budget {result['budget']:.1f} ms)  {status}"
+        )
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+"""
+Benchmark Suite Module
+
+This module benchmarks every public function of ``simple_arithmetic``,
+``distance_conversions``, ``weight_conversions`` and ``simple_string`` at several
+input sizes, records the results to a JSON baseline and compares later runs
+against it.
+
+Usage::
+
+    python -m benchmarks.suite record [--output benchmarks/baseline.json]
+    python -m benchmarks.suite compare [--baseline benchmarks/baseline.json] [--threshold 0.1]
+
+``compare`` exits with status 1 if any benchmark is slower than the baseline by
+more than the threshold.
+"""
+
+import argparse
+import inspect
+import json
+import platform
+import sys
+import time
+import timeit
+from collections import deque
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from src import simple_string
+from src.unit_conversions import distance_conversions, weight_conversions
+from src.unit_conversions.helper_functions import simple_arithmetic
+
+from . import datasets
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_MIN_TIME = 0.05
+
+# Number of values per numeric benchmark size
+NUMERIC_SIZES = {"scalar": 1, "1e3": 1000, "1e6": 1000000}
+
+# Number of words per text benchmark size
+TEXT_SIZES = {"scalar": 10, "1e3": 1000, "large": 1000000}
+
+
+class Case(NamedTuple):
+    """A single benchmark: a zero-argument callable processing a number of items."""
+
+    name: str
+    run: Callable[[], Any]
+    items: int
+    item: str
+
+
+def public_functions(module: ModuleType) -> List[Callable]:
+    """
+    List the public functions defined in a module.
+
+    Args:
+        module (ModuleType): The module to inspect
+
+    Returns:
+        List[Callable]: Functions not starting with an underscore, in source order
+    """
+    functions = [
+        function
+        for name, function in vars(module).items()
+        if inspect.isfunction(function)
+        and function.__module__ == module.__name__
+        and not name.startswith("_")
+    ]
+    return sorted(functions, key=lambda function: function.__code__.co_firstlineno)
+
+
+def _consume(iterator: Iterator) -> None:
+    """Exhaust an iterator without storing its items."""
+    deque(iterator, maxlen=0)
+
+
+def numeric_cases(size_name: str) -> Iterator[Case]:
+    """
+    Build the benchmarks of the arithmetic and conversion functions for one size.
+
+    Scalar functions are mapped over the dataset; ``*_batch`` functions process it
+    in one call into a preallocated output buffer.
+
+    Args:
+        size_name (str): A key of NUMERIC_SIZES
+
+    Yields:
+        Case: The benchmarks
+    """
+    size = NUMERIC_SIZES[size_name]
+    first = datasets.float_values(size, seed=datasets.SEED)
+    second = datasets.float_values(size, seed=datasets.SEED + 1, low=1.0, high=100.0)
+    exponents = datasets.float_values(size, seed=datasets.SEED + 2, low=0.0, high=3.0)
+    out = datasets.float_values(size)
+    for function in public_functions(simple_arithmetic):
+        name = f"simple_arithmetic.{function.__name__}[{size_name}]"
+        parameters = inspect.signature(function).parameters.values()
+        arity = sum(parameter.default is inspect.Parameter.empty for parameter in parameters)
+        operands = exponents if function.__name__.startswith("power") else second
+        if function.__name__.endswith("_batch"):
+            arguments = (first,) if arity == 1 else (first, operands)
+            yield Case(name, lambda f=function, a=arguments: f(*a, out=out), size, "value")
+        elif arity == 1:
+            yield Case(name, lambda f=function: _consume(map(f, first)), size, "value")
+        else:
+            yield Case(
+                name, lambda f=function, b=operands: _consume(map(f, first, b)), size, "value"
+            )
+    for module in (distance_conversions, weight_conversions):
+        for function in public_functions(module):
+            name = f"{module.__name__.rsplit('.', 1)[-1]}.{function.__name__}[{size_name}]"
+            if function.__name__.endswith("_batch"):
+                yield Case(name, lambda f=function: f(first, out=out), size, "value")
+            else:
+                yield Case(name, lambda f=function: _consume(map(f, first)), size, "value")
+
+
+def _string_arguments(text: str, size: int) -> Dict[str, tuple]:
+    """
+    Build the arguments of every simple_string function for one text.
+
+    Args:
+        text (str): The benchmark text
+        size (int): The number of words in text
+
+    Returns:
+        Dict[str, tuple]: Positional arguments for each function name
+    """
+    middle = len(text) // 2
+    return {
+        "concatenate": (text, text),
+        "to_uppercase": (text,),
+        "to_lowercase": (text.upper(),),
+        "reverse_string": (text,),
+        "count_characters": (text,),
+        "count_words": (text,),
+        "replace_substring": (text, "dolor", "DOLOR"),
+        "split_string": (text, " "),
+        "join_strings": (datasets.words(size), " "),
+        "starts_with": (text, text[:middle]),
+        "ends_with": (text, text[middle:]),
+        "contains_substring": (text, "not present in the text"),
+        "get_substring": (text, len(text) // 4, 3 * len(text) // 4),
+        "is_numeric": (datasets.digits(len(text)),),
+        "is_alphabetic": (text.replace(" ", ""),),
+    }
+
+
+def string_cases(size_name: str) -> Iterator[Case]:
+    """
+    Build the benchmarks of the string functions for one text size.
+
+    Args:
+        size_name (str): A key of TEXT_SIZES
+
+    Yields:
+        Case: The benchmarks
+
+    Raises:
+        KeyError: If a public simple_string function has no benchmark arguments
+    """
+    size = TEXT_SIZES[size_name]
+    text = datasets.text(size)
+    arguments = _string_arguments(text, size)
+    for function in public_functions(simple_string):
+        args = arguments[function.__name__]
+        yield Case(
+            f"simple_string.{function.__name__}[{size_name}]",
+            lambda f=function, a=args: f(*a),
+            len(text),
+            "char",
+        )
+
+
+def measure(case: Case, repeat: int, min_time: float = DEFAULT_MIN_TIME) -> Dict[str, Any]:
+    """
+    Time a benchmark, taking the best of several repeats.
+
+    The number of calls per repeat is grown until one repeat takes at least min_time.
+
+    Args:
+        case (Case): The benchmark
+        repeat (int): Number of timed repeats
+        min_time (float): Minimum duration of a repeat in seconds (default: 0.05)
+
+    Returns:
+        Dict[str, Any]: ``ns_per_call``, ``ns_per_item``, ``items_per_second`` and
+        ``item``
+    """
+    timer = timeit.Timer(case.run)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {
+        "ns_per_call": best * 1e9,
+        "ns_per_item": best * 1e9 / case.items,
+        "items_per_second": case.items / best if best > 0 else float("inf"),
+        "item": case.item,
+    }
+
+
+def run(
+    sizes: Optional[List[str]] = None, pattern: str = "", repeat: int = 3, verbose: bool = True
+) -> Dict[str, Any]:
+    """
+    Run the benchmark suite.
+
+    Args:
+        sizes (List[str], optional): Size names to run (default: None, all sizes)
+        pattern (str): Only run benchmarks whose name contains this text (default: all)
+        repeat (int): Number of timed repeats per benchmark (default: 3)
+        verbose (bool): Print each result as it completes (default: True)
+
+    Returns:
+        Dict[str, Any]: The report, with ``meta`` and ``results`` sections
+    """
+    results = {}
+    for size_name in NUMERIC_SIZES:
+        if sizes is None or size_name in sizes:
+            results.update(_run_cases(numeric_cases(size_name), pattern, repeat, verbose))
+    for size_name in TEXT_SIZES:
+        if sizes is None or size_name in sizes:
+            results.update(_run_cases(string_cases(size_name), pattern, repeat, verbose))
+    meta = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "seed": datasets.SEED,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    return {"meta": meta, "results": results}
+
+
+def _run_cases(
+    cases: Iterator[Case], pattern: str, repeat: int, verbose: bool
+) -> Dict[str, Dict[str, Any]]:
+    """Measure the cases whose name contains pattern, printing each if verbose."""
+    results = {}
+    for case in cases:
+        if pattern in case.name:
+            results[case.name] = measure(case, repeat)
+            if verbose:
+                result = results[case.name]
+                print(
+                    f"{case.name:<45} {result['ns_per_item']:>12.2f} ns/{case.item}"
+                    f" {result['items_per_second']:>16,.0f} {case.item}s/s"
+                )
+    return results
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+) -> List[str]:
+    """
+    Find benchmarks that regressed relative to a baseline.
+
+    Args:
+        baseline (Dict[str, Any]): A report written by ``record``
+        current (Dict[str, Any]): A report of the current code
+        threshold (float): Allowed relative slowdown, e.g. 0.1 for 10% (default: 0.1)
+
+    Returns:
+        List[str]: A description of each regression
+
+    Example:
+        >>> old = {"results": {"f[1e3]": {"ns_per_item": 10.0}}}
+        >>> new = {"results": {"f[1e3]": {"ns_per_item": 12.0}}}
+        >>> compare(old, new, threshold=0.1)
+        ['f[1e3]: 10.00 -> 12.00 ns/item (+20.0%)']
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        before, after = previous["ns_per_item"], result["ns_per_item"]
+        change = after / before - 1 if before > 0 else 0.0
+        if change > threshold:
+            regressions.append(f"{name}: {before:.2f} -> {after:.2f} ns/item ({change:+.1%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Args:
+        argv (List[str], optional): Arguments (default: None, use sys.argv)
+
+    Returns:
+        int: Exit status, 1 if compare found regressions
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("mode", choices=("record", "compare"))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline to compare to")
+    parser.add_argument("--output", help="where to write results (record default: baseline)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--sizes", help="comma-separated size names, e.g. scalar,1e3")
+    parser.add_argument("--filter", default="", help="only run benchmarks containing this text")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes.split(",") if args.sizes else None
+    report = run(sizes, args.filter, args.repeat)
+    output = args.output or (args.baseline if args.mode == "record" else None)
+    if output:
+        with open(output, "w") as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+    if args.mode == "record":
+        return 0
+
+    with open(args.baseline) as handle:
+        regressions = compare(json.load(handle), report, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
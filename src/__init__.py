@@ -1 +1,32 @@
+"""
+Submodules are imported on first attribute access (PEP 562), so ``import src`` stays
+cheap for short-lived processes that only need part of the package.
+"""
 
+from importlib import import_module
+
+_SUBMODULES = frozenset(
+    {
+        "affix_index",
+        "caching",
+        "conversion_service",
+        "instrumentation",
+        "multi_pattern",
+        "multi_replace",
+        "simple_string",
+        "string_view",
+        "substring_index",
+        "unit_conversions",
+        "word_count",
+    }
+)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES)
@@ -0,0 +1,380 @@
+"""
+Affix Index Module
+
+This module answers ``simple_string.starts_with`` and ``ends_with`` questions the
+other way round: given a prefix or suffix, which strings of a large set have it.
+
+The strings are kept sorted, so the strings starting with a prefix form one
+contiguous run found by two binary searches, between the prefix itself and the
+first string greater than every string with that prefix. Suffixes are answered the
+same way by a companion set of the reversed strings. Each sorted set is split into
+blocks of about a thousand strings, so inserting or deleting a string shifts one
+block instead of the whole set, and counts use running block sizes instead of
+materializing the matches.
+"""
+
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Strings per block of a sorted set; blocks are split at twice this size
+_BLOCK_SIZE = 1000
+
+_LAST_CHARACTER = chr(0x10FFFF)
+
+
+def _successor(prefix: str) -> Optional[str]:
+    """
+    Find the smallest string greater than every string starting with a prefix.
+
+    Args:
+        prefix (str): The prefix
+
+    Returns:
+        Optional[str]: The bound, or None if no string is greater than them all
+    """
+    stripped = prefix.rstrip(_LAST_CHARACTER)
+    if not stripped:
+        return None
+    return stripped[:-1] + chr(ord(stripped[-1]) + 1)
+
+
+def _outermost(prefixes: Iterable[str]) -> List[str]:
+    """
+    Keep the sorted prefixes that do not start with another of the prefixes.
+
+    Args:
+        prefixes (Iterable[str]): The prefixes
+
+    Returns:
+        List[str]: Prefixes whose runs of matching strings are disjoint, in order
+    """
+    kept: List[str] = []
+    for prefix in sorted(set(prefixes)):
+        if not kept or not prefix.startswith(kept[-1]):
+            kept.append(prefix)
+    return kept
+
+
+class _SortedKeys:
+    """
+    Set of strings kept sorted in blocks, with positions computed from block sizes.
+
+    Args:
+        keys (Iterable[str]): The initial strings
+    """
+
+    __slots__ = ("_blocks", "_maxes", "_offsets")
+
+    def __init__(self, keys: Iterable[str] = ()):
+        ordered = sorted(set(keys))
+        self._blocks = [
+            ordered[start : start + _BLOCK_SIZE] for start in range(0, len(ordered), _BLOCK_SIZE)
+        ]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._offsets: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return self._count()[-1]
+
+    def __iter__(self) -> Iterator[str]:
+        for block in self._blocks:
+            yield from block
+
+    def __contains__(self, key: str) -> bool:
+        index = bisect_left(self._maxes, key)
+        return (
+            index < len(self._maxes)
+            and self._blocks[index][bisect_left(self._blocks[index], key)] == key
+        )
+
+    def _count(self) -> List[int]:
+        """Number of strings before each block, and in total."""
+        if self._offsets is None:
+            self._offsets = [0, *accumulate(map(len, self._blocks))]
+        return self._offsets
+
+    def add(self, key: str) -> bool:
+        """Insert a string, returning whether it was new."""
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            self._offsets = None
+            return True
+        index = min(bisect_left(self._maxes, key), len(self._blocks) - 1)
+        block = self._blocks[index]
+        position = bisect_left(block, key)
+        if position < len(block) and block[position] == key:
+            return False
+        block.insert(position, key)
+        self._maxes[index] = block[-1]
+        if len(block) > 2 * _BLOCK_SIZE:
+            self._blocks[index : index + 1] = [block[:_BLOCK_SIZE], block[_BLOCK_SIZE:]]
+            self._maxes.insert(index, block[_BLOCK_SIZE - 1])
+        self._offsets = None
+        return True
+
+    def discard(self, key: str) -> bool:
+        """Remove a string, returning whether it was present."""
+        index = bisect_left(self._maxes, key)
+        if index == len(self._blocks):
+            return False
+        block = self._blocks[index]
+        position = bisect_left(block, key)
+        if block[position] != key:
+            return False
+        del block[position]
+        if block:
+            self._maxes[index] = block[-1]
+        else:
+            del self._blocks[index]
+            del self._maxes[index]
+        self._offsets = None
+        return True
+
+    def _position(self, key: Optional[str]) -> int:
+        """Count the strings less than a bound (None for no bound)."""
+        offsets = self._count()
+        if key is None:
+            return offsets[-1]
+        index = bisect_left(self._maxes, key)
+        if index == len(self._blocks):
+            return offsets[-1]
+        return offsets[index] + bisect_left(self._blocks[index], key)
+
+    def count_range(self, low: str, high: Optional[str]) -> int:
+        """Count the strings from low up to, but excluding, high (None for no bound)."""
+        return self._position(high) - self._position(low)
+
+    def range(self, low: str, high: Optional[str], into: List[str]) -> None:
+        """Append the strings from low up to, but excluding, high to a list."""
+        index = bisect_left(self._maxes, low)
+        if index == len(self._blocks):
+            return
+        start = bisect_left(self._blocks[index], low)
+        for block in self._blocks[index:]:
+            if high is not None and block[-1] >= high:
+                into.extend(block[start : bisect_left(block, high, start)])
+                return
+            into.extend(block[start:])
+            start = 0
+
+
+class AffixIndex:
+    """
+    Set of strings indexed for prefix and suffix lookups, with incremental updates.
+
+    Args:
+        keys (Iterable[str]): The initial strings (default: none)
+
+    Example:
+        >>> routes = AffixIndex(["/api/users", "/api/orders", "/static/app.js", "/health"])
+        >>> routes.with_prefix("/api/")
+        ['/api/orders', '/api/users']
+        >>> routes.count_suffix(".js")
+        1
+        >>> routes.add("/api/items.js")
+        True
+        >>> routes.with_any_suffix([".js", "ers"])
+        ['/api/items.js', '/api/orders', '/api/users', '/static/app.js']
+    """
+
+    __slots__ = ("_keys", "_reversed")
+
+    def __init__(self, keys: Iterable[str] = ()):
+        keys = set(keys)
+        self._keys = _SortedKeys(keys)
+        self._reversed = _SortedKeys(key[::-1] for key in keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def add(self, key: str) -> bool:
+        """
+        Insert a string.
+
+        Args:
+            key (str): The string
+
+        Returns:
+            bool: True if the string was not already in the index
+        """
+        if not self._keys.add(key):
+            return False
+        self._reversed.add(key[::-1])
+        return True
+
+    def discard(self, key: str) -> bool:
+        """
+        Remove a string if it is in the index.
+
+        Args:
+            key (str): The string
+
+        Returns:
+            bool: True if the string was in the index
+        """
+        if not self._keys.discard(key):
+            return False
+        self._reversed.discard(key[::-1])
+        return True
+
+    def update(self, keys: Iterable[str]) -> int:
+        """
+        Insert several strings.
+
+        Args:
+            keys (Iterable[str]): The strings
+
+        Returns:
+            int: The number of strings that were new
+        """
+        return sum(self.add(key) for key in keys)
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """
+        Find the strings starting with a prefix.
+
+        Args:
+            prefix (str): The prefix
+
+        Returns:
+            List[str]: The matching strings, sorted
+        """
+        matches: List[str] = []
+        self._keys.range(prefix, _successor(prefix), matches)
+        return matches
+
+    def with_suffix(self, suffix: str) -> List[str]:
+        """
+        Find the strings ending with a suffix.
+
+        Args:
+            suffix (str): The suffix
+
+        Returns:
+            List[str]: The matching strings, sorted
+        """
+        return self.with_any_suffix([suffix])
+
+    def count_prefix(self, prefix: str) -> int:
+        """
+        Count the strings starting with a prefix, without listing them.
+
+        Args:
+            prefix (str): The prefix
+
+        Returns:
+            int: The number of matching strings
+        """
+        return self._keys.count_range(prefix, _successor(prefix))
+
+    def count_suffix(self, suffix: str) -> int:
+        """
+        Count the strings ending with a suffix, without listing them.
+
+        Args:
+            suffix (str): The suffix
+
+        Returns:
+            int: The number of matching strings
+        """
+        backwards = suffix[::-1]
+        return self._reversed.count_range(backwards, _successor(backwards))
+
+    def with_prefixes(self, prefixes: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Find the strings starting with each of several prefixes.
+
+        Args:
+            prefixes (Iterable[str]): The prefixes
+
+        Returns:
+            Dict[str, List[str]]: The sorted matches of each prefix
+        """
+        return {prefix: self.with_prefix(prefix) for prefix in prefixes}
+
+    def with_suffixes(self, suffixes: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Find the strings ending with each of several suffixes.
+
+        Args:
+            suffixes (Iterable[str]): The suffixes
+
+        Returns:
+            Dict[str, List[str]]: The sorted matches of each suffix
+        """
+        return {suffix: self.with_suffix(suffix) for suffix in suffixes}
+
+    def count_prefixes(self, prefixes: Iterable[str]) -> Dict[str, int]:
+        """
+        Count the strings starting with each of several prefixes.
+
+        Args:
+            prefixes (Iterable[str]): The prefixes
+
+        Returns:
+            Dict[str, int]: The number of matches of each prefix
+
+        Example:
+            >>> AffixIndex(["car", "cart", "cat", "dog"]).count_prefixes(["ca", "car", "x"])
+            {'ca': 3, 'car': 2, 'x': 0}
+        """
+        return {prefix: self.count_prefix(prefix) for prefix in prefixes}
+
+    def count_suffixes(self, suffixes: Iterable[str]) -> Dict[str, int]:
+        """
+        Count the strings ending with each of several suffixes.
+
+        Args:
+            suffixes (Iterable[str]): The suffixes
+
+        Returns:
+            Dict[str, int]: The number of matches of each suffix
+        """
+        return {suffix: self.count_suffix(suffix) for suffix in suffixes}
+
+    def with_any_prefix(self, prefixes: Iterable[str]) -> List[str]:
+        """
+        Find the strings starting with at least one of several prefixes.
+
+        Args:
+            prefixes (Iterable[str]): The prefixes
+
+        Returns:
+            List[str]: The matching strings, sorted, each listed once
+        """
+        matches: List[str] = []
+        for prefix in _outermost(prefixes):
+            self._keys.range(prefix, _successor(prefix), matches)
+        return matches
+
+    def with_any_suffix(self, suffixes: Iterable[str]) -> List[str]:
+        """
+        Find the strings ending with at least one of several suffixes.
+
+        Args:
+            suffixes (Iterable[str]): The suffixes
+
+        Returns:
+            List[str]: The matching strings, sorted, each listed once
+        """
+        matches: List[str] = []
+        for backwards in _outermost(suffix[::-1] for suffix in suffixes):
+            self._reversed.range(backwards, _successor(backwards), matches)
+        return sorted(match[::-1] for match in matches)
+
+    def __getstate__(self) -> List[str]:
+        return list(self._keys)
+
+    def __setstate__(self, keys: List[str]) -> None:
+        self.__init__(keys)
+
+    def __repr__(self) -> str:
+        return f"AffixIndex(<{len(self)} strings>)"
@@ -0,0 +1,419 @@
+"""
+Caching Module
+
+This module provides an opt-in memoization layer for the pure functions of the
+unit conversion and string modules, for workloads where the same inputs are seen
+over and over.
+
+Each cached function gets its own bounded cache with LRU (least recently used) or
+LFU (least frequently used, ties broken by recency) eviction, an optional cap on
+the approximate memory held by its entries, a lock for thread safety and hit, miss
+and eviction counters. Like :mod:`src.instrumentation`, caching works by replacing
+module attributes with caching wrappers when :func:`enable` is called and restoring
+the originals on :func:`disable`. When both are used, disable them in the reverse
+order of enabling.
+
+Calls that raise are not cached, and calls with unhashable arguments (such as the
+list given to ``join_strings``) bypass the cache. As with ``functools.lru_cache``
+with ``typed=True``, arguments of different types are cached separately, so
+``1`` and ``1.0`` never share a result. Mutable results (such as the list returned
+by ``split_string``) are copied on the way in and out, so callers cannot change
+what later calls return.
+"""
+
+import copy
+import functools
+import sys
+import threading
+from collections import OrderedDict
+from types import FunctionType, ModuleType
+from typing import Any, Callable, Dict, Hashable, Iterable, NamedTuple, Optional, Tuple, Union
+
+from . import simple_string
+from .unit_conversions import distance_conversions, weight_conversions
+
+DEFAULT_MODULES = (distance_conversions, weight_conversions, simple_string)
+DEFAULT_MAX_ENTRIES = 4096
+EVICTION_POLICIES = ("lru", "lfu")
+
+# Approximate bookkeeping cost of one entry (dictionary slots and list nodes), in bytes
+_ENTRY_OVERHEAD = 120
+
+# Result types copied so callers never share the cached object
+_MUTABLE_RESULTS = (list, dict, set, bytearray)
+
+_originals: Dict[Tuple[ModuleType, str], Callable] = {}
+_caches: Dict[str, "BoundedCache"] = {}
+_lock = threading.Lock()
+
+_MISSING = object()
+
+
+class CacheStats(NamedTuple):
+    """Counters of one cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        """float: The fraction of lookups that were hits."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _entry_size(key: Hashable, value: Any) -> int:
+    """
+    Estimate the memory held by one cache entry.
+
+    Args:
+        key (Hashable): The argument tuple
+        value (Any): The cached result
+
+    Returns:
+        int: Shallow sizes of the key, its items and the value, plus bookkeeping
+    """
+    size = _ENTRY_OVERHEAD + sys.getsizeof(key) + sys.getsizeof(value)
+    if isinstance(key, tuple):
+        size += sum(map(sys.getsizeof, key))
+    return size
+
+
+class BoundedCache:
+    """
+    Thread-safe mapping with bounded size and LRU or LFU eviction.
+
+    Args:
+        policy (str): ``"lru"`` or ``"lfu"`` (default: ``"lru"``)
+        max_entries (int): Maximum number of entries (default: 4096)
+        max_bytes (int, optional): Maximum approximate memory of the entries
+            (default: None, unbounded)
+
+    Raises:
+        ValueError: If policy is unknown or a limit is not positive
+
+    Example:
+        >>> cache = BoundedCache("lfu", max_entries=2)
+        >>> cache.put("a", 1); cache.put("b", 2)
+        >>> cache.get("a"), cache.get("a")
+        (1, 1)
+        >>> cache.put("c", 3)  # evicts "b", the least frequently used
+        >>> cache.get("b") is None, cache.stats()[:4]
+        (True, (2, 1, 1, 2))
+    """
+
+    def __init__(
+        self,
+        policy: str = "lru",
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: Optional[int] = None,
+    ):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(
+                f"Unknown eviction policy {policy!r}, expected one of {EVICTION_POLICIES}"
+            )
+        if max_entries < 1 or (max_bytes is not None and max_bytes < 1):
+            raise ValueError("Cache limits must be positive")
+        self.policy = policy
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            # key -> (value, size) in recency order; for LFU, one such dict per use count
+            self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+            self._counts: Dict[Hashable, int] = {}
+            self._buckets: Dict[int, "OrderedDict[Hashable, None]"] = {}
+            self._bytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Look up a key, counting a hit or a miss.
+
+        Args:
+            key (Hashable): The key
+            default (Any): Returned if the key is missing (default: None)
+
+        Returns:
+            Any: The cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self._misses += 1
+                return default
+            self._hits += 1
+            if self.policy == "lru":
+                self._entries.move_to_end(key)
+            else:
+                self._touch(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting entries as needed to respect the limits.
+
+        Values larger than the memory cap on their own are not stored.
+
+        Args:
+            key (Hashable): The key
+            value (Any): The value
+        """
+        size = _entry_size(key, value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+                self._forget(key)
+            while self._entries and (
+                len(self._entries) >= self.max_entries
+                or (self.max_bytes is not None and self._bytes + size > self.max_bytes)
+            ):
+                self._evict()
+            self._entries[key] = (value, size)
+            self._bytes += size
+            if self.policy == "lfu":
+                self._counts[key] = 0
+                self._touch(key)
+
+    def stats(self) -> CacheStats:
+        """
+        Snapshot the counters.
+
+        Returns:
+            CacheStats: Hits, misses, evictions, current entries and approximate bytes
+        """
+        with self._lock:
+            return CacheStats(
+                self._hits, self._misses, self._evictions, len(self._entries), self._bytes
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _touch(self, key: Hashable) -> None:
+        """Move a key to the next use-count bucket (LFU only)."""
+        count = self._counts[key]
+        if count:
+            bucket = self._buckets[count]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[count]
+        self._counts[key] = count + 1
+        self._buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+    def _forget(self, key: Hashable) -> None:
+        """Remove a key from the LFU bookkeeping."""
+        count = self._counts.pop(key, None)
+        if count:
+            bucket = self._buckets[count]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[count]
+
+    def _evict(self) -> None:
+        """Remove the least recently (LRU) or least frequently (LFU) used entry."""
+        if self.policy == "lru":
+            key = next(iter(self._entries))
+        else:
+            bucket = self._buckets[min(self._buckets)]
+            key = next(iter(bucket))
+            self._forget(key)
+        _, size = self._entries.pop(key)
+        self._bytes -= size
+        self._evictions += 1
+
+
+def _key(args: tuple, kwargs: Dict[str, Any]) -> tuple:
+    """
+    Build the cache key of a call, including the type of every argument.
+
+    Args:
+        args (tuple): Positional arguments
+        kwargs (Dict[str, Any]): Keyword arguments
+
+    Returns:
+        tuple: The key; it raises TypeError when hashed if an argument is unhashable
+    """
+    key = args + tuple(type(value) for value in args)
+    if kwargs:
+        items = tuple(sorted(kwargs.items()))
+        key += (_MISSING,) + items + tuple(type(value) for _, value in items)
+    return key
+
+
+def _detached(result: Any) -> Any:
+    """Copy a mutable result so the cached object is never shared with a caller."""
+    return copy.copy(result) if isinstance(result, _MUTABLE_RESULTS) else result
+
+
+def cached(
+    function: Callable,
+    policy: str = "lru",
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    max_bytes: Optional[int] = None,
+) -> Callable:
+    """
+    Wrap a pure function with a bounded cache.
+
+    The wrapper exposes its cache as the ``cache`` attribute and the original
+    function as ``__wrapped__``.
+
+    Args:
+        function (Callable): The function to memoize
+        policy (str): ``"lru"`` or ``"lfu"`` (default: ``"lru"``)
+        max_entries (int): Maximum number of cached results (default: 4096)
+        max_bytes (int, optional): Maximum approximate memory of the cached results
+            (default: None, unbounded)
+
+    Returns:
+        Callable: The caching wrapper
+
+    Example:
+        >>> from src.unit_conversions.weight_conversions import kg_to_lb
+        >>> fast_kg_to_lb = cached(kg_to_lb, max_entries=1000)
+        >>> fast_kg_to_lb(2) == fast_kg_to_lb(2) == kg_to_lb(2)
+        True
+        >>> fast_kg_to_lb.cache.stats().hits
+        1
+    """
+    cache = BoundedCache(policy, max_entries, max_bytes)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        key = _key(args, kwargs)
+        try:
+            result = cache.get(key, _MISSING)
+        except TypeError:
+            return function(*args, **kwargs)
+        if result is _MISSING:
+            result = function(*args, **kwargs)
+            cache.put(key, _detached(result))
+            return result
+        return _detached(result)
+
+    wrapper.cache = cache
+    return wrapper
+
+
+def _targets(
+    targets: Iterable[Union[ModuleType, Callable]],
+) -> Iterable[Tuple[ModuleType, str, Callable]]:
+    """
+    Expand modules and functions into (module, attribute name, function) triples.
+
+    Batch functions and private functions of modules are skipped.
+
+    Args:
+        targets (Iterable[Union[ModuleType, Callable]]): Modules or module-level functions
+
+    Yields:
+        Tuple[ModuleType, str, Callable]: The functions to wrap
+    """
+    for target in targets:
+        if isinstance(target, ModuleType):
+            for name, value in vars(target).items():
+                if (
+                    isinstance(value, FunctionType)
+                    and value.__module__ == target.__name__
+                    and not name.startswith("_")
+                    and not name.endswith("_batch")
+                ):
+                    yield target, name, value
+        else:
+            original = getattr(target, "__wrapped__", target)
+            yield sys.modules[original.__module__], original.__name__, target
+
+
+def enable(
+    targets: Optional[Iterable[Union[ModuleType, Callable]]] = None,
+    policy: str = "lru",
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    max_bytes: Optional[int] = None,
+) -> None:
+    """
+    Start caching the results of some functions.
+
+    Calling enable again adds functions; already cached functions keep their cache.
+
+    Args:
+        targets (Iterable[Union[ModuleType, Callable]], optional): Modules (all their
+            public scalar functions) or individual functions (default: None,
+            DEFAULT_MODULES)
+        policy (str): ``"lru"`` or ``"lfu"`` (default: ``"lru"``)
+        max_entries (int): Maximum number of cached results per function
+            (default: 4096)
+        max_bytes (int, optional): Maximum approximate memory per function
+            (default: None, unbounded)
+
+    Raises:
+        ValueError: If policy is unknown or a limit is not positive
+
+    Example:
+        >>> from src.unit_conversions import distance_conversions
+        >>> enable([distance_conversions.mi_to_km], policy="lfu")
+        >>> distance_conversions.mi_to_km(3) == distance_conversions.mi_to_km(3)
+        True
+        >>> stats()["distance_conversions.mi_to_km"].hits
+        1
+        >>> disable()
+    """
+    BoundedCache(policy, max_entries, max_bytes)
+    with _lock:
+        for module, name, function in _targets(DEFAULT_MODULES if targets is None else targets):
+            if (module, name) not in _originals:
+                wrapper = cached(function, policy, max_entries, max_bytes)
+                _originals[module, name] = function
+                _caches[f"{module.__name__.rsplit('.', 1)[-1]}.{name}"] = wrapper.cache
+                setattr(module, name, wrapper)
+
+
+def disable() -> None:
+    """
+    Stop caching, restoring the original functions and dropping every cache.
+    """
+    with _lock:
+        for (module, name), function in _originals.items():
+            setattr(module, name, function)
+        _originals.clear()
+        _caches.clear()
+
+
+def is_enabled() -> bool:
+    """
+    Check whether any function is cached.
+
+    Returns:
+        bool: True if caching is enabled
+    """
+    return bool(_originals)
+
+
+def clear() -> None:
+    """
+    Empty every cache and reset its counters, keeping caching enabled.
+    """
+    with _lock:
+        for cache in _caches.values():
+            cache.clear()
+
+
+def stats() -> Dict[str, CacheStats]:
+    """
+    Snapshot the counters of every cached function.
+
+    Returns:
+        Dict[str, CacheStats]: Counters per function name, e.g.
+        ``"weight_conversions.kg_to_lb"``
+    """
+    with _lock:
+        return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,506 @@
+"""
+Conversion Service Module
+
+This module runs the distance, weight and string operations as a local asyncio
+service, so that many processes on a host can share one warm server instead of each
+importing the library, and provides a pooled client for it.
+
+The protocol is line-delimited JSON over a Unix socket or localhost TCP. Each request
+is ``{"id": 1, "function": "km_to_mi", "args": [5.0]}`` and is answered with
+``{"id": 1, "result": 3.106...}`` or ``{"id": 1, "error": "..."}``; responses on a
+connection may arrive out of order. Available functions are:
+
+- ``"convert"`` with ``[value, from_unit, to_unit]``, any-to-any conversion
+- every scalar function of ``distance_conversions`` and ``weight_conversions``
+- every function of ``simple_string``
+- ``"stats"``, the server statistics
+
+Conversions are micro-batched: requests for the same conversion arriving within a
+short latency window are gathered and converted with one ``*_batch`` call. String
+operations run immediately.
+
+Usage::
+
+    python -m src.conversion_service --socket /tmp/conversions.sock
+    python -m src.conversion_service --port 8765
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+from array import array
+from functools import partial
+from numbers import Real
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import simple_string
+from .unit_conversions import distance_conversions, unit_registry, weight_conversions
+from .unit_conversions.helper_functions.buffers import negative_indices
+
+DEFAULT_WINDOW = 0.001
+DEFAULT_MAX_BATCH_SIZE = 4096
+DEFAULT_POOL_SIZE = 4
+
+# Maximum length of one request or response line
+LINE_LIMIT = 1 << 20
+
+
+def _public_functions(module: Any) -> Dict[str, Callable]:
+    """Map the names of a module's public functions to the functions."""
+    return {
+        name: value
+        for name, value in vars(module).items()
+        if callable(value)
+        and getattr(value, "__module__", None) == module.__name__
+        and not name.startswith("_")
+        and not isinstance(value, type)
+    }
+
+
+class _Batch:
+    """Pending requests for one conversion, flushed together."""
+
+    __slots__ = ("convert", "scalar", "values", "futures", "timer")
+
+    def __init__(self, convert: Callable, scalar: Callable):
+        self.convert = convert
+        self.scalar = scalar
+        self.values = array("d")
+        self.futures: List[asyncio.Future] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class ConversionServer:
+    """
+    Asyncio server answering conversion and string requests, with micro-batching.
+
+    Args:
+        window (float): Seconds to wait for more requests of the same conversion
+            before converting a batch (default: 0.001)
+        max_batch_size (int): Convert a batch as soon as it holds this many values
+            (default: 4096)
+    """
+
+    def __init__(
+        self, window: float = DEFAULT_WINDOW, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    ):
+        if window < 0 or max_batch_size < 1:
+            raise ValueError("window must be non-negative and max_batch_size positive")
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._batches: Dict[Tuple[str, ...], _Batch] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._conversions: Dict[str, Callable] = {}
+        for module in (distance_conversions, weight_conversions):
+            for name, function in _public_functions(module).items():
+                if not name.endswith("_batch"):
+                    self._conversions[name] = function
+        self._strings = _public_functions(simple_string)
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "batches": 0,
+            "batched_values": 0,
+            "max_batch_size": 0,
+            "queue_depth": 0,
+            "max_queue_depth": 0,
+        }
+
+    async def start(
+        self, path: Optional[str] = None, host: str = "127.0.0.1", port: int = 0
+    ) -> Any:
+        """
+        Start listening.
+
+        Args:
+            path (str, optional): Unix socket path; if given, host and port are ignored
+            host (str): TCP host (default: ``"127.0.0.1"``)
+            port (int): TCP port, 0 for any free port (default: 0)
+
+        Returns:
+            Any: The socket path, or the (host, port) actually bound
+        """
+        if path is not None:
+            self._server = await asyncio.start_unix_server(
+                self._handle, path=path, limit=LINE_LIMIT
+            )
+            return path
+        self._server = await asyncio.start_server(self._handle, host, port, limit=LINE_LIMIT)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        """Serve requests until the server is closed."""
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop listening, converting any pending batches first."""
+        for key in list(self._batches):
+            self._flush(key)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot the server statistics.
+
+        Returns:
+            Dict[str, Any]: Counts of ``requests``, ``errors``, ``batches`` and
+            ``batched_values``, the ``mean_batch_size``, the largest batch, and the
+            current and largest number of values waiting in batches
+        """
+        stats = dict(self._stats)
+        stats["mean_batch_size"] = (
+            stats["batched_values"] / stats["batches"] if stats["batches"] else 0.0
+        )
+        return stats
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve one connection, answering each request as soon as it completes.
+
+        Cancellation (when the event loop shuts down) closes the connection quietly.
+        """
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._answer(line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        except (ConnectionError, ValueError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _answer(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        """Execute one request line and write its response line."""
+        self._stats["requests"] += 1
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            response = {
+                "id": request_id,
+                "result": await self.call(request["function"], *request.get("args", ())),
+            }
+        except (ValueError, TypeError, KeyError, AttributeError, ArithmeticError) as error:
+            self._stats["errors"] += 1
+            response = {"id": request_id, "error": str(error)}
+        except Exception as error:
+            # Any other failure still gets a reply, so the client never waits forever
+            self._stats["errors"] += 1
+            response = {"id": request_id, "error": f"{type(error).__name__}: {error}"}
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+
+    async def call(self, function: str, *args: Any) -> Any:
+        """
+        Execute one request in-process, through the same micro-batching as the socket.
+
+        Args:
+            function (str): A function name, ``"convert"`` or ``"stats"``
+            *args (Any): The function's arguments
+
+        Returns:
+            Any: The function's result
+
+        Raises:
+            ValueError: If the function is unknown or raises ValueError, or the number
+                is too large for a float
+            TypeError: If the arguments do not match the function
+        """
+        if function == "stats":
+            return self.stats()
+        if function in self._strings:
+            return self._strings[function](*args)
+        if function == "convert":
+            value, from_unit, to_unit = args
+            unit_registry.conversion_factor(from_unit, to_unit)
+            key = ("convert", from_unit, to_unit)
+            units = {"from_unit": from_unit, "to_unit": to_unit}
+            convert = partial(unit_registry.convert_batch, validated=True, **units)
+            scalar = partial(unit_registry.convert, **units)
+        elif function in self._conversions:
+            (value,) = args
+            key = (function,)
+            scalar = self._conversions[function]
+            convert = partial(unit_registry.batch_function(scalar), validated=True)
+        else:
+            raise ValueError(f"Unknown function: {function!r}")
+        if not isinstance(value, Real) or isinstance(value, bool):
+            raise TypeError(f"Expected a number, not {type(value).__name__}")
+        try:
+            value = float(value)
+        except OverflowError:
+            raise ValueError("Number too large to convert") from None
+        return await self._enqueue(key, value, convert, scalar)
+
+    def _enqueue(
+        self, key: Tuple[str, ...], value: float, convert: Callable, scalar: Callable
+    ) -> asyncio.Future:
+        """
+        Add a value to the pending batch of its conversion.
+
+        Args:
+            key (Tuple[str, ...]): Identifies the conversion
+            value (float): The value
+            convert (Callable): Converts a float64 view of validated values
+            scalar (Callable): Converts a single value, used to report invalid ones
+
+        Returns:
+            asyncio.Future: Resolved with the converted value when the batch is flushed
+        """
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(convert, scalar)
+            batch.timer = loop.call_later(self.window, self._flush, key)
+        future = loop.create_future()
+        batch.values.append(value)
+        batch.futures.append(future)
+        depth = self._stats["queue_depth"] = self._stats["queue_depth"] + 1
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], depth)
+        if len(batch.values) >= self.max_batch_size:
+            self._flush(key)
+        return future
+
+    def _flush(self, key: Tuple[str, ...]) -> None:
+        """Convert a pending batch with one batch call and resolve its futures."""
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        size = len(batch.values)
+        self._stats["queue_depth"] -= size
+        self._stats["batches"] += 1
+        self._stats["batched_values"] += size
+        self._stats["max_batch_size"] = max(self._stats["max_batch_size"], size)
+        view = memoryview(batch.values)
+        invalid = set(negative_indices(view))
+        try:
+            results = batch.convert(view)
+        except Exception as error:
+            # Fail every request of the batch, or their clients would wait forever
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for index, future in enumerate(batch.futures):
+            if future.done():
+                continue
+            if index in invalid:
+                try:
+                    batch.scalar(batch.values[index])
+                except ValueError as error:
+                    future.set_exception(error)
+                    continue
+            future.set_result(results[index])
+
+
+class ConversionClient:
+    """
+    Pooled asyncio client of a :class:`ConversionServer`.
+
+    Requests are spread over a pool of connections and pipelined: each connection
+    carries any number of requests at once, matched to responses by id.
+
+    Args:
+        path (str, optional): Unix socket path of the server
+        host (str): TCP host of the server, if path is not given (default: ``"127.0.0.1"``)
+        port (int, optional): TCP port of the server, if path is not given
+        pool_size (int): Number of connections (default: 4)
+
+    Example:
+        >>> async def demo():
+        ...     server = ConversionServer()
+        ...     host, port = await server.start(port=0)
+        ...     async with ConversionClient(host=host, port=port, pool_size=2) as client:
+        ...         results = await asyncio.gather(
+        ...             *(client.call("km_to_m", value) for value in (1, 2, 3))
+        ...         )
+        ...         text = await client.call("to_uppercase", "abc")
+        ...     await server.close()
+        ...     return results, text
+        >>> asyncio.run(demo())
+        ([1000.0, 2000.0, 3000.0], 'ABC')
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        host: str = "127.0.0.1",
+        port: Optional[int] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ):
+        if path is None and port is None:
+            raise ValueError("Either a socket path or a TCP port is required")
+        self.path = path
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self._connections: List[Tuple[asyncio.StreamWriter, asyncio.Task, Dict]] = []
+        self._ids = itertools.count()
+        self._next = itertools.cycle(range(pool_size))
+
+    async def __aenter__(self) -> "ConversionClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def connect(self) -> None:
+        """Open the pool's connections."""
+        for _ in range(self.pool_size - len(self._connections)):
+            if self.path is not None:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=LINE_LIMIT)
+            else:
+                reader, writer = await asyncio.open_connection(
+                    self.host, self.port, limit=LINE_LIMIT
+                )
+            pending: Dict[int, asyncio.Future] = {}
+            task = asyncio.ensure_future(self._receive(reader, pending))
+            self._connections.append((writer, task, pending))
+
+    async def close(self) -> None:
+        """Close the pool's connections."""
+        for writer, task, _ in self._connections:
+            writer.close()
+            await writer.wait_closed()
+            await asyncio.gather(task, return_exceptions=True)
+        self._connections.clear()
+
+    async def _receive(
+        self, reader: asyncio.StreamReader, pending: Dict[int, asyncio.Future]
+    ) -> None:
+        """Resolve a connection's pending requests as their responses arrive."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = pending.pop(response.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in response:
+                    future.set_exception(ValueError(response["error"]))
+                else:
+                    future.set_result(response["result"])
+        finally:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to the server lost"))
+
+    async def call(self, function: str, *args: Any) -> Any:
+        """
+        Call a function on the server.
+
+        Args:
+            function (str): A function name, ``"convert"`` or ``"stats"``
+            *args (Any): The function's arguments, which must be JSON-serializable
+
+        Returns:
+            Any: The function's result
+
+        Raises:
+            ValueError: If the server reports an error
+            ConnectionError: If the connection is lost
+        """
+        if not self._connections:
+            await self.connect()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        writer, _, pending = self._connections[next(self._next) % len(self._connections)]
+        pending[request_id] = future
+        request = {"id": request_id, "function": function, "args": list(args)}
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        return await future
+
+    async def convert(self, value: float, from_unit: str, to_unit: str) -> float:
+        """
+        Convert a value between any two units of the same dimension on the server.
+
+        Args:
+            value (float): The value
+            from_unit (str): The unit to convert from
+            to_unit (str): The unit to convert to
+
+        Returns:
+            float: The converted value
+
+        Raises:
+            ValueError: If the server rejects the conversion
+        """
+        return await self.call("convert", value, from_unit, to_unit)
+
+    async def stats(self) -> Dict[str, Any]:
+        """
+        Fetch the server statistics.
+
+        Returns:
+            Dict[str, Any]: See :meth:`ConversionServer.stats`
+        """
+        return await self.call("stats")
+
+
+async def serve(
+    path: Optional[str] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    window: float = DEFAULT_WINDOW,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+) -> None:
+    """
+    Run a conversion server until cancelled.
+
+    Args:
+        path (str, optional): Unix socket path; if given, host and port are ignored
+        host (str): TCP host (default: ``"127.0.0.1"``)
+        port (int): TCP port (default: 0, any free port)
+        window (float): Micro-batching latency window in seconds (default: 0.001)
+        max_batch_size (int): Largest micro-batch (default: 4096)
+    """
+    server = ConversionServer(window, max_batch_size)
+    address = await server.start(path, host, port)
+    print(f"Serving conversions on {address}", flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Args:
+        argv (List[str], optional): Arguments (default: None, use sys.argv)
+
+    Returns:
+        int: Exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--socket", help="Unix socket path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.socket, args.host, args.port, args.window, args.max_batch_size))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+Instrumentation Module
+
+This module provides opt-in metrics for the public functions of the unit conversion
+and string modules: call counts, element counts (values processed by batch
+functions), error counts and latency histograms.
+
+Instrumentation works by replacing module attributes with recording wrappers when
+:func:`enable` is called and restoring the originals on :func:`disable`, so it costs
+nothing while disabled. Only calls made through the module attribute are recorded:
+names bound earlier with ``from module import function`` keep calling the original.
+
+Snapshots can be exported as a dictionary or in the Prometheus text format.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import simple_string
+from .unit_conversions import (
+    distance_conversions,
+    unit_registry,
+    validation,
+    weight_conversions,
+)
+from .unit_conversions.helper_functions import simple_arithmetic
+
+DEFAULT_MODULES = (
+    simple_arithmetic,
+    distance_conversions,
+    weight_conversions,
+    unit_registry,
+    validation,
+    simple_string,
+)
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (
+    1e-7,
+    2.5e-7,
+    5e-7,
+    1e-6,
+    2.5e-6,
+    5e-6,
+    1e-5,
+    1e-4,
+    1e-3,
+    1e-2,
+    0.1,
+    1.0,
+    10.0,
+)
+
+_originals: Dict[Tuple[ModuleType, str], Callable] = {}
+_stats: Dict[str, "FunctionStats"] = {}
+_lock = threading.Lock()
+
+
+class FunctionStats:
+    """Thread-safe counters and latency histogram of one function."""
+
+    __slots__ = ("calls", "elements", "errors", "seconds", "buckets", "_lock")
+
+    def __init__(self):
+        self.calls = 0
+        self.elements = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, elements: int, failed: bool) -> None:
+        """
+        Record one call.
+
+        Args:
+            seconds (float): The call's duration
+            elements (int): The number of values processed
+            failed (bool): Whether the call raised an exception
+        """
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            self.calls += 1
+            self.elements += elements
+            self.errors += failed
+            self.seconds += seconds
+            self.buckets[bucket] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Copy the counters into a dictionary.
+
+        Returns:
+            Dict[str, Any]: ``calls``, ``elements``, ``errors``, ``seconds`` and the
+            cumulative ``buckets`` as (upper bound, count) pairs
+        """
+        with self._lock:
+            counts = list(self.buckets)
+            result = {
+                "calls": self.calls,
+                "elements": self.elements,
+                "errors": self.errors,
+                "seconds": self.seconds,
+            }
+        cumulative, total = [], 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), counts):
+            total += count
+            cumulative.append((bound, total))
+        result["buckets"] = cumulative
+        return result
+
+
+def _element_count(values: Any) -> int:
+    """
+    Count the values in the first argument of a batch function.
+
+    Args:
+        values (Any): A buffer, NumPy array or sequence
+
+    Returns:
+        int: The number of float64 values (1 if the length is unknown)
+    """
+    if isinstance(values, (bytes, bytearray)):
+        return len(values) // 8
+    try:
+        return len(values)
+    except TypeError:
+        return 1
+
+
+def _wrap(name: str, function: Callable) -> Callable:
+    """
+    Create a recording wrapper for a function.
+
+    Args:
+        name (str): The metric name, e.g. ``"distance_conversions.m_to_km"``
+        function (Callable): The function to wrap
+
+    Returns:
+        Callable: The wrapper
+    """
+    stats = _stats.setdefault(name, FunctionStats())
+    clock = time.perf_counter
+    batch = name.endswith("_batch") or name.endswith("_with_policy")
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        failed = True
+        start = clock()
+        try:
+            result = function(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            elements = _element_count(args[0]) if batch and args else 1
+            stats.record(clock() - start, elements, failed)
+
+    return wrapper
+
+
+def _public_functions(module: ModuleType) -> List[Tuple[str, Callable]]:
+    """
+    List the public functions defined in a module.
+
+    Args:
+        module (ModuleType): The module
+
+    Returns:
+        List[Tuple[str, Callable]]: (attribute name, function) pairs
+    """
+    return [
+        (name, value)
+        for name, value in vars(module).items()
+        if callable(value)
+        and getattr(value, "__module__", None) == module.__name__
+        and not name.startswith("_")
+        and not isinstance(value, type)
+    ]
+
+
+def enable(modules: Optional[Iterable[ModuleType]] = None) -> None:
+    """
+    Start recording metrics for the public functions of some modules.
+
+    Calling enable again adds modules; already instrumented functions are kept.
+
+    Args:
+        modules (Iterable[ModuleType], optional): Modules to instrument
+            (default: None, DEFAULT_MODULES)
+    """
+    with _lock:
+        for module in DEFAULT_MODULES if modules is None else modules:
+            prefix = module.__name__.rsplit(".", 1)[-1]
+            for name, function in _public_functions(module):
+                if (module, name) not in _originals:
+                    _originals[module, name] = function
+                    setattr(module, name, _wrap(f"{prefix}.{name}", function))
+
+
+def disable() -> None:
+    """
+    Stop recording metrics and restore the original functions.
+
+    Recorded metrics are kept until :func:`reset`.
+    """
+    with _lock:
+        for (module, name), function in _originals.items():
+            setattr(module, name, function)
+        _originals.clear()
+
+
+def is_enabled() -> bool:
+    """
+    Check whether any function is instrumented.
+
+    Returns:
+        bool: True if instrumentation is enabled
+    """
+    return bool(_originals)
+
+
+def reset() -> None:
+    """
+    Clear all recorded metrics.
+    """
+    with _lock:
+        for stats in _stats.values():
+            stats.__init__()
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """
+    Export the recorded metrics of every function that has been called.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Metrics per function name
+
+    Example:
+        >>> from src.unit_conversions import distance_conversions
+        >>> enable([distance_conversions])
+        >>> distance_conversions.m_to_km(1000)
+        1.0
+        >>> snapshot()["distance_conversions.m_to_km"]["calls"]
+        1
+        >>> disable(); reset()
+    """
+    return {name: stats.as_dict() for name, stats in _stats.items() if stats.calls}
+
+
+def _format_bound(bound: float) -> str:
+    """Format a histogram bucket bound as a Prometheus ``le`` label value."""
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def to_prometheus(prefix: str = "sphinx_doc_demo") -> str:
+    """
+    Export the recorded metrics in the Prometheus text exposition format.
+
+    Args:
+        prefix (str): Prefix of every metric name (default: ``"sphinx_doc_demo"``)
+
+    Returns:
+        str: The metrics, one sample per line
+    """
+    metrics = snapshot()
+    lines = []
+    for metric, key, help_text in (
+        ("calls_total", "calls", "Number of calls"),
+        ("elements_total", "elements", "Number of values processed"),
+        ("errors_total", "errors", "Number of calls that raised an exception"),
+    ):
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} counter")
+        for name, values in metrics.items():
+            lines.append(f'{prefix}_{metric}{{function="{name}"}} {values[key]}')
+    histogram = f"{prefix}_latency_seconds"
+    lines.append(f"# HELP {histogram} Call latency in seconds")
+    lines.append(f"# TYPE {histogram} histogram")
+    for name, values in metrics.items():
+        for bound, count in values["buckets"]:
+            lines.append(
+                f'{histogram}_bucket{{function="{name}",le="{_format_bound(bound)}"}} {count}'
+            )
+        lines.append(f'{histogram}_sum{{function="{name}"}} {values["seconds"]!r}')
+        lines.append(f'{histogram}_count{{function="{name}"}} {values["calls"]}')
+    return "\n".join(lines) + "\n"
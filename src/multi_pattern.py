@@ -0,0 +1,284 @@
+"""
+Multi-Pattern Search Module
+
+This module finds every occurrence of many patterns in a text in a single pass, as
+an alternative to calling ``simple_string.contains_substring`` once per pattern.
+
+The patterns are compiled once into an Aho–Corasick automaton: a trie of the
+patterns whose states also link to the state of their longest proper suffix that is
+a trie prefix (the failure link). Scanning follows one transition per character,
+so the cost grows with the length of the text and the number of matches, not with
+the number of patterns. Overlapping occurrences are all reported.
+
+Text can be scanned in one piece or chunk by chunk; the automaton state is carried
+across chunks so occurrences spanning a chunk boundary are found. Matching can
+ignore case; case is folded one character at a time so positions in the folded
+text are positions in the original. A compiled matcher is plain data and can be
+pickled, for instance to send it to worker processes instead of rebuilding it.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Set, Tuple
+
+
+class Match(NamedTuple):
+    """An occurrence of a pattern: text[start:end] == patterns[index]."""
+
+    start: int
+    end: int
+    index: int
+
+
+class _CaseFoldTable(dict):
+    """
+    ``str.translate`` table mapping each character to its lower case, computed lazily.
+
+    Characters whose lower case is longer than one character (such as ``"İ"``) are
+    kept, so translating never changes the length of a text.
+    """
+
+    def __missing__(self, code: int) -> int:
+        lower = chr(code).lower()
+        self[code] = ord(lower) if len(lower) == 1 else code
+        return self[code]
+
+
+_CASE_FOLD = _CaseFoldTable()
+
+
+class MultiPatternMatcher:
+    """
+    Aho–Corasick automaton finding many patterns in one pass over a text.
+
+    Args:
+        patterns (Iterable[str]): The patterns; match indices refer to their order
+        ignore_case (bool): Match regardless of case (default: False)
+
+    Raises:
+        ValueError: If there are no patterns or a pattern is empty
+
+    Example:
+        >>> matcher = MultiPatternMatcher(["he", "she", "hers"])
+        >>> for match in matcher.findall("ushers"):
+        ...     print(match)
+        Match(start=1, end=4, index=1)
+        Match(start=2, end=4, index=0)
+        Match(start=2, end=6, index=2)
+        >>> MultiPatternMatcher(["SPAM"], ignore_case=True).contains_any("no spam")
+        True
+    """
+
+    __slots__ = ("patterns", "ignore_case", "_goto", "_fail", "_outputs")
+
+    def __init__(self, patterns: Iterable[str], ignore_case: bool = False):
+        self.patterns: Tuple[str, ...] = tuple(patterns)
+        self.ignore_case = ignore_case
+        if not self.patterns:
+            raise ValueError("At least one pattern is required")
+        if not all(self.patterns):
+            raise ValueError("Patterns cannot be empty")
+        self._goto: List[Dict[str, int]] = [{}]
+        own: List[List[int]] = [[]]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for character in self._fold(pattern):
+                following = self._goto[state].get(character)
+                if following is None:
+                    following = len(self._goto)
+                    self._goto[state][character] = following
+                    self._goto.append({})
+                    own.append([])
+                state = following
+            own[state].append(index)
+        self._fail = [0] * len(self._goto)
+        self._outputs: List[Tuple[Tuple[int, int], ...]] = [()] * len(self._goto)
+        # Breadth-first, so the failure state of every state is finished before it
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            fallback = self._fail[state]
+            self._outputs[state] = (
+                tuple((index, len(self.patterns[index])) for index in own[state])
+                + self._outputs[fallback]
+            )
+            for character, following in self._goto[state].items():
+                link = fallback
+                while link and character not in self._goto[link]:
+                    link = self._fail[link]
+                self._fail[following] = self._goto[link].get(character, 0)
+                pending.append(following)
+
+    def _fold(self, text: str) -> str:
+        """Fold case if the matcher ignores case, keeping the length of the text."""
+        return text.translate(_CASE_FOLD) if self.ignore_case else text
+
+    def _scan(self, text: str, state: int, offset: int, matches: List[Match], first: bool) -> int:
+        """
+        Run the automaton over a text from a given state, collecting the matches.
+
+        Args:
+            text (str): The (case-folded) text
+            state (int): The automaton state before the first character
+            offset (int): Position of the first character in the whole stream
+            matches (List[Match]): List the matches are appended to
+            first (bool): Stop at the first match
+
+        Returns:
+            int: The automaton state after the last scanned character
+        """
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        root = goto[0]
+        append = matches.append
+        for position, character in enumerate(text, offset + 1):
+            if state:
+                transitions = goto[state]
+                while character not in transitions and state:
+                    state = fail[state]
+                    transitions = goto[state]
+                state = transitions.get(character, 0)
+            else:
+                state = root.get(character, 0)
+            if outputs[state]:
+                for index, length in outputs[state]:
+                    append(Match(position - length, position, index))
+                if first:
+                    break
+        return state
+
+    def findall(self, text: str) -> List[Match]:
+        """
+        Find every occurrence of every pattern.
+
+        Args:
+            text (str): The text to search
+
+        Returns:
+            List[Match]: The occurrences, overlapping ones included, in order of end
+            position
+        """
+        matches: List[Match] = []
+        self._scan(self._fold(text), 0, 0, matches, False)
+        return matches
+
+    def finditer(self, text: str) -> Iterator[Match]:
+        """
+        Iterate over every occurrence of every pattern.
+
+        Args:
+            text (str): The text to search
+
+        Returns:
+            Iterator[Match]: The occurrences, in order of end position
+        """
+        return iter(self.findall(text))
+
+    def contains_any(self, text: str) -> bool:
+        """
+        Check whether any pattern occurs in a text, stopping at the first occurrence.
+
+        Args:
+            text (str): The text to search
+
+        Returns:
+            bool: True if a pattern occurs
+        """
+        matches: List[Match] = []
+        self._scan(self._fold(text), 0, 0, matches, True)
+        return bool(matches)
+
+    def occurring(self, text: str) -> Set[str]:
+        """
+        List the patterns that occur in a text.
+
+        Args:
+            text (str): The text to search
+
+        Returns:
+            Set[str]: The patterns found
+
+        Example:
+            >>> sorted(MultiPatternMatcher(["cat", "dog", "bird"]).occurring("catdog"))
+            ['cat', 'dog']
+        """
+        return {self.patterns[match.index] for match in self.finditer(text)}
+
+    def positions(self, text: str) -> Dict[str, List[int]]:
+        """
+        Find where each pattern occurs in a text.
+
+        Args:
+            text (str): The text to search
+
+        Returns:
+            Dict[str, List[int]]: Start positions of each pattern found
+
+        Example:
+            >>> MultiPatternMatcher(["ab", "b"]).positions("abab")
+            {'ab': [0, 2], 'b': [1, 3]}
+        """
+        found: Dict[str, List[int]] = {}
+        for match in self.finditer(text):
+            found.setdefault(self.patterns[match.index], []).append(match.start)
+        return found
+
+    def scanner(self) -> "StreamScanner":
+        """
+        Start scanning a text that arrives in chunks.
+
+        Returns:
+            StreamScanner: A scanner positioned at the start of the stream
+        """
+        return StreamScanner(self)
+
+    def __getstate__(self) -> tuple:
+        return self.patterns, self.ignore_case, self._goto, self._fail, self._outputs
+
+    def __setstate__(self, state: tuple) -> None:
+        self.patterns, self.ignore_case, self._goto, self._fail, self._outputs = state
+
+    def __repr__(self) -> str:
+        return (
+            f"MultiPatternMatcher(<{len(self.patterns)} patterns>, "
+            f"ignore_case={self.ignore_case!r})"
+        )
+
+
+class StreamScanner:
+    """
+    Chunk-by-chunk scan of a stream with a ``MultiPatternMatcher``.
+
+    Positions are counted from the start of the stream, and occurrences spanning
+    chunk boundaries are reported when their last chunk is fed.
+
+    Args:
+        matcher (MultiPatternMatcher): The compiled patterns
+
+    Example:
+        >>> scanner = MultiPatternMatcher(["needle"]).scanner()
+        >>> scanner.feed("hay nee"), scanner.feed("dle hay")
+        ([], [Match(start=4, end=10, index=0)])
+    """
+
+    __slots__ = ("matcher", "position", "_state")
+
+    def __init__(self, matcher: MultiPatternMatcher):
+        self.matcher = matcher
+        self.position = 0
+        self._state = 0
+
+    def feed(self, chunk: str) -> List[Match]:
+        """
+        Scan the next chunk of the stream.
+
+        Args:
+            chunk (str): The chunk
+
+        Returns:
+            List[Match]: The occurrences ending in this chunk
+        """
+        matches: List[Match] = []
+        self._state = self.matcher._scan(
+            self.matcher._fold(chunk), self._state, self.position, matches, False
+        )
+        self.position += len(chunk)
+        return matches
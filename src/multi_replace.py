@@ -0,0 +1,168 @@
+"""
+Multi-Replace Module
+
+This module applies many ``old -> new`` replacement rules to a text in a single
+left-to-right pass, instead of one ``simple_string.replace_substring`` call per rule,
+each of which rescans and copies the whole text.
+
+The ``old`` strings are compiled once into a character trie rendered as one regular
+expression, so the text is scanned by the C regex engine and shared prefixes are
+never retried. At each position the longest matching ``old`` string wins, and
+replaced text is never scanned again. For rules whose ``old`` strings do not overlap
+one another and whose replacements do not create new matches, the result equals
+applying the rules one after another with ``replace_substring``.
+
+Large inputs can be rewritten as a stream of chunks: the end of each chunk that a
+longer match could still extend is held back until the next chunk arrives.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple, Union
+
+from .unit_conversions.helper_functions.patterns import trie_pattern
+
+Rules = Union[Mapping[str, str], Iterable[Tuple[str, str]]]
+
+
+class ReplacementTable:
+    """
+    Compiled set of replacement rules applied in one pass, longest match first.
+
+    Args:
+        rules (Rules): A mapping or (old, new) pairs; a repeated old string keeps its
+            last replacement
+
+    Raises:
+        ValueError: If there are no rules or an old string is empty
+
+    Example:
+        >>> table = ReplacementTable({"cat": "dog", "category": "class", "dog": "cat"})
+        >>> table.rewrite("cat dog category")
+        'dog cat class'
+    """
+
+    __slots__ = ("rules", "_pattern", "_longest")
+
+    def __init__(self, rules: Rules):
+        self.rules: Dict[str, str] = dict(rules)
+        if not self.rules:
+            raise ValueError("At least one rule is required")
+        if "" in self.rules:
+            raise ValueError("Cannot replace an empty string")
+        self._pattern = re.compile(trie_pattern(self.rules))
+        self._longest = max(map(len, self.rules))
+
+    def _replacement(self, match: "re.Match") -> str:
+        """Look up the replacement of a matched old string."""
+        return self.rules[match[0]]
+
+    def rewrite(self, text: str) -> str:
+        """
+        Apply every rule to a text in one pass.
+
+        Args:
+            text (str): The text
+
+        Returns:
+            str: The rewritten text
+        """
+        return self._pattern.sub(self._replacement, text)
+
+    def rewriter(self) -> "StreamRewriter":
+        """
+        Start rewriting a text that arrives in chunks.
+
+        Returns:
+            StreamRewriter: A rewriter positioned at the start of the stream
+        """
+        return StreamRewriter(self)
+
+    def rewrite_chunks(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Rewrite a stream of chunks.
+
+        Args:
+            chunks (Iterable[str]): Consecutive pieces of the text
+
+        Yields:
+            str: Consecutive pieces of the rewritten text; joined, they equal
+            ``rewrite`` of the joined chunks
+
+        Example:
+            >>> table = ReplacementTable({"colour": "color"})
+            >>> "".join(table.rewrite_chunks(["the col", "our red"]))
+            'the color red'
+        """
+        rewriter = StreamRewriter(self)
+        for chunk in chunks:
+            output = rewriter.feed(chunk)
+            if output:
+                yield output
+        output = rewriter.close()
+        if output:
+            yield output
+
+    def __getstate__(self) -> Dict[str, str]:
+        return self.rules
+
+    def __setstate__(self, rules: Dict[str, str]) -> None:
+        self.__init__(rules)
+
+    def __repr__(self) -> str:
+        return f"ReplacementTable(<{len(self.rules)} rules>)"
+
+
+class StreamRewriter:
+    """
+    Chunk-by-chunk rewriting of a stream with a ``ReplacementTable``.
+
+    Text after the last position where a match could still grow is held back until
+    more input arrives or the stream is closed.
+
+    Args:
+        table (ReplacementTable): The compiled rules
+    """
+
+    __slots__ = ("table", "_pending")
+
+    def __init__(self, table: ReplacementTable):
+        self.table = table
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        """
+        Rewrite the next chunk of the stream.
+
+        Args:
+            chunk (str): The chunk
+
+        Returns:
+            str: The rewritten text that is final so far
+        """
+        text = self._pending + chunk
+        # Matches starting before this position cannot be extended by later input
+        safe = len(text) - self.table._longest + 1
+        pieces: List[str] = []
+        position = 0
+        rules = self.table.rules
+        for match in self.table._pattern.finditer(text):
+            start = match.start()
+            if start >= safe:
+                break
+            pieces.append(text[position:start])
+            pieces.append(rules[match[0]])
+            position = match.end()
+        cut = max(position, safe)
+        pieces.append(text[position:cut])
+        self._pending = text[cut:]
+        return "".join(pieces)
+
+    def close(self) -> str:
+        """
+        End the stream.
+
+        Returns:
+            str: The rewritten rest of the stream
+        """
+        text, self._pending = self._pending, ""
+        return self.table.rewrite(text)
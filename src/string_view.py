@@ -0,0 +1,298 @@
+"""
+String View Module
+
+This module provides ``StringView``, a window onto a ``str`` or a bytes-like buffer
+that stands for a substring or a reversed substring without copying it, unlike
+``simple_string.get_substring`` and ``reverse_string``, which build a new string
+each time.
+
+A view is its source plus the range of source indices it covers, in order. Slicing
+or reversing a view only slices that range. The checks ``simple_string`` offers
+(``starts_with``, ``ends_with``, ``contains_substring``, ``count_characters``) run
+directly on the source, bounded to the covered part: on a reversed view the pattern
+is reversed instead of the text, so only the pattern is ever copied. The text is
+copied only when ``materialize`` (or ``str``) is called, or for searches on views
+with a step other than 1 or -1.
+
+``str``, ``bytes`` and ``bytearray`` sources are searched with their own methods;
+other buffers, such as ``memoryview`` or ``mmap.mmap``, are viewed as unsigned bytes
+and searched with the regular expression engine, which reads buffers in place.
+"""
+
+import re
+from typing import Iterator, Optional, Union
+
+Source = Union[str, bytes, bytearray, memoryview]
+Pattern = Union[str, bytes, bytearray, memoryview]
+
+
+class StringView:
+    """
+    Substring of a ``str`` or bytes-like buffer, possibly reversed, that is never
+    copied unless asked.
+
+    Views of bytes-like sources work in bytes: their patterns are bytes-like, items
+    are ints and ``count_characters`` counts bytes.
+
+    Args:
+        source (Source): The text or buffer
+        start (int): The starting index, as for ``get_substring`` (default: 0)
+        end (int, optional): The ending index (default: None, goes to end)
+
+    Example:
+        >>> payload = "GET /api/users HTTP/1.1"
+        >>> path = StringView(payload).get_substring(4, 14)
+        >>> path.starts_with("/api"), path.count_characters()
+        (True, 10)
+        >>> backwards = path.reverse_string()
+        >>> backwards.starts_with("sresu"), backwards.contains_substring("ipa/")
+        (True, True)
+        >>> str(backwards[:5])
+        'sresu'
+    """
+
+    __slots__ = ("_source", "_range")
+
+    def __init__(self, source: Source, start: int = 0, end: Optional[int] = None):
+        if not isinstance(source, (str, bytes, bytearray)):
+            source = memoryview(source).cast("B")
+        self._source = source
+        self._range = range(len(source))[start:end]
+
+    @classmethod
+    def _over(cls, source: Source, indices: range) -> "StringView":
+        """Make a view of the given source indices, skipping argument checks."""
+        view = cls.__new__(cls)
+        view._source = source
+        view._range = indices
+        return view
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            return self._over(self._source, self._range[key])
+        return self._source[self._range[key]]
+
+    def __iter__(self) -> Iterator:
+        source = self._source
+        return (source[index] for index in self._range)
+
+    def _span(self) -> slice:
+        """The slice of the source covered by the view, in source order."""
+        indices = self._range
+        if not indices:
+            return slice(0, 0)
+        first, last = indices[0], indices[-1]
+        return slice(min(first, last), max(first, last) + 1)
+
+    def _pattern(self, pattern: Pattern) -> Pattern:
+        """Normalize a pattern to the kind of the source."""
+        if isinstance(self._source, str):
+            if not isinstance(pattern, str):
+                raise ValueError("Views of text take str patterns")
+            return pattern
+        if isinstance(pattern, str):
+            raise ValueError("Views of bytes take bytes-like patterns")
+        return bytes(pattern)
+
+    def _contiguous(self) -> bool:
+        """Whether the view covers consecutive source indices, forwards or backwards."""
+        return len(self._range) < 2 or abs(self._range.step) == 1
+
+    def _forwards(self) -> bool:
+        return self._range.step > 0 or len(self._range) < 2
+
+    def reverse_string(self) -> "StringView":
+        """
+        Reverse the view, without copying.
+
+        Returns:
+            StringView: The view read backwards
+        """
+        return self._over(self._source, self._range[::-1])
+
+    def get_substring(self, start: int, end: Optional[int] = None) -> "StringView":
+        """
+        Take part of the view, without copying.
+
+        Args:
+            start (int): The starting index in the view
+            end (int, optional): The ending index (default: None, goes to end)
+
+        Returns:
+            StringView: The view of the part
+        """
+        return self._over(self._source, self._range[start:end])
+
+    def materialize(self) -> Union[str, bytes]:
+        """
+        Copy the viewed text.
+
+        Returns:
+            Union[str, bytes]: The text, as ``str`` for text sources and ``bytes``
+            otherwise
+        """
+        indices = self._range
+        # A reversed range down to index 0 stops at -1, which a slice reads as the end
+        stop = indices.stop if indices.stop >= 0 else None
+        text = self._source[indices.start : stop : indices.step] if indices else self._source[:0]
+        return text if isinstance(text, str) else bytes(text)
+
+    def __str__(self) -> str:
+        text = self.materialize()
+        return text if isinstance(text, str) else str(text)
+
+    def __repr__(self) -> str:
+        return f"StringView(<{len(self)} of {len(self._source)} characters>)"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, StringView):
+            other = other.materialize()
+        elif not isinstance(other, (str, bytes, bytearray)):
+            return NotImplemented
+        if isinstance(other, str) != isinstance(self._source, str):
+            return False
+        return len(other) == len(self) and self.starts_with(other)
+
+    __hash__ = None
+
+    def count_characters(self) -> int:
+        """
+        Count the characters in the view, without copying.
+
+        Returns:
+            int: The number of characters (bytes for bytes-like sources)
+        """
+        return len(self._range)
+
+    def _starts(self, pattern: Pattern, span: slice) -> bool:
+        """Check whether the source span starts with a pattern."""
+        if isinstance(self._source, memoryview):
+            end = span.start + len(pattern)
+            return end <= span.stop and self._source[span.start : end] == pattern
+        return self._source.startswith(pattern, span.start, span.stop)
+
+    def _ends(self, pattern: Pattern, span: slice) -> bool:
+        """Check whether the source span ends with a pattern."""
+        if isinstance(self._source, memoryview):
+            start = span.stop - len(pattern)
+            return start >= span.start and self._source[start : span.stop] == pattern
+        return self._source.endswith(pattern, span.start, span.stop)
+
+    def starts_with(self, prefix: Pattern) -> bool:
+        """
+        Check if the view starts with a given prefix, without copying the view.
+
+        Args:
+            prefix (Pattern): The prefix to look for
+
+        Returns:
+            bool: True if the view starts with the prefix, False otherwise
+        """
+        prefix = self._pattern(prefix)
+        if not self._contiguous():
+            return self.materialize().startswith(prefix)
+        if self._forwards():
+            return self._starts(prefix, self._span())
+        return self._ends(prefix[::-1], self._span())
+
+    def ends_with(self, suffix: Pattern) -> bool:
+        """
+        Check if the view ends with a given suffix, without copying the view.
+
+        Args:
+            suffix (Pattern): The suffix to look for
+
+        Returns:
+            bool: True if the view ends with the suffix, False otherwise
+        """
+        suffix = self._pattern(suffix)
+        if not self._contiguous():
+            return self.materialize().endswith(suffix)
+        if self._forwards():
+            return self._ends(suffix, self._span())
+        return self._starts(suffix[::-1], self._span())
+
+    def find(self, substring: Pattern) -> int:
+        """
+        Find the first occurrence of a substring, without copying the view.
+
+        Args:
+            substring (Pattern): The substring to look for
+
+        Returns:
+            int: Index of the occurrence in the view, or -1 if there is none
+
+        Example:
+            >>> view = StringView(b"abcabc").reverse_string()
+            >>> view.find(b"ba"), view.find(b"x")
+            (1, -1)
+        """
+        substring = self._pattern(substring)
+        if not self._contiguous():
+            return self.materialize().find(substring)
+        span, source = self._span(), self._source
+        if self._forwards():
+            if isinstance(source, memoryview):
+                match = re.compile(re.escape(substring)).search(source, span.start, span.stop)
+                index = match.start() if match else -1
+            else:
+                index = source.find(substring, span.start, span.stop)
+            return index - span.start if index >= 0 else -1
+        backwards = substring[::-1]
+        if isinstance(source, memoryview):
+            # The lookahead reports overlapping occurrences, so the last one is found
+            pattern = re.compile(b"(?=" + re.escape(backwards) + b")")
+            index = -1
+            for match in pattern.finditer(source, span.start, span.stop):
+                index = match.start()
+        else:
+            index = source.rfind(backwards, span.start, span.stop)
+        return span.stop - index - len(backwards) if index >= 0 else -1
+
+    def contains_substring(self, substring: Pattern) -> bool:
+        """
+        Check if the view contains a given substring, without copying the view.
+
+        Args:
+            substring (Pattern): The substring to look for
+
+        Returns:
+            bool: True if the substring is found, False otherwise
+        """
+        substring = self._pattern(substring)
+        if not self._contiguous():
+            return substring in self.materialize()
+        if not self._forwards():
+            substring = substring[::-1]
+        span, source = self._span(), self._source
+        if isinstance(source, memoryview):
+            return (
+                re.compile(re.escape(substring)).search(source, span.start, span.stop) is not None
+            )
+        return source.find(substring, span.start, span.stop) >= 0
+
+    def count_substring(self, substring: Pattern) -> int:
+        """
+        Count the non-overlapping occurrences of a substring, as ``str.count`` does,
+        without copying the view.
+
+        Args:
+            substring (Pattern): The substring to count
+
+        Returns:
+            int: The number of occurrences
+        """
+        substring = self._pattern(substring)
+        if not self._contiguous():
+            return self.materialize().count(substring)
+        # Greedy non-overlapping matching finds as many occurrences from either end
+        if not self._forwards():
+            substring = substring[::-1]
+        span, source = self._span(), self._source
+        if isinstance(source, memoryview):
+            pattern = re.compile(re.escape(substring))
+            return sum(1 for _ in pattern.finditer(source, span.start, span.stop))
+        return source.count(substring, span.start, span.stop)
@@ -0,0 +1,362 @@
+"""
+Substring Index Module
+
+This module answers repeated substring queries (does a pattern occur, how often,
+and where) over a fixed corpus in time logarithmic in the corpus size, instead of
+the linear scan of ``simple_string.contains_substring``.
+
+The index is a suffix array: the start offsets of every suffix of the corpus
+(encoded as UTF-8), sorted by the suffixes they start. The occurrences of a
+pattern are the suffixes it prefixes, which form one contiguous run of the array
+found by two binary searches. The array is built once by prefix doubling
+(vectorized with NumPy when it is installed) and saved together with the corpus to
+a single file, which later processes memory-map: opening an index reads only its
+header, and queries touch only the pages they need.
+
+Positions are character offsets into the corpus. For corpora that are not pure
+ASCII the file also stores the number of characters before every 4 KiB block of
+the encoded text, to convert between byte and character offsets.
+
+File layout (native byte order)::
+
+    header      magic, byte order, array item size, corpus bytes, block count
+    corpus      the UTF-8 text, padded to a multiple of 8 bytes
+    array       the suffix array, int32 (int64 for corpora of 2 GiB or more)
+    blocks      int64 character counts, one per 4 KiB block plus one
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Union
+
+from .unit_conversions.helper_functions.buffers import np
+
+MAGIC = b"SUFARR01"
+
+# magic, byte order (0 little, 1 big), array item size, corpus bytes, block count
+_HEADER = struct.Struct("=8sIIQQ")
+
+# Bytes per block of the character count table
+BLOCK_SIZE = 4096
+
+# Suffixes compared per step when ranking a sorted doubling round
+_SCAN_BLOCK = 1 << 16
+
+_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+
+def _padded(size: int) -> int:
+    """Round a size up to a multiple of 8 bytes."""
+    return (size + 7) & ~7
+
+
+def _characters(data: bytes) -> int:
+    """Count the UTF-8 characters in some bytes, which may end inside a character."""
+    return len(data.translate(None, _CONTINUATION_BYTES))
+
+
+def _suffix_array_numpy(data: bytes) -> "np.ndarray":
+    """
+    Sort the suffixes of some bytes by prefix doubling with NumPy.
+
+    Each round sorts the suffixes by their first 2k bytes, given their ranks by the
+    first k bytes, until all ranks are distinct. A round holds the ranks (int32 for
+    corpora under 2 GiB), one int64 sort key per suffix and the int64 sort order, about
+    21 bytes per corpus byte at peak; everything else is released or computed in
+    blocks.
+
+    Args:
+        data (bytes): The text
+
+    Returns:
+        np.ndarray: The suffix start offsets in sorted order
+    """
+    length = len(data)
+    rank_type = np.int32 if length < 1 << 31 else np.int64
+    base = max(length, 256) + 2
+    rank = np.frombuffer(data, dtype=np.uint8).astype(rank_type)
+    rank += 1
+    distinct = np.empty(length, dtype=bool)
+    step = 1
+    while True:
+        key = rank.astype(np.int64)
+        key *= base
+        if step < length:
+            key[: length - step] += rank[step:]
+        order = np.argsort(key)
+        # Compare neighbours in sorted order block by block instead of sorting the keys
+        distinct[0] = True
+        for start in range(1, length, _SCAN_BLOCK):
+            stop = min(start + _SCAN_BLOCK, length)
+            np.not_equal(
+                key[order[start:stop]], key[order[start - 1 : stop - 1]], out=distinct[start:stop]
+            )
+        del key
+        ranks = np.cumsum(distinct, dtype=rank_type)
+        rank[order] = ranks
+        if ranks[-1] == length or step >= length:
+            return order
+        del ranks, order
+        step *= 2
+
+
+def _suffix_array_python(data: bytes) -> List[int]:
+    """
+    Sort the suffixes of some bytes by prefix doubling in pure Python.
+
+    Args:
+        data (bytes): The text
+
+    Returns:
+        List[int]: The suffix start offsets in sorted order
+    """
+    length = len(data)
+    base = max(length, 256) + 2
+    rank = [byte + 1 for byte in data]
+    step = 1
+    while True:
+        key = [
+            rank[index] * base + (rank[index + step] if index + step < length else 0)
+            for index in range(length)
+        ]
+        order = sorted(range(length), key=key.__getitem__)
+        current, previous = 0, None
+        for index in order:
+            if key[index] != previous:
+                current += 1
+                previous = key[index]
+            rank[index] = current
+        if current == length or step >= length:
+            return order
+        step *= 2
+
+
+def build_index(text: Union[str, bytes], path: Union[str, os.PathLike]) -> "SubstringIndex":
+    """
+    Build the suffix array index of a corpus, save it to a file and open it.
+
+    Args:
+        text (Union[str, bytes]): The corpus, as text or UTF-8 bytes
+        path (Union[str, os.PathLike]): Path of the index file to write
+
+    Returns:
+        SubstringIndex: The opened index
+
+    Raises:
+        UnicodeDecodeError: If text is bytes that are not valid UTF-8
+    """
+    data = text.encode("utf-8") if isinstance(text, str) else bytes(text)
+    if not isinstance(text, str):
+        data.decode("utf-8")
+    length = len(data)
+    itemsize = 4 if length < 1 << 31 else 8
+    if length == 0:
+        suffixes = b""
+    elif np is not None:
+        suffixes = _suffix_array_numpy(data)
+    else:
+        suffixes = array("i" if itemsize == 4 else "q", _suffix_array_python(data))
+    blocks = array("q", [0])
+    if _characters(data) != length:
+        for start in range(0, length, BLOCK_SIZE):
+            blocks.append(blocks[-1] + _characters(data[start : start + BLOCK_SIZE]))
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, sys.byteorder == "big", itemsize, length, len(blocks)))
+        file.write(data)
+        file.write(bytes(_padded(length) - length))
+        if isinstance(suffixes, (bytes, array)):
+            file.write(suffixes)
+        else:
+            # Narrow the NumPy sort order to the item size block by block, not all at once
+            item_type = np.int32 if itemsize == 4 else np.int64
+            for start in range(0, length, _SCAN_BLOCK):
+                file.write(suffixes[start : start + _SCAN_BLOCK].astype(item_type).tobytes())
+        file.write(bytes(_padded(length * itemsize) - length * itemsize))
+        file.write(blocks)
+    return SubstringIndex(path)
+
+
+class SubstringIndex:
+    """
+    Memory-mapped suffix array index of a fixed corpus.
+
+    Args:
+        path (Union[str, os.PathLike]): Path of a file written by ``build_index``
+
+    Raises:
+        ValueError: If the file is not an index or was written with another byte order
+
+    Example:
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), "corpus.idx")
+        >>> with build_index("banana bandana", path) as index:
+        ...     index.contains("nan"), index.count("an"), index.positions("ban")
+        (True, 4, [0, 7])
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        with open(path, "rb") as file:
+            self._mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, big_endian, itemsize, length, block_count = _HEADER.unpack_from(self._mapped)
+        except struct.error:
+            magic = None
+        if magic != MAGIC:
+            self._mapped.close()
+            raise ValueError(f"{os.fspath(path)!r} is not a substring index")
+        if big_endian != (sys.byteorder == "big"):
+            self._mapped.close()
+            raise ValueError(f"{os.fspath(path)!r} was written on a machine of another byte order")
+        self._start = _HEADER.size
+        self._length = length
+        view = memoryview(self._mapped)
+        offset = self._start + _padded(length)
+        self._suffixes = view[offset : offset + length * itemsize].cast(
+            "i" if itemsize == 4 else "q"
+        )
+        offset += _padded(length * itemsize)
+        self._blocks = view[offset : offset + block_count * 8].cast("q")
+        view.release()
+        self._ascii = block_count == 1
+
+    def __enter__(self) -> "SubstringIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmap the index file.
+        """
+        self._suffixes.release()
+        self._blocks.release()
+        self._mapped.close()
+
+    def __len__(self) -> int:
+        return self._length if self._ascii else self._blocks[-1]
+
+    def _range(self, pattern: bytes) -> range:
+        """
+        Find the run of the suffix array whose suffixes start with a pattern.
+
+        Args:
+            pattern (bytes): The encoded pattern
+
+        Returns:
+            range: Indices into the suffix array
+        """
+        mapped, suffixes, start, size = self._mapped, self._suffixes, self._start, len(pattern)
+        # Suffixes shorter than the pattern must not read past the corpus
+        end = start + self._length
+        low, high = 0, self._length
+        while low < high:
+            middle = (low + high) // 2
+            offset = start + suffixes[middle]
+            if mapped[offset : min(offset + size, end)] < pattern:
+                low = middle + 1
+            else:
+                high = middle
+        first, high = low, self._length
+        while low < high:
+            middle = (low + high) // 2
+            offset = start + suffixes[middle]
+            if mapped[offset : min(offset + size, end)] <= pattern:
+                low = middle + 1
+            else:
+                high = middle
+        return range(first, low)
+
+    def _to_characters(self, offset: int) -> int:
+        """Convert a byte offset into the corpus to a character offset."""
+        if self._ascii:
+            return offset
+        block = offset // BLOCK_SIZE
+        start = self._start + block * BLOCK_SIZE
+        return self._blocks[block] + _characters(self._mapped[start : self._start + offset])
+
+    def _to_bytes(self, position: int) -> int:
+        """Convert a character offset into the corpus to a byte offset."""
+        if self._ascii:
+            return position
+        if position >= self._blocks[-1]:
+            return self._length
+        block = bisect_right(self._blocks, position) - 1
+        offset = block * BLOCK_SIZE
+        remaining = position - self._blocks[block]
+        start = self._start + offset
+        for byte in self._mapped[start : start + BLOCK_SIZE + 3]:
+            if not 0x80 <= byte < 0xC0:
+                if not remaining:
+                    break
+                remaining -= 1
+            offset += 1
+        return offset
+
+    def contains(self, pattern: str) -> bool:
+        """
+        Check whether a pattern occurs in the corpus.
+
+        Args:
+            pattern (str): The substring to look for
+
+        Returns:
+            bool: True if the pattern occurs, as ``contains_substring`` on the corpus
+        """
+        return bool(self._range(pattern.encode("utf-8"))) or not pattern
+
+    def count(self, pattern: str) -> int:
+        """
+        Count the occurrences of a pattern, overlapping ones included.
+
+        Args:
+            pattern (str): The substring to look for
+
+        Returns:
+            int: The number of positions where the pattern starts
+        """
+        if not pattern:
+            return len(self) + 1
+        return len(self._range(pattern.encode("utf-8")))
+
+    def positions(self, pattern: str, limit: Optional[int] = None) -> List[int]:
+        """
+        Find where a pattern occurs, overlapping occurrences included.
+
+        Args:
+            pattern (str): The substring to look for
+            limit (int, optional): Return at most this many positions, from an
+                arbitrary subset of the occurrences (default: None, all)
+
+        Returns:
+            List[int]: Character offsets of the occurrences, in increasing order
+        """
+        if not pattern:
+            return list(range(len(self) + 1))[:limit]
+        run = self._range(pattern.encode("utf-8"))
+        if limit is not None:
+            run = run[:limit]
+        offsets = sorted(self._suffixes[run.start : run.stop].tolist())
+        return offsets if self._ascii else [self._to_characters(offset) for offset in offsets]
+
+    def substring(self, start: int, end: Optional[int] = None) -> str:
+        """
+        Read part of the corpus, as ``get_substring`` would.
+
+        Args:
+            start (int): Character offset of the first character
+            end (int, optional): Character offset after the last character
+                (default: None, the end of the corpus)
+
+        Returns:
+            str: The characters from start to end
+        """
+        start, end, _ = slice(start, end).indices(len(self))
+        if start >= end:
+            return ""
+        first, last = self._to_bytes(start), self._to_bytes(end)
+        return self._mapped[self._start + first : self._start + last].decode("utf-8")
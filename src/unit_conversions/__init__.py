@@ -1 +1,34 @@
+"""
+Submodules are imported on first attribute access (PEP 562), so ``import
+src.unit_conversions`` does not load the conversion modules, the registry or NumPy.
+"""
 
+from importlib import import_module
+
+_SUBMODULES = frozenset(
+    {
+        "distance_conversions",
+        "fixed_point",
+        "helper_functions",
+        "mmap_conversions",
+        "parallel",
+        "pipeline",
+        "quantity",
+        "streaming",
+        "unit_formatter",
+        "unit_parser",
+        "unit_registry",
+        "validation",
+        "weight_conversions",
+    }
+)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES)
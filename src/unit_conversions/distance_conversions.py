@@ -3,8 +3,16 @@ Distance Conversion Module
 
 This module provides functions for converting between common distance units.
 All conversions use helper functions from simple_arithmetic for calculations.
+Each conversion also has a ``*_batch`` variant that converts a whole buffer of
+values at once, optionally into a caller-supplied ``out`` buffer.
 """
 
+from .helper_functions.buffers import (
+    FloatBuffer,
+    as_float_view,
+    first_negative_index,
+    scale_into,
+)
 from .helper_functions.simple_arithmetic import multiply
 
 
@@ -17,10 +25,10 @@ MI_TO_FT = 5280.0
 FT_TO_MI = 1 / 5280.0
 FT_TO_IN = 12.0
 IN_TO_FT = 1 / 12.0
-M_TO_FT = 3.28084
 FT_TO_M = 0.3048
-KM_TO_MI = 0.621371
+M_TO_FT = 1 / FT_TO_M
 MI_TO_KM = 1.60934
+KM_TO_MI = 1 / MI_TO_KM
 
 
 def _validate_distance(value: float, unit: str) -> None:
@@ -38,6 +46,33 @@ def _validate_distance(value: float, unit: str) -> None:
         raise ValueError(f"Distance in {unit} cannot be negative: {value}")
 
 
+def _convert_distance_batch(
+    values: FloatBuffer, factor: float, unit: str, out: FloatBuffer, validated: bool
+) -> FloatBuffer:
+    """
+    Validate a batch of distance values in one pass and scale it by a factor.
+    
+    Args:
+        values (FloatBuffer): The distance values to convert
+        factor (float): The conversion factor
+        unit (str): The unit name for error messaging
+        out (FloatBuffer): Buffer to write results into, or None to allocate one
+        validated (bool): If True, the values are known to be non-negative and are
+            not checked
+    
+    Returns:
+        FloatBuffer: The converted values
+    
+    Raises:
+        ValueError: If any value is negative, or out is not a matching float64 buffer
+    """
+    view = as_float_view(values)
+    index = None if validated else first_negative_index(view)
+    if index is not None:
+        _validate_distance(float(view[index]), unit)
+    return scale_into(view, factor, out)
+
+
 def m_to_km(meters: float) -> float:
     """
     Convert meters to kilometers.
@@ -312,3 +347,327 @@ def mi_to_km(miles: float) -> float:
     """
     _validate_distance(miles, "miles")
     return multiply(miles, MI_TO_KM)
+
+
+def m_to_km_batch(
+    meters: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of distances from meters to kilometers.
+    
+    Args:
+        meters (FloatBuffer): Distances in meters, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Distances in kilometers; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in meters is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> m_to_km_batch(array("d", [1000.0, 5000.0]))
+        array('d', [1.0, 5.0])
+    """
+    return _convert_distance_batch(meters, M_TO_KM, "meters", out, validated)
+
+
+def km_to_m_batch(
+    kilometers: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of distances from kilometers to meters.
+    
+    Args:
+        kilometers (FloatBuffer): Distances in kilometers, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Distances in meters; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in kilometers is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> km_to_m_batch(array("d", [1.0, 2.5]))
+        array('d', [1000.0, 2500.0])
+    """
+    return _convert_distance_batch(kilometers, KM_TO_M, "kilometers", out, validated)
+
+
+def m_to_cm_batch(
+    meters: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of distances from meters to centimeters.
+    
+    Args:
+        meters (FloatBuffer): Distances in meters, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Distances in centimeters; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in meters is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> m_to_cm_batch(array("d", [1.0, 2.5]))
+        array('d', [100.0, 250.0])
+    """
+    return _convert_distance_batch(meters, M_TO_CM, "meters", out, validated)
+
+
+def cm_to_m_batch(
+    centimeters: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of distances from centimeters to meters.
+    
+    Args:
+        centimeters (FloatBuffer): Distances in centimeters, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Distances in meters; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in centimeters is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> cm_to_m_batch(array("d", [100.0, 250.0]))
+        array('d', [1.0, 2.5])
+    """
+    return _convert_distance_batch(centimeters, CM_TO_M, "centimeters", out, validated)
+
+
+def mi_to_ft_batch(
+    miles: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of distances from miles to feet.
+    
+    Args:
+        miles (FloatBuffer): Distances in miles, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Distances in feet; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in miles is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> mi_to_ft_batch(array("d", [1.0, 0.5]))
+        array('d', [5280.0, 2640.0])
+    """
+    return _convert_distance_batch(miles, MI_TO_FT, "miles", out, validated)
+
+
+def ft_to_mi_batch(
+    feet: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of distances from feet to miles.
+    
+    Args:
+        feet (FloatBuffer): Distances in feet, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Distances in miles; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in feet is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> ft_to_mi_batch(array("d", [5280.0, 2640.0]))
+        array('d', [1.0, 0.5])
+    """
+    return _convert_distance_batch(feet, FT_TO_MI, "feet", out, validated)
+
+
+def ft_to_in_batch(
+    feet: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of distances from feet to inches.
+    
+    Args:
+        feet (FloatBuffer): Distances in feet, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Distances in inches; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in feet is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> ft_to_in_batch(array("d", [1.0, 2.5]))
+        array('d', [12.0, 30.0])
+    """
+    return _convert_distance_batch(feet, FT_TO_IN, "feet", out, validated)
+
+
+def in_to_ft_batch(
+    inches: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of distances from inches to feet.
+    
+    Args:
+        inches (FloatBuffer): Distances in inches, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Distances in feet; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in inches is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> in_to_ft_batch(array("d", [12.0, 24.0]))
+        array('d', [1.0, 2.0])
+    """
+    return _convert_distance_batch(inches, IN_TO_FT, "inches", out, validated)
+
+
+def m_to_ft_batch(
+    meters: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of distances from meters to feet.
+    
+    Args:
+        meters (FloatBuffer): Distances in meters, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Distances in feet; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in meters is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> [round(x, 2) for x in m_to_ft_batch(array("d", [1.0, 10.0]))]
+        [3.28, 32.81]
+    """
+    return _convert_distance_batch(meters, M_TO_FT, "meters", out, validated)
+
+
+def ft_to_m_batch(
+    feet: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of distances from feet to meters.
+    
+    Args:
+        feet (FloatBuffer): Distances in feet, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Distances in meters; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in feet is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> [round(x, 2) for x in ft_to_m_batch(array("d", [1.0, 10.0]))]
+        [0.3, 3.05]
+    """
+    return _convert_distance_batch(feet, FT_TO_M, "feet", out, validated)
+
+
+def km_to_mi_batch(
+    kilometers: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of distances from kilometers to miles.
+    
+    Args:
+        kilometers (FloatBuffer): Distances in kilometers, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Distances in miles; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in kilometers is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> [round(x, 2) for x in km_to_mi_batch(array("d", [1.0, 10.0]))]
+        [0.62, 6.21]
+    """
+    return _convert_distance_batch(kilometers, KM_TO_MI, "kilometers", out, validated)
+
+
+def mi_to_km_batch(
+    miles: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of distances from miles to kilometers.
+    
+    Args:
+        miles (FloatBuffer): Distances in miles, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Distances in kilometers; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in miles is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> [round(x, 2) for x in mi_to_km_batch(array("d", [1.0, 10.0]))]
+        [1.61, 16.09]
+    """
+    return _convert_distance_batch(miles, MI_TO_KM, "miles", out, validated)
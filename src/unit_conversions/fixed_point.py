@@ -0,0 +1,477 @@
+"""
+Fixed-Point Conversions Module
+
+This module converts integer quantities, such as weights stored as integer
+milligrams or distances stored as integer micrometres, without going through
+floating point. Every factor is the exact rational number from the unit registry
+(1 lb is exactly 453592 mg, 1 ft is exactly 304800 um), so a conversion is one
+integer multiplication and one integer division with a defined rounding mode.
+
+Batch functions work on ``array('q')`` buffers (or int64 NumPy arrays) and never
+box a value into a float. Sums are exact: they are accumulated in Python integers,
+or in overflow-free 32-bit halves when NumPy is installed.
+
+Rounding modes follow the names of the ``decimal`` module:
+
+- ``"half_even"``: round to nearest, ties to even (the default)
+- ``"half_up"``: round to nearest, ties away from zero
+- ``"floor"``: round towards negative infinity
+- ``"ceiling"``: round towards positive infinity
+- ``"down"``: round towards zero
+"""
+
+from array import array
+from fractions import Fraction
+from itertools import compress, count
+from typing import Any, Dict, Optional, Tuple
+
+from .helper_functions.buffers import CHUNK_SIZE, is_ndarray, np
+from .unit_registry import _DIMENSION_MODULES, RATIONAL_FACTORS, UNIT_DIMENSIONS, UNIT_NAMES
+
+# Any object exposing int64 data through the buffer protocol, or a NumPy array
+IntBuffer = Any
+
+ROUNDING_MODES = ("half_even", "half_up", "floor", "ceiling", "down")
+
+INT64_MAX = (1 << 63) - 1
+
+# Sub-unit integer bases that have no float conversion functions of their own
+_EXTRA_UNITS: Dict[str, Tuple[str, str, Fraction]] = {
+    "um": ("micrometers", "m", Fraction(1, 10**6)),
+}
+
+
+def _integer_registry() -> Tuple[Dict[Tuple[str, str], Fraction], Dict[str, str], Dict[str, str]]:
+    """
+    Extend the registry's exact factors with the integer-only base units.
+
+    Returns:
+        Tuple[Dict[Tuple[str, str], Fraction], Dict[str, str], Dict[str, str]]: The
+        factor matrix, the dimension of every unit and the name of every unit
+    """
+    factors = dict(RATIONAL_FACTORS)
+    dimensions = dict(UNIT_DIMENSIONS)
+    names = dict(UNIT_NAMES)
+    for unit, (name, base, size) in _EXTRA_UNITS.items():
+        dimensions[unit] = dimensions[base]
+        names[unit] = name
+        factors[unit, unit] = Fraction(1)
+        for other in [other for other, dim in UNIT_DIMENSIONS.items() if dim == dimensions[base]]:
+            factors[unit, other] = size * RATIONAL_FACTORS[base, other]
+            factors[other, unit] = 1 / factors[unit, other]
+    return factors, dimensions, names
+
+
+_FACTORS, _DIMENSIONS, _NAMES = _integer_registry()
+
+
+def units(dimension: Optional[str] = None) -> list:
+    """
+    List the units available to integer conversions.
+
+    Args:
+        dimension (str, optional): Only list units of this dimension (default: None, all)
+
+    Returns:
+        list: Unit symbols, the registry's units followed by ``"um"``
+
+    Example:
+        >>> units("distance")
+        ['km', 'm', 'cm', 'mi', 'ft', 'in', 'um']
+    """
+    return [unit for unit, dim in _DIMENSIONS.items() if dimension in (None, dim)]
+
+
+def rational_factor(from_unit: str, to_unit: str) -> Fraction:
+    """
+    Look up the exact factor that converts values from one unit to another.
+
+    Args:
+        from_unit (str): The unit to convert from, e.g. ``"lb"``
+        to_unit (str): The unit to convert to, e.g. ``"mg"``
+
+    Returns:
+        Fraction: The exact multiplicative conversion factor
+
+    Raises:
+        ValueError: If either unit is unknown or the units have different dimensions
+
+    Example:
+        >>> rational_factor("lb", "mg")
+        Fraction(453592, 1)
+        >>> rational_factor("um", "in")
+        Fraction(1, 25400)
+    """
+    try:
+        return _FACTORS[from_unit, to_unit]
+    except KeyError:
+        pass
+    for unit in (from_unit, to_unit):
+        if unit not in _DIMENSIONS:
+            raise ValueError(f"Unknown unit: {unit!r}")
+    raise ValueError(
+        f"Cannot convert {_DIMENSIONS[from_unit]} in {_NAMES[from_unit]} "
+        f"to {_DIMENSIONS[to_unit]} in {_NAMES[to_unit]}"
+    )
+
+
+def _check_rounding(rounding: str) -> None:
+    """
+    Validate a rounding mode name.
+
+    Args:
+        rounding (str): The rounding mode
+
+    Raises:
+        ValueError: If rounding is not one of ROUNDING_MODES
+    """
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"Unknown rounding mode {rounding!r}, expected one of {ROUNDING_MODES}")
+
+
+def _divide(numerator: int, denominator: int, rounding: str) -> int:
+    """
+    Divide two integers, rounding the quotient according to a rounding mode.
+
+    Args:
+        numerator (int): The dividend
+        denominator (int): The divisor, which must be positive
+        rounding (str): One of ROUNDING_MODES
+
+    Returns:
+        int: The rounded quotient
+
+    Example:
+        >>> [_divide(n, 2, "half_even") for n in (1, 3, -1, -3)]
+        [0, 2, 0, -2]
+        >>> [_divide(n, 2, "half_up") for n in (1, 3, -1, -3)]
+        [1, 2, -1, -2]
+    """
+    quotient, remainder = divmod(numerator, denominator)
+    if not remainder or rounding == "floor":
+        return quotient
+    if rounding == "ceiling":
+        return quotient + 1
+    if rounding == "down":
+        return quotient + (numerator < 0)
+    twice = 2 * remainder
+    if twice != denominator:
+        return quotient + (twice > denominator)
+    if rounding == "half_up":
+        return quotient + (numerator > 0)
+    return quotient + (quotient & 1)
+
+
+def _validate(value: int, from_unit: str) -> None:
+    """
+    Validate a value with the validator of its unit's dimension.
+
+    Args:
+        value (int): The value to validate
+        from_unit (str): The unit of the value
+
+    Raises:
+        ValueError: If the value is negative
+    """
+    _, validator = _DIMENSION_MODULES[_DIMENSIONS[from_unit]]
+    validator(value, _NAMES[from_unit])
+
+
+def convert_int(value: int, from_unit: str, to_unit: str, rounding: str = "half_even") -> int:
+    """
+    Convert an integer quantity between two units with exact rational arithmetic.
+
+    Args:
+        value (int): The value to convert, e.g. a weight in integer milligrams
+        from_unit (str): The unit to convert from
+        to_unit (str): The unit to convert to
+        rounding (str): One of ROUNDING_MODES (default: ``"half_even"``)
+
+    Returns:
+        int: The converted value, rounded once
+
+    Raises:
+        ValueError: If value is negative, either unit is unknown, the units have
+            different dimensions, or rounding is unknown
+
+    Example:
+        >>> convert_int(1, "lb", "mg")
+        453592
+        >>> convert_int(2500, "g", "kg"), convert_int(2500, "g", "kg", rounding="half_up")
+        (2, 3)
+        >>> convert_int(1, "mi", "um")
+        1609344000
+        >>> convert_int(25400, "um", "in")
+        1
+    """
+    factor = rational_factor(from_unit, to_unit)
+    _check_rounding(rounding)
+    if value < 0:
+        _validate(value, from_unit)
+    return _divide(value * factor.numerator, factor.denominator, rounding)
+
+
+def as_int_view(values: IntBuffer) -> IntBuffer:
+    """
+    Return a flat int64 view of a batch of integer values.
+
+    Buffers already holding int64 data are viewed without copying; anything else
+    (other integer buffers, lists, iterables) is copied into a new ``array('q')``.
+
+    Args:
+        values (IntBuffer): The values to view
+
+    Returns:
+        IntBuffer: A 1-D ``memoryview`` of format ``'q'``, or an int64 ``ndarray`` if
+        values is a NumPy array
+
+    Raises:
+        TypeError: If values holds non-integer data
+
+    Example:
+        >>> as_int_view([1, 2]).tolist()
+        [1, 2]
+    """
+    if is_ndarray(values):
+        if values.dtype.kind not in "iu":
+            raise TypeError(f"Expected an integer array, not {values.dtype}")
+        return np.ascontiguousarray(values, dtype=np.int64).reshape(-1)
+    try:
+        view = memoryview(values)
+    except TypeError:
+        return memoryview(array("q", values))
+    if view.format in ("q", "l") and view.itemsize == 8 and view.c_contiguous:
+        return view.cast("B").cast("q")
+    return memoryview(array("q", view.tolist() if view.ndim != 1 else view))
+
+
+def _affine_terms(factor: Fraction, rounding: str) -> Tuple[int, int, int]:
+    """
+    Express a conversion of non-negative values as ``(value * a + b) // c``.
+
+    Args:
+        factor (Fraction): The exact conversion factor
+        rounding (str): One of ROUNDING_MODES
+
+    Returns:
+        Tuple[int, int, int]: The multiplier a, the offset b and the divisor c
+    """
+    numerator, denominator = factor.numerator, factor.denominator
+    if denominator == 1 or rounding in ("floor", "down"):
+        return numerator, 0, denominator
+    if rounding == "ceiling":
+        return numerator, denominator - 1, denominator
+    return 2 * numerator, denominator, 2 * denominator
+
+
+def _scale_python(view: IntBuffer, factor: Fraction, rounding: str) -> array:
+    """
+    Convert non-negative int64 values with C-level iteration over Python integers.
+
+    Args:
+        view (IntBuffer): A ``memoryview`` of format ``'q'``
+        factor (Fraction): The exact conversion factor
+        rounding (str): One of ROUNDING_MODES
+
+    Returns:
+        array: The converted values as an ``array('q')``
+
+    Raises:
+        ValueError: If a converted value does not fit in a 64-bit integer
+    """
+    multiplier, offset, divisor = _affine_terms(factor, rounding)
+    result = array("q")
+    for start in range(0, len(view), CHUNK_SIZE):
+        chunk = view[start : start + CHUNK_SIZE]
+        scaled = list(map(multiplier.__mul__, chunk))
+        if offset:
+            scaled = list(map(offset.__add__, scaled))
+        try:
+            quotients = array("q", map(divisor.__rfloordiv__, scaled))
+        except OverflowError:
+            raise ValueError(
+                f"Converted value in batch starting at {start} does not fit in 64 bits"
+            ) from None
+        if rounding == "half_even" and divisor != factor.denominator:
+            ties = compress(count(), map((0).__eq__, map(divisor.__rmod__, scaled)))
+            for index in ties:
+                quotients[index] -= quotients[index] & 1
+        result.extend(quotients)
+    return result
+
+
+def _scale_numpy(view: IntBuffer, factor: Fraction, rounding: str) -> IntBuffer:
+    """
+    Convert non-negative int64 values with vectorized NumPy integer arithmetic.
+
+    Values whose intermediate product would overflow int64 are converted with
+    Python integers instead.
+
+    Args:
+        view (IntBuffer): An int64 ``ndarray``
+        factor (Fraction): The exact conversion factor
+        rounding (str): One of ROUNDING_MODES
+
+    Returns:
+        IntBuffer: The converted values as an int64 ``ndarray``
+
+    Raises:
+        ValueError: If a converted value does not fit in a 64-bit integer
+    """
+    multiplier, offset, divisor = _affine_terms(factor, rounding)
+    largest = int(view.max()) if len(view) else 0
+    if largest * multiplier + offset > INT64_MAX:
+        return np.frombuffer(_scale_python(memoryview(view), factor, rounding), dtype=np.int64)
+    scaled = view * multiplier
+    if offset:
+        scaled += offset
+    result = scaled // divisor
+    if rounding == "half_even" and divisor != factor.denominator:
+        result -= (scaled % divisor == 0) & (result & 1 == 1)
+    return result
+
+
+def _write_into(out: IntBuffer, result: IntBuffer) -> None:
+    """
+    Copy converted values into a caller-supplied int64 buffer.
+
+    Args:
+        out (IntBuffer): The output buffer
+        result (IntBuffer): The converted values
+
+    Raises:
+        ValueError: If out is read-only, not int64, or has the wrong length
+    """
+    if is_ndarray(out):
+        if out.dtype != np.int64 or not out.flags.writeable or not out.flags.c_contiguous:
+            raise ValueError("Output array must be a writable, contiguous int64 array")
+        target = out.reshape(-1)
+    else:
+        target = memoryview(out)
+        if target.readonly or target.itemsize != 8 or target.format not in ("q", "l"):
+            raise ValueError("Output buffer must be a writable int64 buffer")
+        target = target.cast("B").cast("q")
+    if len(target) != len(result):
+        raise ValueError(f"Output buffer has {len(target)} elements, expected {len(result)}")
+    if is_ndarray(target):
+        target[:] = result
+    else:
+        target[:] = memoryview(result).cast("B").cast("q")
+
+
+def convert_int_batch(
+    values: IntBuffer,
+    from_unit: str,
+    to_unit: str,
+    out: IntBuffer = None,
+    rounding: str = "half_even",
+    validated: bool = False,
+) -> IntBuffer:
+    """
+    Convert a batch of integer quantities between two units with exact arithmetic.
+
+    Args:
+        values (IntBuffer): The values, as any int64 buffer, NumPy integer array or
+            iterable of integers
+        from_unit (str): The unit to convert from
+        to_unit (str): The unit to convert to
+        out (IntBuffer, optional): Writable int64 buffer to write results into
+            (default: None)
+        rounding (str): One of ROUNDING_MODES (default: ``"half_even"``)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+
+    Returns:
+        IntBuffer: The converted values; out if given, otherwise a new ``array('q')``
+        (or int64 ``ndarray`` for NumPy input)
+
+    Raises:
+        ValueError: If any value is negative (unless validated), either unit is
+            unknown, the units have different dimensions, rounding is unknown, out
+            has the wrong length, or a result does not fit in 64 bits
+
+    Example:
+        >>> convert_int_batch(array("q", [1, 2, 3]), "lb", "mg")
+        array('q', [453592, 907184, 1360776])
+        >>> convert_int_batch([500, 1500, 2500], "mg", "g")
+        array('q', [0, 2, 2])
+    """
+    factor = rational_factor(from_unit, to_unit)
+    _check_rounding(rounding)
+    view = as_int_view(values)
+    source = view if np is None or is_ndarray(view) else np.frombuffer(view, dtype=np.int64)
+    if not validated:
+        if np is not None:
+            negative = source < 0
+            index = int(negative.argmax()) if negative.any() else None
+        else:
+            index = next(compress(count(), map((0).__gt__, view)), None)
+        if index is not None:
+            _validate(int(view[index]), from_unit)
+    if np is None:
+        result = _scale_python(view, factor, rounding)
+    elif is_ndarray(view):
+        result = _scale_numpy(view, factor, rounding)
+    else:
+        result = array("q", _scale_numpy(source, factor, rounding).tobytes())
+    if out is None:
+        return result
+    _write_into(out, result)
+    return out
+
+
+def sum_int(
+    values: IntBuffer,
+    from_unit: Optional[str] = None,
+    to_unit: Optional[str] = None,
+    rounding: str = "half_even",
+) -> int:
+    """
+    Sum a batch of integer quantities exactly, optionally converting the total.
+
+    The total is converted once, so the only rounding is that of the final result.
+
+    Args:
+        values (IntBuffer): The values, as any int64 buffer, NumPy integer array or
+            iterable of integers
+        from_unit (str, optional): The unit of the values (default: None, no conversion)
+        to_unit (str, optional): The unit of the total (default: None, no conversion)
+        rounding (str): One of ROUNDING_MODES (default: ``"half_even"``)
+
+    Returns:
+        int: The exact total, never overflowing
+
+    Raises:
+        ValueError: If a conversion is requested and fails, or any value to convert is
+            negative
+
+    Example:
+        >>> sum_int(array("q", [INT64_MAX, INT64_MAX])) == 2 * INT64_MAX
+        True
+        >>> sum_int([300, 300, 400], "mg", "g")
+        1
+    """
+    view = as_int_view(values)
+    convert = from_unit is not None or to_unit is not None
+    if convert:
+        rational_factor(from_unit, to_unit)
+    if np is not None:
+        source = view if is_ndarray(view) else np.frombuffer(view, dtype=np.int64)
+        smallest = int(source.min()) if convert and len(source) else 0
+    else:
+        smallest = min(view, default=0) if convert else 0
+    if smallest < 0:
+        # Like the scalar conversions, reject every negative amount, not just the total
+        _validate(smallest, from_unit)
+    if np is not None:
+        total = 0
+        for start in range(0, len(source), 1 << 30):
+            chunk = source[start : start + (1 << 30)]
+            high = int((chunk >> 32).sum())
+            low = int((chunk & 0xFFFFFFFF).sum())
+            total += (high << 32) + low
+    else:
+        total = sum(view)
+    if from_unit is None and to_unit is None:
+        return total
+    return convert_int(total, from_unit, to_unit, rounding)
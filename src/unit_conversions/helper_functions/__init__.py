@@ -0,0 +1,19 @@
+"""
+Submodules are imported on first attribute access (PEP 562).
+"""
+
+from importlib import import_module
+
+_SUBMODULES = frozenset(
+    {"buffers", "codegen", "expressions", "patterns", "reductions", "simple_arithmetic"}
+)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES)
@@ -0,0 +1,240 @@
+"""
+Buffer Helpers Module
+
+This module provides helpers for applying arithmetic to whole batches of float64
+values held in buffer-protocol objects (``array.array('d')``, ``bytes``,
+``bytearray``, ``memoryview`` and, when installed, NumPy arrays).
+
+NumPy is optional. When it is available the kernels run vectorized; otherwise
+they fall back to C-level iteration over ``memoryview`` objects so that no
+Python function is called per element. NumPy is imported on first use by a
+kernel rather than at import time, so scalar code does not pay for it.
+"""
+
+import sys
+from array import array
+from importlib import import_module
+from importlib.util import find_spec
+from itertools import compress, count
+from types import ModuleType
+from typing import Any, Optional
+
+
+class _LazyModule(ModuleType):
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    After the import the module's namespace is copied into the stand-in, so later
+    attribute lookups cost the same as on the module itself.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        module = import_module(self.__name__)
+        self.__dict__.update(vars(module))
+        return getattr(module, name)
+
+
+# None if NumPy is not installed
+np = _LazyModule("numpy") if find_spec("numpy") is not None else None
+
+
+# Any object exposing float64 data through the buffer protocol, or a NumPy array
+FloatBuffer = Any
+
+# Number of elements processed per step when a temporary is unavoidable
+CHUNK_SIZE = 65536
+
+_BYTE_FORMATS = ("B", "b", "c")
+
+
+def is_ndarray(values: Any) -> bool:
+    """
+    Check whether an object is a NumPy array.
+
+    Args:
+        values (Any): The object to check
+
+    Returns:
+        bool: True if NumPy is installed and values is an ``ndarray``
+    """
+    # Nothing can be an ndarray before NumPy is imported, so do not import it to check
+    return np is not None and "numpy" in sys.modules and isinstance(values, np.ndarray)
+
+
+def as_float_view(values: FloatBuffer) -> FloatBuffer:
+    """
+    Return a flat, read-only-safe float64 view of a batch of values.
+
+    Buffers already holding float64 data are viewed without copying. Raw byte
+    buffers (``bytes``, ``bytearray``) are reinterpreted as native float64.
+    Anything else (other numeric buffers, lists, tuples, iterables) is copied
+    into a new ``array('d')``.
+
+    Args:
+        values (FloatBuffer): The values to view
+
+    Returns:
+        FloatBuffer: A 1-D ``memoryview`` of format ``'d'``, or a float64 ``ndarray``
+        if values is a NumPy array
+
+    Raises:
+        ValueError: If a byte buffer's length is not a multiple of 8
+
+    Example:
+        >>> view = as_float_view([1, 2.5])
+        >>> view.format, view.tolist()
+        ('d', [1.0, 2.5])
+    """
+    if is_ndarray(values):
+        return np.ascontiguousarray(values, dtype=np.float64).reshape(-1)
+    try:
+        view = memoryview(values)
+    except TypeError:
+        return memoryview(array("d", values))
+    if not view.c_contiguous:
+        view = memoryview(view.tobytes()).cast(view.format)
+    if view.format in _BYTE_FORMATS:
+        if view.nbytes % 8:
+            raise ValueError(f"Byte buffer length {view.nbytes} is not a multiple of 8")
+        return view.cast("B").cast("d")
+    if view.format == "d":
+        return view.cast("B").cast("d") if view.ndim != 1 else view
+    return memoryview(array("d", view.cast("B").cast(view.format)))
+
+
+def new_float_buffer(length: int, like: FloatBuffer = None) -> FloatBuffer:
+    """
+    Allocate a zero-filled float64 buffer.
+
+    Args:
+        length (int): Number of elements
+        like (FloatBuffer, optional): If a NumPy array, an ``ndarray`` is returned
+
+    Returns:
+        FloatBuffer: A new ``ndarray`` or ``array('d')`` of the given length
+
+    Example:
+        >>> new_float_buffer(3)
+        array('d', [0.0, 0.0, 0.0])
+    """
+    if is_ndarray(like):
+        return np.zeros(length, dtype=np.float64)
+    return array("d", bytes(8 * length))
+
+
+def as_output_view(out: FloatBuffer, length: int) -> FloatBuffer:
+    """
+    Return a writable float64 view of a caller-supplied output buffer.
+
+    Args:
+        out (FloatBuffer): The output buffer
+        length (int): The required number of elements
+
+    Returns:
+        FloatBuffer: A writable 1-D ``memoryview`` of format ``'d'``, or the ``ndarray``
+
+    Raises:
+        ValueError: If out is read-only, not float64, or has the wrong length
+    """
+    if is_ndarray(out):
+        if out.dtype != np.float64 or not out.flags.writeable or not out.flags.c_contiguous:
+            raise ValueError("Output array must be a writable, contiguous float64 array")
+        view = out.reshape(-1)
+    else:
+        view = memoryview(out)
+        if view.readonly:
+            raise ValueError("Output buffer must be writable")
+        if view.format in _BYTE_FORMATS and view.nbytes % 8 == 0:
+            view = view.cast("B").cast("d")
+        elif view.format != "d":
+            raise ValueError(f"Output buffer must hold float64 values, not '{view.format}'")
+        elif view.ndim != 1:
+            view = view.cast("B").cast("d")
+    if len(view) != length:
+        raise ValueError(f"Output buffer has {len(view)} elements, expected {length}")
+    return view
+
+
+def first_negative_index(view: FloatBuffer) -> Optional[int]:
+    """
+    Find the first negative value of a float64 view in a single pass.
+
+    NaN values are not considered negative, matching the scalar validators.
+
+    Args:
+        view (FloatBuffer): A view returned by :func:`as_float_view`
+
+    Returns:
+        Optional[int]: The index of the first negative value, or None
+
+    Example:
+        >>> first_negative_index(as_float_view([1.0, -2.0, -3.0]))
+        1
+        >>> first_negative_index(as_float_view([1.0, 2.0])) is None
+        True
+    """
+    if is_ndarray(view):
+        negative = view < 0
+        return int(negative.argmax()) if negative.any() else None
+    return next(compress(count(), map((0.0).__gt__, view)), None)
+
+
+def negative_indices(view: FloatBuffer) -> FloatBuffer:
+    """
+    Find the indices of all negative values of a float64 view in a single pass.
+
+    NaN values are not considered negative, matching the scalar validators.
+
+    Args:
+        view (FloatBuffer): A view returned by :func:`as_float_view`
+
+    Returns:
+        FloatBuffer: The indices, as an ``array('q')`` (or an integer ``ndarray`` for
+        NumPy input)
+
+    Example:
+        >>> negative_indices(as_float_view([1.0, -2.0, 3.0, -4.0]))
+        array('q', [1, 3])
+    """
+    if is_ndarray(view):
+        return np.flatnonzero(view < 0)
+    return array("q", compress(count(), map((0.0).__gt__, view)))
+
+
+def scale_into(view: FloatBuffer, factor: float, out: FloatBuffer = None) -> FloatBuffer:
+    """
+    Multiply every element of a float64 view by a constant factor.
+
+    Args:
+        view (FloatBuffer): A view returned by :func:`as_float_view`
+        factor (float): The factor to multiply by
+        out (FloatBuffer, optional): Buffer to write results into (default: None,
+            a new buffer is allocated)
+
+    Returns:
+        FloatBuffer: out if given, otherwise a new ``array('d')`` (or ``ndarray`` for
+        NumPy input) holding the products
+
+    Raises:
+        ValueError: If out is not a writable float64 buffer of matching length
+
+    Example:
+        >>> scale_into(as_float_view([1.0, 2.0]), 3.0)
+        array('d', [3.0, 6.0])
+    """
+    factor = float(factor)
+    length = len(view)
+    if out is None:
+        out = new_float_buffer(length, like=view)
+    target = as_output_view(out, length)
+    if np is not None:
+        source = view if is_ndarray(view) else np.frombuffer(view, dtype=np.float64)
+        if not is_ndarray(target):
+            target = np.frombuffer(target, dtype=np.float64)
+        np.multiply(source, factor, out=target)
+        return out
+    multiplier = factor.__mul__
+    for start in range(0, length, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, length)
+        target[start:stop] = array("d", map(multiplier, view[start:stop]))
+    return out
@@ -0,0 +1,33 @@
+"""
+Code Generation Helpers Module
+
+This module turns generated Python source into functions. It is shared by the
+conversion pipelines and the deferred arithmetic expressions, which both compile
+their steps into one specialized function instead of calling each step in turn.
+"""
+
+from typing import Any, Callable, Dict, List
+
+
+def define_function(lines: List[str], namespace: Dict[str, Any], name: str) -> Callable:
+    """
+    Execute generated source and return the function it defines.
+
+    Args:
+        lines (List[str]): The source lines
+        namespace (Dict[str, Any]): Globals for the generated function
+        name (str): Name of the function to return
+
+    Returns:
+        Callable: The generated function, with its source in ``__source__``
+
+    Example:
+        >>> square = define_function(["def square(x):", "    return x * x"], {}, "square")
+        >>> square(3), square.__source__
+        (9, 'def square(x):\\n    return x * x\\n')
+    """
+    source = "\n".join(lines) + "\n"
+    exec(compile(source, f"<{name}>", "exec"), namespace)
+    function = namespace[name]
+    function.__source__ = source
+    return function
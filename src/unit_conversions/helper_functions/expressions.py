@@ -0,0 +1,712 @@
+"""
+Deferred Arithmetic Expressions Module
+
+This module provides deferred versions of the ``simple_arithmetic`` operations.
+Instead of computing a result, ``add``, ``subtract``, ``multiply``, ``divide``,
+``power`` and ``negate`` (and the matching Python operators) build a small
+expression graph over named variables, which is evaluated later in one go:
+
+- operations whose operands are all constants are folded when the graph is built,
+  using the ``simple_arithmetic`` functions themselves (and, for powers, the same
+  function the compiled code uses), and multiplications or divisions by one are
+  dropped,
+- identical subexpressions are merged (``x * y`` and ``y * x`` are the same node)
+  and computed once per value,
+- the whole graph is compiled to one Python function. Over buffers it runs a single
+  fused pass: without NumPy as one generated loop with no intermediate buffers, with
+  NumPy block by block through small reused scratch buffers that stay in cache.
+
+Division by zero, including zero raised to a negative power, raises ValueError on
+every path, like ``simple_arithmetic.divide``. Other powers give the results of
+NumPy's ``power`` on every path, like ``simple_arithmetic.power_batch``: NaN for a
+negative base with a fractional exponent and an infinity for an overflow.
+"""
+
+from array import array
+from numbers import Real
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from . import simple_arithmetic
+from .buffers import (
+    CHUNK_SIZE,
+    FloatBuffer,
+    as_float_view,
+    as_output_view,
+    is_ndarray,
+    new_float_buffer,
+    np,
+)
+from .codegen import define_function
+
+# Number of elements evaluated per block on the NumPy path; small enough that the
+# scratch buffers stay in the CPU cache
+BLOCK_SIZE = 4096
+
+Operand = Union["Expression", float]
+
+
+def _power(base: float, exponent: float) -> float:
+    """
+    Raise a number to a power as NumPy's ``power`` does, but reject zero to a negative
+    power.
+
+    Args:
+        base (float): The base
+        exponent (float): The exponent
+
+    Returns:
+        float: base raised to the power of exponent, NaN or an infinity where ``**``
+        would return a complex number or overflow
+
+    Raises:
+        ZeroDivisionError: If base is zero and exponent is negative
+    """
+    if base == 0 and exponent < 0:
+        raise ZeroDivisionError("Cannot divide by zero")
+    return simple_arithmetic._float_power(base, exponent)
+
+
+# Operation name -> (function used for folding, Python operator, NumPy ufunc name)
+_OPERATIONS: Dict[str, Tuple[Callable, str, str]] = {
+    "add": (simple_arithmetic.add, "+", "add"),
+    "subtract": (simple_arithmetic.subtract, "-", "subtract"),
+    "multiply": (simple_arithmetic.multiply, "*", "multiply"),
+    "divide": (simple_arithmetic.divide, "/", "true_divide"),
+    "power": (_power, "**", "power"),
+    "negate": (simple_arithmetic.negate, "-", "negative"),
+}
+
+_COMMUTATIVE = frozenset(("add", "multiply"))
+
+
+class Expression:
+    """
+    A node of a deferred arithmetic expression.
+
+    Nodes are created with :func:`variable`, :func:`constant` and the operation
+    functions of this module, or with the ``+``, ``-``, ``*``, ``/``, ``**`` and unary
+    ``-`` operators.
+
+    Example:
+        >>> x, y = variable("x"), variable("y")
+        >>> area = (x + 1) * (y + 1) / 2
+        >>> area
+        Expression('((x + 1) * (y + 1)) / 2')
+        >>> area.evaluate(x=3, y=5)
+        12.0
+    """
+
+    __slots__ = ("operation", "operands", "_compiled")
+
+    def __init__(self, operation: str, operands: Tuple[Any, ...]):
+        self.operation = operation
+        self.operands = operands
+        self._compiled = None
+
+    def __add__(self, other: Operand) -> "Expression":
+        return add(self, other)
+
+    def __radd__(self, other: Operand) -> "Expression":
+        return add(other, self)
+
+    def __sub__(self, other: Operand) -> "Expression":
+        return subtract(self, other)
+
+    def __rsub__(self, other: Operand) -> "Expression":
+        return subtract(other, self)
+
+    def __mul__(self, other: Operand) -> "Expression":
+        return multiply(self, other)
+
+    def __rmul__(self, other: Operand) -> "Expression":
+        return multiply(other, self)
+
+    def __truediv__(self, other: Operand) -> "Expression":
+        return divide(self, other)
+
+    def __rtruediv__(self, other: Operand) -> "Expression":
+        return divide(other, self)
+
+    def __pow__(self, other: Operand) -> "Expression":
+        return power(self, other)
+
+    def __rpow__(self, other: Operand) -> "Expression":
+        return power(other, self)
+
+    def __neg__(self) -> "Expression":
+        return negate(self)
+
+    def __repr__(self) -> str:
+        return f"Expression({_format(self)!r})"
+
+    def variables(self) -> List[str]:
+        """
+        List the variables of the expression.
+
+        Returns:
+            List[str]: Variable names in sorted order, the argument order of
+            :meth:`compile`
+        """
+        names = set()
+        pending, seen = [self], set()
+        while pending:
+            node = pending.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            if node.operation == "variable":
+                names.add(node.operands[0])
+            elif node.operation != "constant":
+                pending.extend(node.operands)
+        return sorted(names)
+
+    def compile(self) -> "CompiledExpression":
+        """
+        Compile the expression, merging common subexpressions.
+
+        The result is cached on the expression.
+
+        Returns:
+            CompiledExpression: A callable evaluating the expression
+        """
+        if self._compiled is None:
+            self._compiled = CompiledExpression(self)
+        return self._compiled
+
+    def evaluate(self, out: FloatBuffer = None, **values: Any) -> Any:
+        """
+        Evaluate the expression.
+
+        Args:
+            out (FloatBuffer, optional): Float64 buffer for batch results (default: None)
+            **values (Any): A number or float64 buffer for every variable; numbers are
+                broadcast against buffers
+
+        Returns:
+            Any: A number if every value is a number, otherwise the results as out or
+            a new ``array('d')`` (or ``ndarray`` if any value is a NumPy array)
+
+        Raises:
+            ValueError: If a variable is missing, buffers differ in length, a divisor
+                is zero, or zero is raised to a negative power
+        """
+        return self.compile()(out=out, **values)
+
+
+def _node(value: Operand) -> Expression:
+    """Wrap a number in a constant node, leaving expressions unchanged."""
+    return value if isinstance(value, Expression) else constant(value)
+
+
+def _constant_value(node: Expression) -> Optional[Any]:
+    """Return the value of a constant node, or None for any other node."""
+    return node.operands[0] if node.operation == "constant" else None
+
+
+def variable(name: str) -> Expression:
+    """
+    Create a named input of an expression.
+
+    Args:
+        name (str): A Python identifier, not starting with an underscore and not
+            ``"out"``
+
+    Returns:
+        Expression: The variable node
+
+    Raises:
+        ValueError: If name is not allowed
+    """
+    if not name.isidentifier() or name.startswith("_") or name == "out":
+        raise ValueError(f"Invalid variable name: {name!r}")
+    return Expression("variable", (name,))
+
+
+def constant(value: float) -> Expression:
+    """
+    Create a constant node.
+
+    Args:
+        value (float): The number
+
+    Returns:
+        Expression: The constant node
+    """
+    return Expression("constant", (value,))
+
+
+def _operation(name: str, *operands: Operand) -> Expression:
+    """
+    Create an operation node, folding constants and identities.
+
+    Args:
+        name (str): A key of _OPERATIONS
+        *operands (Operand): The operands
+
+    Returns:
+        Expression: The folded or new node
+
+    Raises:
+        ValueError: If a constant divisor is zero, or zero is raised to a negative
+            constant power
+    """
+    nodes = tuple(map(_node, operands))
+    values = [_constant_value(node) for node in nodes]
+    if None not in values:
+        try:
+            return constant(_OPERATIONS[name][0](*values))
+        except ZeroDivisionError:
+            # Zero raised to a negative power
+            raise ValueError("Cannot divide by zero") from None
+    if name == "negate" and nodes[0].operation == "negate":
+        return nodes[0].operands[0]
+    if len(nodes) == 2:
+        if name == "divide" and values[1] == 0:
+            raise ValueError("Cannot divide by zero")
+        if name in ("multiply", "divide", "power") and values[1] == 1:
+            return nodes[0]
+        if name == "multiply" and values[0] == 1:
+            return nodes[1]
+        if name == "subtract" and values[1] == 0:
+            return nodes[0]
+    return Expression(name, nodes)
+
+
+def add(a: Operand, b: Operand) -> Expression:
+    """
+    Build the deferred sum of two operands.
+
+    Args:
+        a (Operand): The first operand, an expression or a number
+        b (Operand): The second operand
+
+    Returns:
+        Expression: The sum node
+    """
+    return _operation("add", a, b)
+
+
+def subtract(a: Operand, b: Operand) -> Expression:
+    """
+    Build the deferred difference of two operands.
+
+    Args:
+        a (Operand): The operand to subtract from
+        b (Operand): The operand to subtract
+
+    Returns:
+        Expression: The difference node
+    """
+    return _operation("subtract", a, b)
+
+
+def multiply(a: Operand, b: Operand) -> Expression:
+    """
+    Build the deferred product of two operands.
+
+    Args:
+        a (Operand): The first operand
+        b (Operand): The second operand
+
+    Returns:
+        Expression: The product node
+    """
+    return _operation("multiply", a, b)
+
+
+def divide(a: Operand, b: Operand) -> Expression:
+    """
+    Build the deferred quotient of two operands.
+
+    Args:
+        a (Operand): The dividend
+        b (Operand): The divisor
+
+    Returns:
+        Expression: The quotient node
+
+    Raises:
+        ValueError: If b is the constant zero
+    """
+    return _operation("divide", a, b)
+
+
+def power(a: Operand, b: Operand) -> Expression:
+    """
+    Build the deferred power of two operands.
+
+    Args:
+        a (Operand): The base
+        b (Operand): The exponent
+
+    Returns:
+        Expression: The power node
+
+    Example:
+        >>> power(variable("x"), 2 * 1.5)
+        Expression('x ** 3.0')
+    """
+    return _operation("power", a, b)
+
+
+def negate(a: Operand) -> Expression:
+    """
+    Build the deferred negation of an operand.
+
+    Args:
+        a (Operand): The operand
+
+    Returns:
+        Expression: The negation node
+    """
+    return _operation("negate", a)
+
+
+def _format(node: Expression) -> str:
+    """Format an expression as infix text, parenthesizing nested operations."""
+    if node.operation in ("variable", "constant"):
+        return str(node.operands[0])
+    texts = [
+        _format(child) if child.operation in ("variable", "constant") else f"({_format(child)})"
+        for child in node.operands
+    ]
+    symbol = _OPERATIONS[node.operation][1]
+    return f"{symbol}{texts[0]}" if len(texts) == 1 else f"{texts[0]} {symbol} {texts[1]}"
+
+
+class CompiledExpression:
+    """
+    An expression compiled into a graph of unique nodes in evaluation order.
+
+    Calling it evaluates the expression on numbers or buffers; see
+    :meth:`Expression.evaluate`.
+
+    Args:
+        expression (Expression): The expression to compile
+
+    Example:
+        >>> x, y = variable("x"), variable("y")
+        >>> compiled = ((x * y) + (y * x) ** 2).compile()
+        >>> print(compiled.source, end="")
+        def expression(x, y):
+            _t2 = x * y
+            _t4 = _power(_t2, 2)
+            return _t2 + _t4
+        >>> compiled(x=[1.0, 2.0], y=3.0)
+        array('d', [12.0, 42.0])
+    """
+
+    def __init__(self, expression: Expression):
+        self.variables = expression.variables()
+        self._nodes: List[Tuple[str, Tuple[Any, ...]]] = []
+        self._uses: List[int] = []
+        self._root = self._intern(expression, {}, {})
+        self._scalar = self._define_scalar()
+        self.source: str = self._scalar.__source__
+        self._batch_loops: Dict[Tuple[str, ...], Callable] = {}
+
+    def _intern(
+        self, node: Expression, by_identity: Dict[int, int], by_key: Dict[tuple, int]
+    ) -> int:
+        """
+        Add a node and its operands to the graph, merging identical subexpressions.
+
+        Args:
+            node (Expression): The node
+            by_identity (Dict[int, int]): Graph index of every node already visited
+            by_key (Dict[tuple, int]): Graph index of every (operation, operands) key
+
+        Returns:
+            int: The graph index of the node
+        """
+        known = by_identity.get(id(node))
+        if known is not None:
+            self._uses[known] += 1
+            return known
+        if node.operation in ("variable", "constant"):
+            key = (node.operation, node.operands[0], type(node.operands[0]))
+        else:
+            children = tuple(self._intern(child, by_identity, by_key) for child in node.operands)
+            if node.operation in _COMMUTATIVE:
+                children = tuple(sorted(children))
+            key = (node.operation, children)
+        index = by_key.get(key)
+        if index is None:
+            index = by_key[key] = len(self._nodes)
+            self._nodes.append((node.operation, key[1] if len(key) == 2 else node.operands))
+            self._uses.append(0)
+        self._uses[index] += 1
+        by_identity[id(node)] = index
+        return index
+
+    def _term(self, index: int) -> str:
+        """Return the source text of a leaf, or the temporary name of an operation."""
+        operation, operands = self._nodes[index]
+        if operation == "variable":
+            return operands[0]
+        if operation == "constant":
+            return repr(operands[0])
+        return f"_t{index}"
+
+    def _define_scalar(self) -> Callable:
+        """
+        Generate the scalar function, one statement per operation node.
+
+        Returns:
+            Callable: The generated function, with its source in ``__source__``
+        """
+        lines = [f"def expression({', '.join(self.variables)}):"]
+        for index, (operation, operands) in enumerate(self._nodes):
+            if operation in ("variable", "constant"):
+                continue
+            terms = [self._term(child) for child in operands]
+            if operation == "divide":
+                lines.append(f"    if {terms[1]} == 0:")
+                lines.append('        raise ValueError("Cannot divide by zero")')
+            elif operation == "power":
+                conditions = [
+                    condition
+                    for child, condition in zip(operands, (f"{terms[0]} == 0", f"{terms[1]} < 0"))
+                    if self._nodes[child][0] != "constant"
+                ]
+                base, exponent = (self._nodes[child] for child in operands)
+                if (base[0] != "constant" or base[1][0] == 0) and (
+                    exponent[0] != "constant" or exponent[1][0] < 0
+                ):
+                    lines.append(f"    if {' and '.join(conditions)}:")
+                    lines.append('        raise ValueError("Cannot divide by zero")')
+            if operation == "negate":
+                expression = f"-{terms[0]}"
+            elif operation == "power":
+                expression = f"_power({terms[0]}, {terms[1]})"
+            else:
+                expression = f" {_OPERATIONS[operation][1]} ".join(terms)
+            if index == self._root:
+                lines.append(f"    return {expression}")
+            else:
+                lines.append(f"    _t{index} = {expression}")
+        if len(lines) == 1:
+            lines.append(f"    return {self._term(self._root)}")
+        return define_function(lines, {"_power": _power}, "expression")
+
+    def _inline(self, index: int, emitted: set, statements: List[str]) -> str:
+        """
+        Build a Python expression for a node, binding shared nodes once.
+
+        Operations used more than once are bound to a temporary by an assignment
+        statement, appended after the statements of their own operands, and the
+        expression refers to the temporary.
+
+        Args:
+            index (int): The graph index of the node
+            emitted (set): Shared nodes already bound
+            statements (List[str]): Assignments of shared nodes, in evaluation order
+
+        Returns:
+            str: The expression text
+        """
+        operation, operands = self._nodes[index]
+        if operation in ("variable", "constant"):
+            return self._term(index)
+        if index in emitted:
+            return f"_t{index}"
+        terms = [self._inline(child, emitted, statements) for child in operands]
+        if operation == "negate":
+            text = f"(-{terms[0]})"
+        elif operation == "power":
+            text = f"_power({terms[0]}, {terms[1]})"
+        else:
+            text = f"({f' {_OPERATIONS[operation][1]} '.join(terms)})"
+        if self._uses[index] > 1:
+            emitted.add(index)
+            statements.append(f"_t{index} = {text}")
+            return f"_t{index}"
+        return text
+
+    def _batch_loop(self, arrays: Tuple[str, ...]) -> Callable:
+        """
+        Generate the fused pure-Python loop for one choice of buffer variables.
+
+        Args:
+            arrays (Tuple[str, ...]): The variables holding buffers, in sorted order
+
+        Returns:
+            Callable: A function ``(_target, _start, _stop, **values)`` filling
+            ``_target[_start:_stop]``, where buffer variables are passed with a
+            leading underscore
+        """
+        loop = self._batch_loops.get(arrays)
+        if loop is None:
+            statements: List[str] = []
+            body = self._inline(self._root, set(), statements)
+            scalars = [name for name in self.variables if name not in arrays]
+            parameters = ["_target", "_start", "_stop"] + scalars + [f"_{name}" for name in arrays]
+            sources = ", ".join(f"_{name}[_start:_stop]" for name in arrays)
+            targets = ", ".join(arrays) + ("," if len(arrays) == 1 else "")
+            lines = [
+                f"def batch_loop({', '.join(parameters)}):",
+                "    _results = []",
+                "    _append = _results.append",
+                f"    for {targets} in _zip({sources}):",
+                *(f"        {statement}" for statement in statements),
+                f"        _append({body})",
+                "    _target[_start:_stop] = _array('d', _results)",
+            ]
+            namespace = {"_array": array, "_power": _power, "_zip": zip}
+            loop = self._batch_loops[arrays] = define_function(lines, namespace, "batch_loop")
+        return loop
+
+    def __call__(self, out: FloatBuffer = None, **values: Any) -> Any:
+        missing = [name for name in self.variables if name not in values]
+        if missing:
+            raise ValueError(f"Missing values for variables: {', '.join(missing)}")
+        views, scalars, length, like = {}, {}, None, None
+        for name in self.variables:
+            value = values[name]
+            if isinstance(value, Real):
+                scalars[name] = value
+                continue
+            view = views[name] = as_float_view(value)
+            if length is None:
+                length = len(view)
+            elif len(view) != length:
+                raise ValueError(f"Variable {name!r} has {len(view)} values, expected {length}")
+            if is_ndarray(view):
+                like = view
+        if length is None:
+            return self._scalar(**scalars)
+        if out is None:
+            out = new_float_buffer(length, like=like)
+        target = as_output_view(out, length)
+        if np is not None:
+            self._run_blocks(views, scalars, target, length)
+        else:
+            self._run_loop(views, scalars, target, length)
+        return out
+
+    def _run_loop(
+        self,
+        views: Dict[str, FloatBuffer],
+        scalars: Dict[str, float],
+        target: FloatBuffer,
+        length: int,
+    ) -> None:
+        """
+        Evaluate over buffers with the fused pure-Python loop, chunk by chunk.
+
+        Args:
+            views (Dict[str, FloatBuffer]): Float64 views of the buffer variables
+            scalars (Dict[str, float]): The number variables
+            target (FloatBuffer): The output view
+            length (int): The number of values
+
+        Raises:
+            ValueError: If a divisor is zero or zero is raised to a negative power, with
+                the index of the first such value
+        """
+        names = tuple(sorted(views))
+        loop = self._batch_loop(names)
+        arguments = dict(scalars, **{f"_{name}": view for name, view in views.items()})
+        for start in range(0, length, CHUNK_SIZE):
+            stop = min(start + CHUNK_SIZE, length)
+            try:
+                loop(target, start, stop, **arguments)
+            except ZeroDivisionError:
+                for index in range(start, stop):
+                    row = {name: views[name][index] for name in names}
+                    try:
+                        self._scalar(**scalars, **row)
+                    except ValueError as error:
+                        raise ValueError(f"{error} at index {index}") from None
+                raise
+
+    def _run_blocks(
+        self,
+        views: Dict[str, FloatBuffer],
+        scalars: Dict[str, float],
+        target: FloatBuffer,
+        length: int,
+    ) -> None:
+        """
+        Evaluate over buffers with NumPy ufuncs, block by block through scratch buffers.
+
+        Args:
+            views (Dict[str, FloatBuffer]): Float64 views of the buffer variables
+            scalars (Dict[str, float]): The number variables
+            target (FloatBuffer): The output view
+            length (int): The number of values
+
+        Raises:
+            ValueError: If a divisor is zero or zero is raised to a negative power, with
+                the index of the first such value
+        """
+        arrays = {
+            name: view if is_ndarray(view) else np.frombuffer(view, dtype=np.float64)
+            for name, view in views.items()
+        }
+        result = target if is_ndarray(target) else np.frombuffer(target, dtype=np.float64)
+        program, scratch_count = self._program()
+        scratch = [np.empty(BLOCK_SIZE) for _ in range(scratch_count)]
+        for start in range(0, length, BLOCK_SIZE):
+            stop = min(start + BLOCK_SIZE, length)
+            size = stop - start
+            slots: Dict[int, Any] = {}
+            for index, (operation, operands) in enumerate(self._nodes):
+                if operation == "variable":
+                    name = operands[0]
+                    slots[index] = (
+                        arrays[name][start:stop] if name in arrays else float(scalars[name])
+                    )
+                elif operation == "constant":
+                    slots[index] = operands[0]
+            for index, ufunc, operands, buffer in program:
+                inputs = [slots[child] for child in operands]
+                if ufunc is np.true_divide:
+                    invalid = np.asarray(inputs[1]) == 0
+                elif ufunc is np.power:
+                    invalid = (np.asarray(inputs[0]) == 0) & (np.asarray(inputs[1]) < 0)
+                else:
+                    invalid = None
+                if invalid is not None:
+                    zero = np.flatnonzero(invalid)
+                    if len(zero):
+                        position = start + int(zero[0]) if np.ndim(invalid) else start
+                        raise ValueError(f"Cannot divide by zero at index {position}")
+                output = result[start:stop] if buffer is None else scratch[buffer][:size]
+                ufunc(*inputs, out=output)
+                slots[index] = output
+            if not program:
+                result[start:stop] = slots[self._root]
+
+    def _program(self) -> Tuple[List[Tuple[int, Any, Tuple[int, ...], Optional[int]]], int]:
+        """
+        Translate the graph into ufunc instructions with reused scratch buffers.
+
+        The root writes straight into the output; every other operation gets a
+        scratch buffer that is released after its last use.
+
+        Returns:
+            Tuple[List[...], int]: (node index, ufunc, operand indices, scratch buffer
+            or None for the output) per operation, and the number of scratch buffers
+        """
+        last_use: Dict[int, int] = {}
+        for index, (operation, operands) in enumerate(self._nodes):
+            if operation not in ("variable", "constant"):
+                for child in operands:
+                    last_use[child] = index
+        program, buffers, free, count = [], {}, [], 0
+        for index, (operation, operands) in enumerate(self._nodes):
+            if operation in ("variable", "constant"):
+                continue
+            for child in set(operands):
+                if last_use[child] == index and child in buffers:
+                    free.append(buffers[child])
+            buffer = None
+            if index != self._root:
+                if free:
+                    buffer = free.pop()
+                else:
+                    buffer, count = count, count + 1
+                buffers[index] = buffer
+            program.append((index, getattr(np, _OPERATIONS[operation][2]), operands, buffer))
+        return program, count
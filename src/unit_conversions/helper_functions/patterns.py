@@ -0,0 +1,46 @@
+"""
+Pattern Helpers Module
+
+This module builds regular expressions shared by the text scanners of the package,
+such as the unit parser's alias matcher and the multi-replacement table.
+"""
+
+import re
+from typing import Dict, Iterable
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Compile words into a character trie rendered as a regular expression.
+
+    Each trie node becomes one group of alternatives, one per next character, so the
+    regex engine never retries a shared prefix. Optional continuations are greedy:
+    at a given position the longest word matches first.
+
+    Args:
+        words (Iterable[str]): The words to match
+
+    Returns:
+        str: A pattern matching exactly the words
+
+    Example:
+        >>> trie_pattern(["in", "inch", "inches"])
+        'in(?:ch(?:es)?)?'
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for character in word:
+            node = node.setdefault(character, {})
+        node[""] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        branches = [re.escape(key) + render(child) for key, child in sorted(node.items()) if key]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" not in node:
+            return body
+        return f"(?:{body})?" if len(branches) == 1 and len(branches[0]) > 1 else f"{body}?"
+
+    return render(trie)
@@ -0,0 +1,305 @@
+"""
+Reductions Module
+
+This module reduces large batches of float64 values (sums, means, minima, maxima
+and dot products) with compensated arithmetic, chunk by chunk, so that buffers of
+any size and one-shot iterables can be processed in constant memory.
+
+Each chunk is summed accurately in C: with ``math.fsum`` (correctly rounded) or,
+when NumPy is installed, with NumPy's pairwise summation. Chunk sums are then
+accumulated with Neumaier's compensated addition into a (sum, error) pair, so the
+result does not drift with the number of chunks. Running state is kept in a
+``Summary``, which can be merged with summaries of other parts of the data, e.g.
+computed by other workers.
+"""
+
+import math
+import operator
+from array import array
+from itertools import islice
+from typing import Iterable, Iterator, Tuple
+
+from .buffers import CHUNK_SIZE, FloatBuffer, as_float_view, is_ndarray, np
+
+
+def _neumaier_add(total: float, error: float, value: float) -> Tuple[float, float]:
+    """
+    Add a value to a compensated (sum, error) pair with Neumaier's algorithm.
+
+    Args:
+        total (float): The running sum
+        error (float): The accumulated rounding error of the running sum
+        value (float): The value to add
+
+    Returns:
+        Tuple[float, float]: The new sum and error
+    """
+    result = total + value
+    if not math.isfinite(result):
+        return result, 0.0
+    if abs(total) >= abs(value):
+        error += (total - result) + value
+    else:
+        error += (value - result) + total
+    return result, error
+
+
+def _chunks(values: Iterable[float], chunk_size: int) -> Iterator[FloatBuffer]:
+    """
+    Split values into float64 chunks without copying buffers.
+
+    Args:
+        values (Iterable[float]): Any float64 buffer, NumPy array or iterable of numbers
+        chunk_size (int): Number of values per chunk
+
+    Yields:
+        FloatBuffer: ``memoryview`` (or ``ndarray``) chunks of at most chunk_size values
+    """
+    if not isinstance(values, Iterator):
+        view = as_float_view(values)
+        for start in range(0, len(view), chunk_size):
+            yield view[start : start + chunk_size]
+        return
+    iterator = iter(values)
+    while True:
+        chunk = array("d", islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield memoryview(chunk)
+
+
+def _chunk_sum(chunk: FloatBuffer) -> float:
+    """Sum one chunk in C: pairwise with NumPy, otherwise correctly rounded."""
+    if np is not None:
+        source = chunk if is_ndarray(chunk) else np.frombuffer(chunk, dtype=np.float64)
+        return float(source.sum())
+    try:
+        return math.fsum(chunk)
+    except (OverflowError, ValueError):
+        # fsum raises where NumPy gives an infinity or NaN; a plain sum gives them too
+        return sum(chunk)
+
+
+def _nan_min(a: float, b: float) -> float:
+    """The smaller of two numbers, or NaN if either is NaN, as NumPy's ``min``."""
+    return a if a != a or a < b else b
+
+
+def _nan_max(a: float, b: float) -> float:
+    """The larger of two numbers, or NaN if either is NaN, as NumPy's ``max``."""
+    return a if a != a or a > b else b
+
+
+class Summary:
+    """
+    Mergeable running count, compensated sum, minimum and maximum of some values.
+
+    As with NumPy, the minimum and maximum are NaN if any value is NaN.
+
+    Example:
+        >>> left = Summary().update([1.5, 2.5])
+        >>> right = Summary().update(iter([4.0, -2.0]))
+        >>> left.merge(right)
+        Summary(count=4, sum=6.0, minimum=-2.0, maximum=4.0)
+    """
+
+    __slots__ = ("count", "minimum", "maximum", "_total", "_error")
+
+    def __init__(self):
+        self.count = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self._total = 0.0
+        self._error = 0.0
+
+    def update(self, values: Iterable[float], chunk_size: int = CHUNK_SIZE) -> "Summary":
+        """
+        Add a batch of values, chunk by chunk.
+
+        Args:
+            values (Iterable[float]): Any float64 buffer, NumPy array or iterable of
+                numbers
+            chunk_size (int): Number of values per chunk (default: CHUNK_SIZE)
+
+        Returns:
+            Summary: This summary, for chaining
+        """
+        for chunk in _chunks(values, chunk_size):
+            if not len(chunk):
+                continue
+            self.count += len(chunk)
+            total = _chunk_sum(chunk)
+            self._total, self._error = _neumaier_add(self._total, self._error, total)
+            if is_ndarray(chunk):
+                low, high = float(chunk.min()), float(chunk.max())
+            elif math.isnan(total) and any(map(math.isnan, chunk)):
+                # min and max skip NaN depending on its position; NumPy returns it
+                low = high = math.nan
+            else:
+                low, high = min(chunk), max(chunk)
+            self.minimum = _nan_min(self.minimum, low)
+            self.maximum = _nan_max(self.maximum, high)
+        return self
+
+    def merge(self, other: "Summary") -> "Summary":
+        """
+        Combine this summary with the summary of other values.
+
+        Args:
+            other (Summary): The other summary
+
+        Returns:
+            Summary: A new summary of both sets of values
+        """
+        merged = Summary()
+        merged.count = self.count + other.count
+        merged.minimum = _nan_min(self.minimum, other.minimum)
+        merged.maximum = _nan_max(self.maximum, other.maximum)
+        total, error = _neumaier_add(self._total, self._error + other._error, other._total)
+        merged._total, merged._error = total, error
+        return merged
+
+    @property
+    def sum(self) -> float:
+        """float: The compensated sum of the values (0.0 if there are none)."""
+        return self._total + self._error if math.isfinite(self._total) else self._total
+
+    @property
+    def mean(self) -> float:
+        """
+        float: The mean of the values.
+
+        Raises:
+            ValueError: If there are no values
+        """
+        if not self.count:
+            raise ValueError("Cannot compute the mean of no values")
+        return self.sum / self.count
+
+    def __repr__(self) -> str:
+        return (
+            f"Summary(count={self.count}, sum={self.sum!r}, "
+            f"minimum={self.minimum!r}, maximum={self.maximum!r})"
+        )
+
+
+def summarize(values: Iterable[float], chunk_size: int = CHUNK_SIZE) -> Summary:
+    """
+    Compute the count, compensated sum, minimum and maximum of values in one call.
+
+    Args:
+        values (Iterable[float]): Any float64 buffer, NumPy array or iterable of numbers
+        chunk_size (int): Number of values per chunk (default: CHUNK_SIZE)
+
+    Returns:
+        Summary: The mergeable summary
+
+    Example:
+        >>> summarize(range(1, 5))
+        Summary(count=4, sum=10.0, minimum=1.0, maximum=4.0)
+    """
+    return Summary().update(values, chunk_size)
+
+
+def sum_values(values: Iterable[float], chunk_size: int = CHUNK_SIZE) -> float:
+    """
+    Sum values with compensated, chunked summation.
+
+    Args:
+        values (Iterable[float]): Any float64 buffer, NumPy array or iterable of numbers
+        chunk_size (int): Number of values per chunk (default: CHUNK_SIZE)
+
+    Returns:
+        float: The sum
+
+    Example:
+        >>> sum_values([0.1] * 10)
+        1.0
+    """
+    total, error = 0.0, 0.0
+    for chunk in _chunks(values, chunk_size):
+        total, error = _neumaier_add(total, error, _chunk_sum(chunk))
+    return total + error if math.isfinite(total) else total
+
+
+def mean(values: Iterable[float], chunk_size: int = CHUNK_SIZE) -> float:
+    """
+    Compute the mean of values with compensated, chunked summation.
+
+    Args:
+        values (Iterable[float]): Any float64 buffer, NumPy array or iterable of numbers
+        chunk_size (int): Number of values per chunk (default: CHUNK_SIZE)
+
+    Returns:
+        float: The mean
+
+    Raises:
+        ValueError: If there are no values
+
+    Example:
+        >>> mean([1.0, 2.0, 4.0])
+        2.3333333333333335
+    """
+    return summarize(values, chunk_size).mean
+
+
+def min_max(values: Iterable[float], chunk_size: int = CHUNK_SIZE) -> Tuple[float, float]:
+    """
+    Find the smallest and largest of some values.
+
+    Args:
+        values (Iterable[float]): Any float64 buffer, NumPy array or iterable of numbers
+        chunk_size (int): Number of values per chunk (default: CHUNK_SIZE)
+
+    Returns:
+        Tuple[float, float]: The minimum and maximum
+
+    Raises:
+        ValueError: If there are no values
+
+    Example:
+        >>> min_max([3.0, -1.0, 2.0])
+        (-1.0, 3.0)
+    """
+    summary = summarize(values, chunk_size)
+    if not summary.count:
+        raise ValueError("Cannot compute the minimum and maximum of no values")
+    return summary.minimum, summary.maximum
+
+
+def dot(a: FloatBuffer, b: FloatBuffer, chunk_size: int = CHUNK_SIZE) -> float:
+    """
+    Compute the dot product of two batches with compensated, chunked summation.
+
+    Args:
+        a (FloatBuffer): The first values, as any float64 buffer, NumPy array or sequence
+        b (FloatBuffer): The second values, of the same length
+        chunk_size (int): Number of values per chunk (default: CHUNK_SIZE)
+
+    Returns:
+        float: The sum of the element-wise products
+
+    Raises:
+        ValueError: If a and b have different lengths
+
+    Example:
+        >>> dot([1.0, 2.0, 3.0], [4.0, 5.0, 6.0])
+        32.0
+    """
+    first, second = as_float_view(a), as_float_view(b)
+    if len(first) != len(second):
+        raise ValueError(f"Operands have different lengths: {len(first)} and {len(second)}")
+    if np is not None:
+        first, second = (
+            view if is_ndarray(view) else np.frombuffer(view, dtype=np.float64)
+            for view in (first, second)
+        )
+    total, error = 0.0, 0.0
+    for start in range(0, len(first), chunk_size):
+        stop = start + chunk_size
+        if np is not None:
+            partial = float(np.dot(first[start:stop], second[start:stop]))
+        else:
+            partial = math.fsum(map(operator.mul, first[start:stop], second[start:stop]))
+        total, error = _neumaier_add(total, error, partial)
+    return total + error if math.isfinite(total) else total
@@ -2,8 +2,32 @@
 Simple Arithmetic Operations Module
 
 This module provides basic arithmetic functions for demonstration purposes.
+Each function also has a ``*_batch`` variant that applies it element-wise to
+whole buffers of values, broadcasting single numbers against batches. Instead of
+aborting, the division batch functions can fill zero-divisor positions with a
+chosen value and report them in a mask.
 """
 
+import math
+import operator
+from array import array
+from itertools import compress, count, repeat
+from numbers import Real
+from typing import Any, Callable, Iterable, Optional, Tuple, Union
+
+from .buffers import (
+    CHUNK_SIZE,
+    FloatBuffer,
+    as_float_view,
+    as_output_view,
+    is_ndarray,
+    new_float_buffer,
+    np,
+)
+
+# A single number, broadcast against batches, or a batch of values
+Operand = Union[float, FloatBuffer]
+
 
 def add(a: float, b: float) -> float:
     """
@@ -178,3 +202,489 @@ def negate(a: float) -> float:
         -5
     """
     return -a
+
+
+def _broadcast(a: Operand, b: Operand) -> Tuple[Any, Any, int, FloatBuffer]:
+    """
+    Turn two operands into float64 views, or floats for numbers.
+    
+    Args:
+        a (Operand): A number or a batch of values
+        b (Operand): A number or a batch of values
+    
+    Returns:
+        Tuple[Any, Any, int, FloatBuffer]: The two operands, the batch length (1 if
+        both are numbers) and the first NumPy input (or None)
+    
+    Raises:
+        ValueError: If both operands are batches of different lengths
+    """
+    operands, length, like = [], None, None
+    for operand in (a, b):
+        if isinstance(operand, Real):
+            operands.append(float(operand))
+            continue
+        view = as_float_view(operand)
+        if length is not None and len(view) != length:
+            raise ValueError(f"Operands have different lengths: {length} and {len(view)}")
+        length = len(view)
+        if like is None and is_ndarray(view):
+            like = view
+        operands.append(view)
+    return operands[0], operands[1], 1 if length is None else length, like
+
+
+def _chunk(operand: Any, start: int, stop: int) -> Iterable[float]:
+    """Return the values of an operand between two indices, repeating numbers."""
+    return repeat(operand, stop - start) if isinstance(operand, float) else operand[start:stop]
+
+
+def _as_ndarray(operand: Any) -> Any:
+    """Wrap a float64 view in an ``ndarray`` without copying; pass anything else through."""
+    return (
+        operand
+        if isinstance(operand, float) or is_ndarray(operand)
+        else np.frombuffer(operand, dtype=np.float64)
+    )
+
+
+def _mask_view(mask: Any, length: int) -> memoryview:
+    """
+    Return a writable byte view of a caller-supplied mask buffer.
+    
+    Args:
+        mask (Any): A writable buffer with one byte per element, e.g. a ``bytearray``
+        length (int): The required number of elements
+    
+    Returns:
+        memoryview: A 1-D ``memoryview`` of format ``'B'``
+    
+    Raises:
+        ValueError: If mask is read-only, not byte-sized or has the wrong length
+    """
+    view = memoryview(mask)
+    if view.readonly or view.itemsize != 1:
+        raise ValueError("Mask must be a writable buffer of one byte per element")
+    view = view.cast("B")
+    if len(view) != length:
+        raise ValueError(f"Mask has {len(view)} elements, expected {length}")
+    return view
+
+
+def _zero_indices(divisor: Any, length: int) -> FloatBuffer:
+    """
+    Find the positions of zero divisors in a single pass.
+    
+    Args:
+        divisor (Any): A float, a float64 view or an ``ndarray``
+        length (int): The batch length
+    
+    Returns:
+        FloatBuffer: The indices, as an ``array('q')`` or integer ``ndarray``
+    """
+    if isinstance(divisor, float):
+        return array("q", range(length) if divisor == 0 else ())
+    if np is not None:
+        source = divisor if is_ndarray(divisor) else np.frombuffer(divisor, dtype=np.float64)
+        return np.flatnonzero(source == 0)
+    return array("q", compress(count(), map((0.0).__eq__, divisor)))
+
+
+def _float_power(a: float, b: float) -> float:
+    """
+    Raise a number to a power with the float64 results NumPy's ``power`` gives.
+    
+    Where ``**`` would return a complex number or raise, the result is NaN for a
+    negative base with a fractional exponent and an infinity for an overflow or for
+    zero raised to a negative power.
+    
+    Args:
+        a (float): The base
+        b (float): The exponent
+    
+    Returns:
+        float: a raised to the power of b
+    
+    Example:
+        >>> _float_power(-8.0, 0.5), _float_power(-0.0, -1.0), _float_power(-10.0, 401.0)
+        (nan, -inf, -inf)
+    """
+    try:
+        result = a ** b
+    except ZeroDivisionError:
+        # Only an odd integer exponent keeps the sign of a negative zero
+        return math.copysign(math.inf, a) if b % 2 == 1 else math.inf
+    except OverflowError:
+        if a < 0 and b % 1:
+            return math.nan
+        return -math.inf if a < 0 and b % 2 == 1 else math.inf
+    return math.nan if isinstance(result, complex) else result
+
+
+# Names of the NumPy equivalents of the functions used by the batch variants
+_UFUNCS = {
+    operator.add: "add",
+    operator.sub: "subtract",
+    operator.mul: "multiply",
+    operator.truediv: "true_divide",
+    _float_power: "power",
+    operator.mod: "remainder",
+    operator.floordiv: "floor_divide",
+    operator.abs: "absolute",
+    operator.neg: "negative",
+}
+
+
+def _elementwise(
+    operation: Callable[[float, float], float],
+    a: Operand,
+    b: Operand,
+    out: FloatBuffer,
+    zero_message: Optional[str] = None,
+    fill: Optional[float] = None,
+    mask: Any = None,
+) -> FloatBuffer:
+    """
+    Apply a binary operation element-wise, broadcasting numbers against batches.
+    
+    Zero divisors are found in one pass before anything is computed. They are
+    replaced by one for the computation and their results overwritten by fill.
+    
+    Args:
+        operation (Callable[[float, float], float]): An ``operator`` function or
+            ``_float_power``
+        a (Operand): The first operand
+        b (Operand): The second operand
+        out (FloatBuffer): Buffer to write results into, or None to allocate one
+        zero_message (str, optional): Error message for zero divisors, for operations
+            that reject them (default: None)
+        fill (float, optional): Result at zero-divisor positions instead of raising
+        mask (Any, optional): Byte buffer set to 1 at zero-divisor positions and 0
+            elsewhere; if given without fill, those results are NaN
+    
+    Returns:
+        FloatBuffer: out if given, otherwise a new ``array('d')`` (or ``ndarray``)
+    
+    Raises:
+        ValueError: If a divisor is zero and neither fill nor mask is given, the
+            operands have different lengths, or out or mask do not match
+    """
+    a, b, length, like = _broadcast(a, b)
+    if out is None:
+        out = new_float_buffer(length, like=like)
+    target = as_output_view(out, length)
+    flags = None if mask is None else _mask_view(mask, length)
+    zeros = array("q")
+    if zero_message is not None:
+        zeros = _zero_indices(b, length)
+        if len(zeros) and fill is None and flags is None:
+            raise ValueError(f"{zero_message} at index {int(zeros[0])}")
+        if len(zeros):
+            b = 1.0 if isinstance(b, float) else _replace_zeros(b, zeros)
+    if np is not None:
+        ufunc = getattr(np, _UFUNCS[operation])
+        result = _as_ndarray(target)
+        ufunc(_as_ndarray(a), _as_ndarray(b), out=result)
+        if len(zeros):
+            result[zeros] = float("nan") if fill is None else fill
+        if flags is not None:
+            flagged = np.frombuffer(flags, dtype=np.uint8)
+            flagged[:] = 0
+            flagged[zeros] = 1
+        return out
+    for start in range(0, length, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, length)
+        target[start:stop] = array(
+            "d", map(operation, _chunk(a, start, stop), _chunk(b, start, stop))
+        )
+    if flags is not None:
+        flags[:] = bytes(length)
+    for index in zeros:
+        target[index] = float("nan") if fill is None else fill
+        if flags is not None:
+            flags[index] = 1
+    return out
+
+
+def _replace_zeros(divisor: Any, zeros: FloatBuffer) -> Any:
+    """
+    Copy a batch of divisors with the zeros at the given positions replaced by one.
+    
+    Args:
+        divisor (Any): A float64 view or ``ndarray``
+        zeros (FloatBuffer): The positions of the zeros
+    
+    Returns:
+        Any: The copy, an ``ndarray`` if NumPy is installed, otherwise a float64 view
+    """
+    if np is not None:
+        copy = np.array(divisor, dtype=np.float64)
+        copy[zeros] = 1.0
+        return copy
+    copy = array("d", divisor)
+    for index in zeros:
+        copy[index] = 1.0
+    return memoryview(copy)
+
+
+def _unary(operation: Callable[[float], float], a: FloatBuffer, out: FloatBuffer) -> FloatBuffer:
+    """
+    Apply a unary operation element-wise.
+    
+    Args:
+        operation (Callable[[float], float]): ``operator.abs`` or ``operator.neg``
+        a (FloatBuffer): The values
+        out (FloatBuffer): Buffer to write results into, or None to allocate one
+    
+    Returns:
+        FloatBuffer: out if given, otherwise a new ``array('d')`` (or ``ndarray``)
+    """
+    view = as_float_view(a)
+    if out is None:
+        out = new_float_buffer(len(view), like=view)
+    target = as_output_view(out, len(view))
+    if np is not None:
+        getattr(np, _UFUNCS[operation])(_as_ndarray(view), out=_as_ndarray(target))
+        return out
+    for start in range(0, len(view), CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, len(view))
+        target[start:stop] = array("d", map(operation, view[start:stop]))
+    return out
+
+
+def add_batch(a: Operand, b: Operand, out: FloatBuffer = None) -> FloatBuffer:
+    """
+    Add two batches of numbers element-wise.
+    
+    Either operand may be a single number, which is broadcast against the other.
+    
+    Args:
+        a (Operand): The first numbers, as a number or any float64 buffer, NumPy
+            array or sequence
+        b (Operand): The second numbers
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+    
+    Returns:
+        FloatBuffer: The sums; out if given, otherwise a new ``array('d')`` (or
+        ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If a and b have different lengths
+    
+    Example:
+        >>> add_batch([1, 2, 3], 10)
+        array('d', [11.0, 12.0, 13.0])
+    """
+    return _elementwise(operator.add, a, b, out)
+
+
+def subtract_batch(a: Operand, b: Operand, out: FloatBuffer = None) -> FloatBuffer:
+    """
+    Subtract two batches of numbers element-wise.
+    
+    Args:
+        a (Operand): The numbers to subtract from, as a number or a batch
+        b (Operand): The numbers to subtract, as a number or a batch
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+    
+    Returns:
+        FloatBuffer: The differences
+    
+    Raises:
+        ValueError: If a and b have different lengths
+    
+    Example:
+        >>> subtract_batch([5, 7], [3, 2])
+        array('d', [2.0, 5.0])
+    """
+    return _elementwise(operator.sub, a, b, out)
+
+
+def multiply_batch(a: Operand, b: Operand, out: FloatBuffer = None) -> FloatBuffer:
+    """
+    Multiply two batches of numbers element-wise.
+    
+    Args:
+        a (Operand): The first numbers, as a number or a batch
+        b (Operand): The second numbers, as a number or a batch
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+    
+    Returns:
+        FloatBuffer: The products
+    
+    Raises:
+        ValueError: If a and b have different lengths
+    
+    Example:
+        >>> multiply_batch([4, 5], 2)
+        array('d', [8.0, 10.0])
+    """
+    return _elementwise(operator.mul, a, b, out)
+
+
+def divide_batch(
+    a: Operand,
+    b: Operand,
+    out: FloatBuffer = None,
+    fill: float = None,
+    mask: Any = None,
+) -> FloatBuffer:
+    """
+    Divide two batches of numbers element-wise.
+    
+    Zero divisors raise ValueError unless fill or mask is given, in which case the
+    batch is completed and those positions hold fill (NaN by default).
+    
+    Args:
+        a (Operand): The dividends, as a number or a batch
+        b (Operand): The divisors, as a number or a batch
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        fill (float, optional): Result for zero divisors (default: None, raise)
+        mask (Any, optional): Writable byte buffer (e.g. ``bytearray``) set to 1 where
+            the divisor is zero and 0 elsewhere (default: None)
+    
+    Returns:
+        FloatBuffer: The quotients
+    
+    Raises:
+        ValueError: If a divisor is zero and neither fill nor mask is given, or a and
+            b have different lengths
+    
+    Example:
+        >>> divide_batch([10, 4, 1], [2, 0, 4], fill=0.0)
+        array('d', [5.0, 0.0, 0.25])
+        >>> zero = bytearray(3)
+        >>> divide_batch([10, 4, 1], [2, 0, 4], mask=zero)[0], list(zero)
+        (5.0, [0, 1, 0])
+    """
+    return _elementwise(operator.truediv, a, b, out, "Cannot divide by zero", fill, mask)
+
+
+def power_batch(a: Operand, b: Operand, out: FloatBuffer = None) -> FloatBuffer:
+    """
+    Raise a batch of numbers to powers element-wise.
+    
+    Results are the same with or without NumPy: a negative base with a fractional
+    exponent gives NaN, and an overflow or zero raised to a negative power gives an
+    infinity, instead of raising as ``power`` does.
+    
+    Args:
+        a (Operand): The bases, as a number or a batch
+        b (Operand): The exponents, as a number or a batch
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+    
+    Returns:
+        FloatBuffer: The powers
+    
+    Raises:
+        ValueError: If a and b have different lengths
+    
+    Example:
+        >>> power_batch(2, [1, 2, 3])
+        array('d', [2.0, 4.0, 8.0])
+    """
+    return _elementwise(_float_power, a, b, out)
+
+
+def modulo_batch(
+    a: Operand,
+    b: Operand,
+    out: FloatBuffer = None,
+    fill: float = None,
+    mask: Any = None,
+) -> FloatBuffer:
+    """
+    Calculate remainders of division element-wise.
+    
+    Zero divisors are handled as in :func:`divide_batch`.
+    
+    Args:
+        a (Operand): The dividends, as a number or a batch
+        b (Operand): The divisors, as a number or a batch
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        fill (float, optional): Result for zero divisors (default: None, raise)
+        mask (Any, optional): Writable byte buffer set to 1 where the divisor is zero
+            (default: None)
+    
+    Returns:
+        FloatBuffer: The remainders
+    
+    Raises:
+        ValueError: If a divisor is zero and neither fill nor mask is given, or a and
+            b have different lengths
+    
+    Example:
+        >>> modulo_batch([10, 11], 3)
+        array('d', [1.0, 2.0])
+    """
+    return _elementwise(operator.mod, a, b, out, "Cannot calculate modulo with zero", fill, mask)
+
+
+def floor_divide_batch(
+    a: Operand,
+    b: Operand,
+    out: FloatBuffer = None,
+    fill: float = None,
+    mask: Any = None,
+) -> FloatBuffer:
+    """
+    Perform floor division element-wise.
+    
+    Zero divisors are handled as in :func:`divide_batch`.
+    
+    Args:
+        a (Operand): The dividends, as a number or a batch
+        b (Operand): The divisors, as a number or a batch
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        fill (float, optional): Result for zero divisors (default: None, raise)
+        mask (Any, optional): Writable byte buffer set to 1 where the divisor is zero
+            (default: None)
+    
+    Returns:
+        FloatBuffer: The floor quotients, as float64 values
+    
+    Raises:
+        ValueError: If a divisor is zero and neither fill nor mask is given, or a and
+            b have different lengths
+    
+    Example:
+        >>> floor_divide_batch([10, 7], [3, 0], fill=-1)
+        array('d', [3.0, -1.0])
+    """
+    return _elementwise(operator.floordiv, a, b, out, "Cannot divide by zero", fill, mask)
+
+
+def absolute_batch(a: FloatBuffer, out: FloatBuffer = None) -> FloatBuffer:
+    """
+    Get the absolute values of a batch of numbers.
+    
+    Args:
+        a (FloatBuffer): The numbers, as any float64 buffer, NumPy array or sequence
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+    
+    Returns:
+        FloatBuffer: The absolute values
+    
+    Example:
+        >>> absolute_batch([-5, 3])
+        array('d', [5.0, 3.0])
+    """
+    return _unary(operator.abs, a, out)
+
+
+def negate_batch(a: FloatBuffer, out: FloatBuffer = None) -> FloatBuffer:
+    """
+    Negate a batch of numbers.
+    
+    Args:
+        a (FloatBuffer): The numbers, as any float64 buffer, NumPy array or sequence
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+    
+    Returns:
+        FloatBuffer: The negated values
+    
+    Example:
+        >>> negate_batch([5, -2])
+        array('d', [-5.0, 2.0])
+    """
+    return _unary(operator.neg, a, out)
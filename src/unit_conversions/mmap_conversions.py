@@ -0,0 +1,197 @@
+"""
+Memory-Mapped Conversion Module
+
+This module converts raw binary files of little-endian float64 values, such as
+sensor archives of distances in feet, without reading them through Python objects.
+Files are memory-mapped and converted chunk by chunk, either in place or into a
+second mapped file, so only one chunk's worth of pages is touched at a time and the
+operating system pages data in and out as needed.
+"""
+
+import mmap
+import os
+import sys
+from array import array
+from typing import Callable
+
+from .helper_functions.buffers import first_negative_index
+from .unit_registry import batch_function
+
+ITEM_SIZE = 8
+
+# Number of float64 values converted per chunk (8 MiB)
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _value_count(path: str) -> int:
+    """
+    Count the float64 values in a binary file.
+
+    Args:
+        path (str): Path of the file
+
+    Returns:
+        int: The number of values
+
+    Raises:
+        ValueError: If the file size is not a multiple of 8 bytes
+    """
+    size = os.path.getsize(path)
+    if size % ITEM_SIZE:
+        raise ValueError(f"File size of {path!r} is not a multiple of {ITEM_SIZE}: {size}")
+    return size // ITEM_SIZE
+
+
+def _with_position(error: ValueError, index: int) -> ValueError:
+    """
+    Add the position of the offending value to a validation error.
+
+    Args:
+        error (ValueError): The validation error
+        index (int): The index of the offending value in the file
+
+    Returns:
+        ValueError: A new error whose message includes the index
+    """
+    return ValueError(f"{error} (value {index}, byte offset {index * ITEM_SIZE})")
+
+
+def _check_chunks(mapped: mmap.mmap, count: int, convert: Callable, chunk_size: int) -> None:
+    """
+    Validate every value of a mapped file before any value is written.
+
+    Args:
+        mapped (mmap.mmap): The mapped source file
+        count (int): The number of values
+        convert (Callable): The batch conversion, used to raise its own error message
+        chunk_size (int): Values checked per chunk
+
+    Raises:
+        ValueError: If the conversion rejects a negative value
+    """
+    for start in range(0, count, chunk_size):
+        stop = min(start + chunk_size, count)
+        chunk = array("d", mapped[start * ITEM_SIZE : stop * ITEM_SIZE])
+        if not _NATIVE_LITTLE_ENDIAN:
+            chunk.byteswap()
+        offset = 0
+        while True:
+            index = first_negative_index(memoryview(chunk)[offset:])
+            if index is None:
+                break
+            offset += index
+            try:
+                convert(chunk[offset : offset + 1])
+            except ValueError as error:
+                raise _with_position(error, start + offset) from None
+            offset += 1
+
+
+def _convert_chunks(
+    source: mmap.mmap, target: mmap.mmap, count: int, convert: Callable, chunk_size: int
+) -> None:
+    """
+    Convert a mapped file chunk by chunk into a mapped target.
+
+    Args:
+        source (mmap.mmap): The mapped source file
+        target (mmap.mmap): The mapped target file (may be source)
+        count (int): The number of values
+        convert (Callable): The batch conversion, called as ``convert(values, out=...)``
+        chunk_size (int): Values converted per chunk
+
+    Raises:
+        ValueError: If the conversion rejects a value
+    """
+    failure = None
+    for start in range(0, count, chunk_size):
+        stop = min(start + chunk_size, count)
+        begin, end = start * ITEM_SIZE, stop * ITEM_SIZE
+        try:
+            if _NATIVE_LITTLE_ENDIAN:
+                with memoryview(source) as raw_in, memoryview(target) as raw_out:
+                    with raw_in[begin:end].cast("d") as values, raw_out[begin:end].cast("d") as out:
+                        convert(values, out=out)
+            else:
+                values = array("d", source[begin:end])
+                values.byteswap()
+                convert(values, out=values)
+                values.byteswap()
+                target[begin:end] = values.tobytes()
+        except ValueError as error:
+            # Raised outside the handler so that no traceback keeps the mapped views alive
+            index = first_negative_index(array("d", source[begin:end]))
+            failure = _with_position(error, start + (index or 0))
+            break
+    if failure is not None:
+        raise failure
+
+
+def convert_file(
+    path: str,
+    conversion: Callable,
+    destination: str = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Convert a binary file of little-endian float64 values via memory mapping.
+
+    Values are converted in place, or written to destination when given (the
+    destination is created or truncated to the size of the source). The conversion's
+    negative-value validation applies to every value; for in-place conversion the
+    whole file is validated before anything is written, so a rejected file is left
+    unchanged.
+
+    Args:
+        path (str): Path of the file to convert
+        conversion (Callable): A scalar conversion such as ``ft_to_m`` (its ``*_batch``
+            variant is used) or a batch function, as accepted by
+            ``unit_registry.batch_function``
+        destination (str, optional): Path of the file to write (default: None, convert
+            in place)
+        chunk_size (int): Values converted per chunk (default: 1048576)
+
+    Returns:
+        int: The number of values converted
+
+    Raises:
+        ValueError: If the file size is not a multiple of 8 bytes, a value is negative,
+            or destination is the source file itself
+
+    Example:
+        >>> import os, struct, tempfile
+        >>> from src.unit_conversions.distance_conversions import ft_to_in
+        >>> handle, path = tempfile.mkstemp()
+        >>> _ = os.write(handle, struct.pack("<3d", 1.0, 2.0, 0.5)); os.close(handle)
+        >>> convert_file(path, ft_to_in, chunk_size=2)
+        3
+        >>> with open(path, "rb") as f:
+        ...     struct.unpack("<3d", f.read())
+        (12.0, 24.0, 6.0)
+        >>> os.remove(path)
+    """
+    convert = batch_function(conversion)
+    count = _value_count(path)
+    if destination is None:
+        if count:
+            with open(path, "r+b") as handle, mmap.mmap(handle.fileno(), 0) as mapped:
+                _check_chunks(mapped, count, convert, chunk_size)
+                _convert_chunks(mapped, mapped, count, convert, chunk_size)
+                mapped.flush()
+        return count
+    # Opening the destination for writing would truncate the source before it is read
+    if os.path.exists(destination) and os.path.samefile(path, destination):
+        raise ValueError(
+            f"Destination {destination!r} is the source file; omit destination to convert in place"
+        )
+    with open(path, "rb") as reader, open(destination, "w+b") as writer:
+        writer.truncate(count * ITEM_SIZE)
+        if count:
+            with mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ) as source, mmap.mmap(
+                writer.fileno(), 0
+            ) as target:
+                _convert_chunks(source, target, count, convert, chunk_size)
+                target.flush()
+    return count
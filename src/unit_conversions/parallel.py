@@ -0,0 +1,208 @@
+"""
+Parallel Conversion Module
+
+This module spreads batch conversions of large arrays over a pool of worker
+processes. The values are copied once into a memory-mapped temporary file; workers
+receive only the file path and a (start, stop) range, map the file, convert their
+range in place, and the parent copies the converted file into the result. Payloads are
+never pickled, and because every worker writes to its own range the result is
+assembled in order.
+
+Small inputs, where starting tasks costs more than it saves, are converted in the
+calling process.
+"""
+
+import mmap
+import os
+import tempfile
+from multiprocessing import get_context
+from typing import Callable, List, Optional, Tuple
+
+from .helper_functions.buffers import (
+    FloatBuffer,
+    as_float_view,
+    as_output_view,
+    new_float_buffer,
+)
+from .unit_registry import batch_function
+
+# Number of values converted per worker task
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Inputs smaller than this are converted in the calling process
+DEFAULT_MIN_PARALLEL_SIZE = 1 << 21
+
+
+def _convert_range(task: Tuple[Callable, str, int, int]) -> None:
+    """
+    Convert one range of a shared float64 file in place (runs in a worker).
+
+    Args:
+        task (Tuple[Callable, str, int, int]): The batch conversion, the file path,
+            and the start and stop indices
+    """
+    convert, path, start, stop = task
+    failure = None
+    with open(path, "r+b") as file, mmap.mmap(file.fileno(), 0) as mapped:
+        try:
+            with memoryview(mapped) as raw, raw.cast("d") as values, values[start:stop] as chunk:
+                convert(chunk, out=chunk)
+        except (TypeError, ValueError) as error:
+            # Raised after unmapping so that no traceback keeps the shared views alive
+            failure = type(error)(str(error))
+    if failure is not None:
+        raise failure
+
+
+class ParallelConverter:
+    """
+    Pool of worker processes for converting large arrays in parallel.
+
+    The conversion must be picklable: the scalar and ``*_batch`` functions of the
+    distance and weight modules qualify, generated pipeline functions do not. If any
+    range fails validation a ValueError is raised and no output is written.
+
+    Example:
+        >>> from array import array
+        >>> from src.unit_conversions.distance_conversions import km_to_m
+        >>> with ParallelConverter(workers=2, chunk_size=2, min_parallel_size=4) as pool:
+        ...     pool.convert(array("d", [1, 2, 3, 4, 5]), km_to_m)
+        array('d', [1000.0, 2000.0, 3000.0, 4000.0, 5000.0])
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        min_parallel_size: int = DEFAULT_MIN_PARALLEL_SIZE,
+    ):
+        """
+        Create a converter; worker processes are started on first parallel use.
+
+        Args:
+            workers (int, optional): Number of worker processes (default: None, one
+                per CPU)
+            chunk_size (int): Values converted per task (default: 1048576)
+            min_parallel_size (int): Smallest input converted in parallel
+                (default: 2097152)
+
+        Raises:
+            ValueError: If workers or chunk_size is less than 1
+        """
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        if self.workers < 1 or chunk_size < 1:
+            raise ValueError("workers and chunk_size must be at least 1")
+        self.chunk_size = chunk_size
+        self.min_parallel_size = min_parallel_size
+        self._pool = None
+
+    def __enter__(self) -> "ParallelConverter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop the worker processes.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _ranges(self, length: int) -> List[Tuple[int, int]]:
+        """
+        Split a length into consecutive (start, stop) ranges of at most chunk_size.
+
+        Args:
+            length (int): The number of values
+
+        Returns:
+            List[Tuple[int, int]]: The ranges
+        """
+        return [
+            (start, min(start + self.chunk_size, length))
+            for start in range(0, length, self.chunk_size)
+        ]
+
+    def convert(
+        self, values: FloatBuffer, conversion: Callable, out: FloatBuffer = None
+    ) -> FloatBuffer:
+        """
+        Convert a batch of values, in parallel when the batch is large enough.
+
+        Args:
+            values (FloatBuffer): The values, as any float64 buffer or NumPy array
+            conversion (Callable): A scalar conversion such as ``mi_to_km`` (its
+                ``*_batch`` variant is used) or a picklable batch function, as accepted
+                by ``unit_registry.batch_function``
+            out (FloatBuffer, optional): Float64 buffer to write results into
+                (default: None)
+
+        Returns:
+            FloatBuffer: out if given, otherwise a new ``array('d')`` (or ``ndarray``
+            for NumPy input)
+
+        Raises:
+            ValueError: If any value is negative, or out is not a matching float64
+                buffer
+        """
+        convert = batch_function(conversion)
+        view = as_float_view(values)
+        length = len(view)
+        if self.workers == 1 or length < max(self.min_parallel_size, 1):
+            return convert(view, out=out)
+        if out is None:
+            out = new_float_buffer(length, like=view)
+        target = as_output_view(out, length)
+        if self._pool is None:
+            self._pool = get_context().Pool(self.workers)
+        descriptor, path = tempfile.mkstemp(prefix="parallel-", suffix=".f64")
+        try:
+            os.ftruncate(descriptor, length * 8)
+            with mmap.mmap(descriptor, length * 8) as mapped:
+                with memoryview(mapped) as raw, raw.cast("d") as shared:
+                    with memoryview(view) as source:
+                        shared[:] = source
+                    tasks = [(convert, path, start, stop) for start, stop in self._ranges(length)]
+                    self._pool.map(_convert_range, tasks, chunksize=1)
+                    with memoryview(target) as result:
+                        result[:] = shared
+        finally:
+            os.close(descriptor)
+            os.unlink(path)
+        return out
+
+
+def parallel_convert(
+    values: FloatBuffer,
+    conversion: Callable,
+    out: FloatBuffer = None,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    min_parallel_size: int = DEFAULT_MIN_PARALLEL_SIZE,
+) -> FloatBuffer:
+    """
+    Convert a batch of values with a temporary pool of worker processes.
+
+    Use :class:`ParallelConverter` directly to reuse the pool across calls.
+
+    Args:
+        values (FloatBuffer): The values, as any float64 buffer or NumPy array
+        conversion (Callable): A scalar conversion such as ``mi_to_km`` or a picklable
+            batch function, as accepted by ``unit_registry.batch_function``
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        workers (int, optional): Number of worker processes (default: None, one per CPU)
+        chunk_size (int): Values converted per task (default: 1048576)
+        min_parallel_size (int): Smallest input converted in parallel (default: 2097152)
+
+    Returns:
+        FloatBuffer: out if given, otherwise a new ``array('d')`` (or ``ndarray`` for
+        NumPy input)
+
+    Raises:
+        ValueError: If any value is negative, or out is not a matching float64 buffer
+    """
+    with ParallelConverter(workers, chunk_size, min_parallel_size) as converter:
+        return converter.convert(values, conversion, out)
@@ -0,0 +1,441 @@
+"""
+Conversion Pipeline Module
+
+This module provides a builder for sequences of conversion and arithmetic steps,
+such as "feet to meters, add an offset, multiply by a scale, round". Instead of
+calling each step in turn, a pipeline is compiled into one specialized function:
+
+- consecutive conversions, additions, subtractions, multiplications and divisions
+  are folded into a single ``x * scale + offset`` (with exact rational arithmetic,
+  rounded once to float),
+- the non-negative validation of every conversion is rewritten as a threshold on
+  the pipeline input and hoisted in front of the arithmetic,
+- the resulting code is generated as Python source, so a scalar call costs one
+  function call and a batch costs one pass over the buffer.
+
+Because constants are folded, results can differ from step-by-step evaluation in
+the last bits.
+"""
+
+from fractions import Fraction
+from itertools import compress, count
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from . import unit_registry
+from .helper_functions.buffers import (
+    FloatBuffer,
+    as_float_view,
+    as_output_view,
+    is_ndarray,
+    new_float_buffer,
+    np,
+)
+from .helper_functions.codegen import define_function
+
+
+class _Check(NamedTuple):
+    """A conversion's validation, expressed on the value entering its segment."""
+
+    scale: Fraction
+    offset: Fraction
+    validator: Callable[[float, str], None]
+    unit: str
+
+
+class _Segment(NamedTuple):
+    """A run of folded affine steps, optionally followed by rounding."""
+
+    checks: Tuple[_Check, ...]
+    scale: Fraction
+    offset: Fraction
+    ndigits: Optional[int]
+
+
+def _conversion_of(function: Callable[[float], float]) -> Tuple[Fraction, Callable, str]:
+    """
+    Look up the factor, validator and unit name of a scalar conversion function.
+
+    Args:
+        function (Callable[[float], float]): A function such as ``distance_conversions.ft_to_m``
+
+    Returns:
+        Tuple[Fraction, Callable, str]: The factor, the module validator and the unit name
+
+    Raises:
+        ValueError: If function is not a conversion from distance_conversions or
+            weight_conversions
+    """
+    name = getattr(function, "__name__", "")
+    original = getattr(function, "__wrapped__", function)
+    for module, validator in unit_registry._DIMENSION_MODULES.values():
+        candidate = getattr(module, name, None)
+        if getattr(candidate, "__wrapped__", candidate) is original:
+            factor = getattr(module, name.upper(), None)
+            if isinstance(factor, float):
+                return Fraction(factor), validator, original.__code__.co_varnames[0]
+    raise ValueError(f"Not a distance or weight conversion function: {function!r}")
+
+
+class ConversionPipeline:
+    """
+    Immutable builder for a fused sequence of conversion and arithmetic steps.
+
+    Every step method returns a new pipeline, so partial pipelines can be shared.
+
+    Example:
+        >>> from src.unit_conversions.distance_conversions import ft_to_m
+        >>> scaled = ConversionPipeline().apply(ft_to_m).add(1).multiply(2).round(2)
+        >>> scaled.compile()(10)
+        8.1
+    """
+
+    def __init__(self, steps: Tuple[Tuple[str, Any], ...] = ()):
+        """
+        Create a pipeline from a tuple of steps.
+
+        Args:
+            steps (Tuple[Tuple[str, Any], ...]): Steps as (kind, argument) pairs
+                (default: empty pipeline)
+        """
+        self.steps = steps
+
+    def __repr__(self) -> str:
+        steps = ", ".join(f"{kind}({argument!r})" for kind, argument in self.steps)
+        return f"ConversionPipeline([{steps}])"
+
+    def _then(self, kind: str, argument: Any) -> "ConversionPipeline":
+        return ConversionPipeline(self.steps + ((kind, argument),))
+
+    def apply(self, conversion: Callable[[float], float]) -> "ConversionPipeline":
+        """
+        Append a scalar conversion function such as ``ft_to_m`` or ``lb_to_kg``.
+
+        Args:
+            conversion (Callable[[float], float]): A distance or weight conversion function
+
+        Returns:
+            ConversionPipeline: The extended pipeline
+
+        Raises:
+            ValueError: If conversion is not a distance or weight conversion function
+        """
+        factor, validator, unit = _conversion_of(conversion)
+        return self._then("convert", (factor, validator, unit))
+
+    def convert(self, from_unit: str, to_unit: str) -> "ConversionPipeline":
+        """
+        Append a conversion between two registered units, e.g. ``("mi", "in")``.
+
+        Args:
+            from_unit (str): The unit to convert from
+            to_unit (str): The unit to convert to
+
+        Returns:
+            ConversionPipeline: The extended pipeline
+
+        Raises:
+            ValueError: If the units are unknown or have different dimensions
+        """
+        factor = Fraction(unit_registry.conversion_factor(from_unit, to_unit))
+        dimension = unit_registry.UNIT_DIMENSIONS[from_unit]
+        _, validator = unit_registry._DIMENSION_MODULES[dimension]
+        return self._then("convert", (factor, validator, unit_registry.UNIT_NAMES[from_unit]))
+
+    def add(self, value: float) -> "ConversionPipeline":
+        """
+        Append the addition of a constant.
+
+        Args:
+            value (float): The constant to add
+
+        Returns:
+            ConversionPipeline: The extended pipeline
+        """
+        return self._then("add", Fraction(value))
+
+    def subtract(self, value: float) -> "ConversionPipeline":
+        """
+        Append the subtraction of a constant.
+
+        Args:
+            value (float): The constant to subtract
+
+        Returns:
+            ConversionPipeline: The extended pipeline
+        """
+        return self._then("add", -Fraction(value))
+
+    def multiply(self, value: float) -> "ConversionPipeline":
+        """
+        Append the multiplication by a constant.
+
+        Args:
+            value (float): The constant to multiply by
+
+        Returns:
+            ConversionPipeline: The extended pipeline
+        """
+        return self._then("multiply", Fraction(value))
+
+    def divide(self, value: float) -> "ConversionPipeline":
+        """
+        Append the division by a constant.
+
+        Args:
+            value (float): The constant to divide by
+
+        Returns:
+            ConversionPipeline: The extended pipeline
+
+        Raises:
+            ValueError: If value is zero
+        """
+        if value == 0:
+            raise ValueError("Cannot divide by zero")
+        return self._then("multiply", 1 / Fraction(value))
+
+    def round(self, ndigits: int = 0) -> "ConversionPipeline":
+        """
+        Append rounding to a number of decimal places.
+
+        Args:
+            ndigits (int): Number of decimal places (default: 0)
+
+        Returns:
+            ConversionPipeline: The extended pipeline
+        """
+        return self._then("round", int(ndigits))
+
+    def segments(self) -> List[_Segment]:
+        """
+        Fold the steps into affine segments separated by rounding steps.
+
+        Returns:
+            List[_Segment]: The folded segments
+        """
+        segments = []
+        checks: List[_Check] = []
+        scale, offset = Fraction(1), Fraction(0)
+        for kind, argument in self.steps:
+            if kind == "convert":
+                factor, validator, unit = argument
+                checks.append(_Check(scale, offset, validator, unit))
+                scale, offset = scale * factor, offset * factor
+            elif kind == "add":
+                offset += argument
+            elif kind == "multiply":
+                scale, offset = scale * argument, offset * argument
+            else:
+                segments.append(_Segment(tuple(checks), scale, offset, argument))
+                checks, scale, offset = [], Fraction(1), Fraction(0)
+        if checks or scale != 1 or offset != 0 or not segments:
+            segments.append(_Segment(tuple(checks), scale, offset, None))
+        return segments
+
+    def compile(self) -> Callable[[float], float]:
+        """
+        Generate a specialized scalar function for this pipeline.
+
+        Returns:
+            Callable[[float], float]: A function applying every step to one value
+
+        Raises:
+            ValueError: From the generated function, if a conversion step receives a
+                negative value
+        """
+        namespace: Dict[str, Any] = {}
+        lines = ["def pipeline(x):"]
+        for number, segment in enumerate(self.segments()):
+            lines += _check_lines(segment, number, namespace, "x")
+            lines += _segment_lines(segment, "x")
+        lines.append("    return x")
+        return define_function(lines, namespace, "pipeline")
+
+    def compile_batch(self) -> Callable[..., FloatBuffer]:
+        """
+        Generate a specialized batch function for this pipeline.
+
+        The returned function takes a float64 buffer (or NumPy array) and an optional
+        ``out`` buffer, like the ``*_batch`` conversion functions. Input validation for
+        the first segment runs before anything is written; validation after a rounding
+        step runs as values are produced, so out may be partially written when it fails.
+
+        Returns:
+            Callable[..., FloatBuffer]: A function ``(values, out=None) -> FloatBuffer``
+        """
+        segments = self.segments()
+        namespace: Dict[str, Any] = {"compress": compress, "count": count}
+        lines = ["def pipeline_batch(view, target):"]
+        for number, check in enumerate(segments[0].checks):
+            condition, threshold = _threshold(check)
+            if condition is None:
+                continue
+            name = f"_c0_{number}"
+            namespace[name] = check
+            namespace[f"{name}_test"] = getattr(
+                threshold, "__gt__" if condition == "<" else "__lt__"
+            )
+            lines += [
+                f"    for i in compress(count(), map({name}_test, view)):",
+                f"        {name}.validator("
+                f"{_affine('view[i]', check.scale, check.offset)}, {name}.unit)",
+            ]
+        lines.append("    for i, x in enumerate(view):")
+        for number, segment in enumerate(segments):
+            if number:
+                lines += ["    " + line for line in _check_lines(segment, number, namespace, "x")]
+            lines += ["    " + line for line in _segment_lines(segment, "x")]
+        lines.append("        target[i] = x")
+        pure_python = define_function(lines, namespace, "pipeline_batch")
+
+        def pipeline_batch(values: FloatBuffer, out: FloatBuffer = None) -> FloatBuffer:
+            view = as_float_view(values)
+            if out is None:
+                out = new_float_buffer(len(view), like=view)
+            target = as_output_view(out, len(view))
+            if np is None:
+                pure_python(view, target)
+            else:
+                _run_vectorized(segments, view, target)
+            return out
+
+        return unit_registry.mark_batch(pipeline_batch)
+
+
+def _threshold(check: _Check) -> Tuple[Optional[str], float]:
+    """
+    Rewrite ``scale * x + offset < 0`` as a comparison of x against a threshold.
+
+    Args:
+        check (_Check): The validation to rewrite
+
+    Returns:
+        Tuple[Optional[str], float]: The comparison (``"<"``, ``">"``, or None if the
+        check can never fail) and the threshold
+    """
+    if check.scale > 0:
+        return "<", float(-check.offset / check.scale)
+    if check.scale < 0:
+        return ">", float(-check.offset / check.scale)
+    return ("<", float("inf")) if check.offset < 0 else (None, 0.0)
+
+
+def _check_lines(segment: _Segment, number: int, namespace: Dict[str, Any], name: str) -> List[str]:
+    """
+    Generate the hoisted validation lines of a segment.
+
+    Args:
+        segment (_Segment): The segment
+        number (int): The segment index, used to name constants
+        namespace (Dict[str, Any]): Globals of the generated function, updated in place
+        name (str): The variable holding the segment input
+
+    Returns:
+        List[str]: Indented source lines
+    """
+    lines = []
+    for index, check in enumerate(segment.checks):
+        condition, threshold = _threshold(check)
+        if condition is None:
+            continue
+        constant = f"_c{number}_{index}"
+        namespace[constant] = check
+        lines += [
+            f"    if {name} {condition} {threshold!r}:",
+            f"        {constant}.validator("
+            f"{_affine(name, check.scale, check.offset)}, {constant}.unit)",
+        ]
+    return lines
+
+
+def _affine(name: str, scale: Fraction, offset: Fraction) -> str:
+    """
+    Generate the source of ``name * scale + offset``, omitting identity terms.
+
+    Args:
+        name (str): The operand expression
+        scale (Fraction): The factor
+        offset (Fraction): The addend
+
+    Returns:
+        str: A Python expression
+    """
+    expression = name
+    if float(scale) != 1.0:
+        expression += f" * {float(scale)!r}"
+    if float(offset) > 0:
+        expression += f" + {float(offset)!r}"
+    elif float(offset) < 0:
+        expression += f" - {-float(offset)!r}"
+    return expression
+
+
+def _segment_lines(segment: _Segment, name: str) -> List[str]:
+    """
+    Generate the folded arithmetic lines of a segment.
+
+    Args:
+        segment (_Segment): The segment
+        name (str): The variable holding the segment input
+
+    Returns:
+        List[str]: Indented source lines
+    """
+    expression = _affine(name, segment.scale, segment.offset)
+    if segment.ndigits is not None:
+        expression = f"round({expression}, {segment.ndigits})"
+    return [f"    {name} = {expression}"] if expression != name else []
+
+
+def _round_into(values: "np.ndarray", ndigits: int) -> None:
+    """
+    Round an array in place exactly as Python's ``round(value, ndigits)`` would.
+
+    ``np.round`` rounds ``value * 10**ndigits``, whose own rounding error can move a
+    value across a tie. Values whose scaled product lies that close to a tie are
+    rounded again with Python's correctly rounded ``round``; all others already
+    agree with it.
+
+    Args:
+        values (np.ndarray): Float64 values, overwritten with the rounded values
+        ndigits (int): Number of decimal digits
+    """
+    if not -22 <= ndigits <= 22:
+        values[:] = [round(value, ndigits) for value in values.tolist()]
+        return
+    scaled = values * 10.0**ndigits
+    fraction = np.abs(scaled - np.trunc(scaled))
+    ties = np.flatnonzero(np.abs(fraction - 0.5) <= 1e-9 + 1e-13 * np.abs(scaled))
+    originals = values[ties].tolist()
+    np.round(values, ndigits, out=values)
+    values[ties] = [round(value, ndigits) for value in originals]
+
+
+def _run_vectorized(segments: List[_Segment], view: FloatBuffer, target: FloatBuffer) -> None:
+    """
+    Evaluate pipeline segments with NumPy, writing into target.
+
+    Args:
+        segments (List[_Segment]): The folded segments
+        view (FloatBuffer): The input values
+        target (FloatBuffer): The output buffer, of the same length
+    """
+    source = view if is_ndarray(view) else np.frombuffer(view, dtype=np.float64)
+    result = target if is_ndarray(target) else np.frombuffer(target, dtype=np.float64)
+    for segment in segments:
+        for check in segment.checks:
+            condition, threshold = _threshold(check)
+            if condition is None:
+                continue
+            failing = source < threshold if condition == "<" else source > threshold
+            for index in np.flatnonzero(failing):
+                value = float(source[index]) * float(check.scale) + float(check.offset)
+                check.validator(value, check.unit)
+        np.multiply(source, float(segment.scale), out=result)
+        if segment.offset != 0:
+            np.add(result, float(segment.offset), out=result)
+        if segment.ndigits is not None:
+            _round_into(result, segment.ndigits)
+        source = result
+    if source is not result:
+        result[:] = source
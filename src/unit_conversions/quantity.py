@@ -0,0 +1,331 @@
+"""
+Quantities Module
+
+This module provides value types that carry their unit with them: ``Quantity`` for a
+single value and ``QuantityArray`` for a whole batch, stored as one float64 buffer
+plus one unit symbol rather than a list of (value, unit) pairs.
+
+Both types convert lazily. ``to`` only relabels the object with a new unit; the
+stored magnitudes are kept in the unit they were created in and multiplied by the
+registry factor when a value is read. A chain such as
+``q.to("km").to("mi").to("ft")`` therefore does no arithmetic, and reading the
+result costs a single multiplication by the precomputed ``FACTORS[stored, unit]``.
+"""
+
+from typing import Iterable, Iterator, Union
+
+from .helper_functions.buffers import (
+    FloatBuffer,
+    as_float_view,
+    first_negative_index,
+    scale_into,
+)
+from .unit_registry import FACTORS, UNIT_DIMENSIONS, _lookup_error, _validate
+
+# Differences this small relative to the operands are conversion round-off, not
+# negative quantities, and are clamped to zero
+SUBTRACTION_TOLERANCE = 1e-12
+
+
+def _check_units(from_unit: str, to_unit: str) -> None:
+    """
+    Check that two units are known and of the same dimension.
+
+    Args:
+        from_unit (str): The unit converted from
+        to_unit (str): The unit converted to
+
+    Raises:
+        ValueError: If either unit is unknown or the units have different dimensions
+    """
+    if (from_unit, to_unit) not in FACTORS:
+        raise ValueError(_lookup_error(from_unit, to_unit))
+
+
+class Quantity:
+    """
+    A non-negative distance or weight value together with its unit.
+
+    Args:
+        value (float): The magnitude
+        unit (str): A registered unit symbol, e.g. ``"km"``
+
+    Raises:
+        ValueError: If the unit is unknown or the value is negative
+
+    Example:
+        >>> distance = Quantity(1, "mi").to("ft")
+        >>> distance
+        Quantity(5280.0, 'ft')
+        >>> distance + Quantity(120, "in")
+        Quantity(5290.0, 'ft')
+    """
+
+    __slots__ = ("_magnitude", "_stored_unit", "_unit")
+
+    def __init__(self, value: float, unit: str):
+        _check_units(unit, unit)
+        if value < 0:
+            _validate(value, unit)
+        self._magnitude = float(value)
+        self._stored_unit = unit
+        self._unit = unit
+
+    @classmethod
+    def _relabelled(cls, magnitude: float, stored_unit: str, unit: str) -> "Quantity":
+        """Create a quantity from trusted parts without validating them."""
+        quantity = cls.__new__(cls)
+        quantity._magnitude = magnitude
+        quantity._stored_unit = stored_unit
+        quantity._unit = unit
+        return quantity
+
+    @property
+    def value(self) -> float:
+        """float: The magnitude in the quantity's unit."""
+        if self._unit == self._stored_unit:
+            return self._magnitude
+        return self._magnitude * FACTORS[self._stored_unit, self._unit]
+
+    @property
+    def unit(self) -> str:
+        """str: The unit values are read in."""
+        return self._unit
+
+    @property
+    def dimension(self) -> str:
+        """str: ``"distance"`` or ``"weight"``."""
+        return UNIT_DIMENSIONS[self._unit]
+
+    def to(self, unit: str) -> "Quantity":
+        """
+        Express the quantity in another unit, without converting until it is read.
+
+        Args:
+            unit (str): The target unit
+
+        Returns:
+            Quantity: The relabelled quantity
+
+        Raises:
+            ValueError: If the unit is unknown or of a different dimension
+        """
+        _check_units(self._stored_unit, unit)
+        return Quantity._relabelled(self._magnitude, self._stored_unit, unit)
+
+    def value_in(self, unit: str) -> float:
+        """
+        Read the magnitude in a given unit.
+
+        Args:
+            unit (str): The unit to read the value in
+
+        Returns:
+            float: The converted magnitude
+
+        Raises:
+            ValueError: If the unit is unknown or of a different dimension
+        """
+        _check_units(self._stored_unit, unit)
+        return self._magnitude * FACTORS[self._stored_unit, unit]
+
+    def __float__(self) -> float:
+        return self.value
+
+    def __repr__(self) -> str:
+        return f"Quantity({self.value!r}, {self._unit!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Quantity):
+            return NotImplemented
+        if (other._stored_unit, self._unit) not in FACTORS:
+            return False
+        return self.value == other.value_in(self._unit)
+
+    __hash__ = None
+
+    def __lt__(self, other: "Quantity") -> bool:
+        if not isinstance(other, Quantity):
+            return NotImplemented
+        return self.value < other.value_in(self._unit)
+
+    def __le__(self, other: "Quantity") -> bool:
+        if not isinstance(other, Quantity):
+            return NotImplemented
+        return self.value <= other.value_in(self._unit)
+
+    def __add__(self, other: "Quantity") -> "Quantity":
+        if not isinstance(other, Quantity):
+            return NotImplemented
+        return Quantity._relabelled(self.value + other.value_in(self._unit), self._unit, self._unit)
+
+    def __sub__(self, other: "Quantity") -> "Quantity":
+        if not isinstance(other, Quantity):
+            return NotImplemented
+        minuend, subtrahend = self.value, other.value_in(self._unit)
+        difference = minuend - subtrahend
+        if difference < 0 and -difference <= SUBTRACTION_TOLERANCE * max(minuend, subtrahend):
+            difference = 0.0
+        return Quantity(difference, self._unit)
+
+    def __mul__(self, factor: float) -> "Quantity":
+        if isinstance(factor, Quantity):
+            return NotImplemented
+        return Quantity(self._magnitude * factor, self._stored_unit).to(self._unit)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, divisor: float) -> "Quantity":
+        if isinstance(divisor, Quantity):
+            return NotImplemented
+        if divisor == 0:
+            raise ValueError("Cannot divide by zero")
+        return Quantity(self._magnitude / divisor, self._stored_unit).to(self._unit)
+
+
+class QuantityArray:
+    """
+    A batch of non-negative distance or weight values sharing one unit.
+
+    The values are held in a single float64 buffer; buffer-protocol inputs holding
+    float64 data (and NumPy arrays) are viewed without copying.
+
+    Args:
+        values (FloatBuffer): The magnitudes, as any float64 buffer, NumPy array or
+            iterable of numbers
+        unit (str): A registered unit symbol
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+
+    Raises:
+        ValueError: If the unit is unknown or any value is negative (unless validated)
+
+    Example:
+        >>> weights = QuantityArray([1.0, 2.0], "lb").to("oz")
+        >>> weights.values
+        array('d', [16.0, 32.0])
+        >>> weights[1]
+        Quantity(32.0, 'oz')
+    """
+
+    __slots__ = ("_view", "_stored_unit", "_unit", "_cache")
+
+    def __init__(self, values: FloatBuffer, unit: str, validated: bool = False):
+        _check_units(unit, unit)
+        view = as_float_view(values)
+        index = None if validated else first_negative_index(view)
+        if index is not None:
+            _validate(float(view[index]), unit)
+        self._view = view
+        self._stored_unit = unit
+        self._unit = unit
+        self._cache = None
+
+    @classmethod
+    def _relabelled(cls, view: FloatBuffer, stored_unit: str, unit: str) -> "QuantityArray":
+        """Create an array from trusted parts without validating them."""
+        quantities = cls.__new__(cls)
+        quantities._view = view
+        quantities._stored_unit = stored_unit
+        quantities._unit = unit
+        quantities._cache = None
+        return quantities
+
+    @classmethod
+    def from_quantities(cls, quantities: Iterable[Quantity], unit: str) -> "QuantityArray":
+        """
+        Pack scalar quantities of one dimension into an array.
+
+        Args:
+            quantities (Iterable[Quantity]): The quantities, in any units of the dimension
+            unit (str): The unit of the array
+
+        Returns:
+            QuantityArray: The packed values, converted to unit
+
+        Raises:
+            ValueError: If a quantity cannot be converted to unit
+
+        Example:
+            >>> QuantityArray.from_quantities([Quantity(1, "m"), Quantity(50, "cm")], "m")
+            QuantityArray([1.0, 0.5], 'm')
+        """
+        return cls._relabelled(
+            as_float_view([quantity.value_in(unit) for quantity in quantities]), unit, unit
+        )
+
+    @property
+    def unit(self) -> str:
+        """str: The unit values are read in."""
+        return self._unit
+
+    @property
+    def dimension(self) -> str:
+        """str: ``"distance"`` or ``"weight"``."""
+        return UNIT_DIMENSIONS[self._unit]
+
+    @property
+    def values(self) -> FloatBuffer:
+        """
+        FloatBuffer: The magnitudes in the array's unit.
+
+        While the unit is unchanged this is a float64 ``memoryview`` (or ``ndarray``)
+        of the stored buffer; otherwise the converted values are computed into a new
+        buffer on first access and cached.
+        """
+        if self._unit == self._stored_unit:
+            return self._view
+        if self._cache is None:
+            self._cache = scale_into(self._view, FACTORS[self._stored_unit, self._unit])
+        return self._cache
+
+    def to(self, unit: str) -> "QuantityArray":
+        """
+        Express the values in another unit, without converting until they are read.
+
+        Args:
+            unit (str): The target unit
+
+        Returns:
+            QuantityArray: The relabelled array, sharing this array's buffer
+
+        Raises:
+            ValueError: If the unit is unknown or of a different dimension
+        """
+        _check_units(self._stored_unit, unit)
+        return QuantityArray._relabelled(self._view, self._stored_unit, unit)
+
+    def values_in(self, unit: str, out: FloatBuffer = None) -> FloatBuffer:
+        """
+        Read the magnitudes in a given unit.
+
+        Args:
+            unit (str): The unit to read the values in
+            out (FloatBuffer, optional): Float64 buffer to write results into
+                (default: None)
+
+        Returns:
+            FloatBuffer: out if given, otherwise a new ``array('d')`` (or ``ndarray``)
+
+        Raises:
+            ValueError: If the unit is unknown or of a different dimension, or out is
+                not a writable float64 buffer of matching length
+        """
+        _check_units(self._stored_unit, unit)
+        return scale_into(self._view, FACTORS[self._stored_unit, unit], out)
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Quantity, "QuantityArray"]:
+        if isinstance(index, slice):
+            return QuantityArray._relabelled(self._view[index], self._stored_unit, self._unit)
+        return Quantity._relabelled(float(self._view[index]), self._stored_unit, self._unit)
+
+    def __iter__(self) -> Iterator[Quantity]:
+        stored_unit, unit = self._stored_unit, self._unit
+        for magnitude in self._view:
+            yield Quantity._relabelled(float(magnitude), stored_unit, unit)
+
+    def __repr__(self) -> str:
+        return f"QuantityArray({self.values.tolist()!r}, {self._unit!r})"
@@ -0,0 +1,363 @@
+"""
+Streaming Conversion Module
+
+This module converts selected columns of CSV files and fields of line-delimited
+JSON (NDJSON) files without loading them into memory. Files are processed as a
+generator pipeline::
+
+    read batches of rows -> convert columns batch by batch -> write rows
+
+Each stage holds at most one batch of rows, so memory use is bounded by the batch
+size whatever the file size. Columns are converted with the ``*_batch`` variants of
+the distance and weight conversion functions, and throughput is reported through
+:class:`StreamStats`.
+"""
+
+import csv
+import json
+import time
+from array import array
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+)
+
+from .helper_functions.buffers import FloatBuffer
+from .unit_registry import BatchFunction, batch_function
+
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+
+class StreamStats(NamedTuple):
+    """Progress of a streaming conversion."""
+
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        """float: Rows converted per second of wall-clock time."""
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def _convert_column(
+    cells: List[Any], convert: BatchFunction, column: str, numbers: Sequence[int]
+) -> List[float]:
+    """
+    Convert one column of a batch of rows.
+
+    Args:
+        cells (List[Any]): The raw cell values (strings or numbers)
+        convert (BatchFunction): The batch conversion
+        column (str): The column name for error messaging
+        numbers (Sequence[int]): The 1-based row number of each cell
+
+    Returns:
+        List[float]: The converted values
+
+    Raises:
+        ValueError: If a cell is not a number or fails validation
+    """
+    try:
+        values = array("d", map(float, cells))
+        return convert(values).tolist()
+    except (TypeError, ValueError) as error:
+        failure, offset = error, 0
+    # Only the failing batch is converted again, cell by cell, to find the row at fault
+    for index, cell in enumerate(cells):
+        try:
+            convert(array("d", [float(cell)]))
+        except (TypeError, ValueError) as error:
+            failure, offset = error, index
+            break
+    raise ValueError(f"{failure} (column {column!r}, row {numbers[offset]})") from None
+
+
+def iter_csv_batches(
+    stream: TextIO, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[Tuple[List[str], List[List[str]]]]:
+    """
+    Read a CSV stream in batches of rows.
+
+    Args:
+        stream (TextIO): A text stream positioned at the header row
+        batch_size (int): Maximum rows per batch (default: 10000)
+
+    Yields:
+        Tuple[List[str], List[List[str]]]: The header and a batch of rows
+    """
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    batch: List[List[str]] = []
+    yielded = False
+    for row in reader:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield header, batch
+            batch = []
+            yielded = True
+    if batch or not yielded:
+        yield header, batch
+
+
+def convert_csv_batches(
+    batches: Iterable[Tuple[List[str], List[List[Any]]]],
+    columns: Dict[str, Callable],
+    rename: Optional[Dict[str, str]] = None,
+) -> Iterator[Tuple[List[str], List[List[Any]]]]:
+    """
+    Convert columns of CSV row batches. Empty rows, as read from blank lines, are
+    dropped.
+
+    Args:
+        batches (Iterable[Tuple[List[str], List[List[Any]]]]): Header and row batches
+        columns (Dict[str, Callable]): Conversion for each column name
+        rename (Dict[str, str], optional): New names for output columns (default: None)
+
+    Yields:
+        Tuple[List[str], List[List[Any]]]: The output header and the converted rows
+
+    Raises:
+        ValueError: If a column is missing, a row is too short to hold it, or a value
+            cannot be converted; rows are numbered from 1 after the header, blank rows
+            included
+    """
+    converters = {name: batch_function(conversion) for name, conversion in columns.items()}
+    first_row = 1
+    for header, batch in batches:
+        # Blank lines read as empty rows and are dropped
+        numbers = [first_row + offset for offset, row in enumerate(batch) if row]
+        rows = [row for row in batch if row]
+        first_row += len(batch)
+        indices = {}
+        for name in converters:
+            if name not in header:
+                raise ValueError(f"CSV has no column {name!r}")
+            indices[name] = header.index(name)
+        for name, convert in converters.items():
+            index = indices[name]
+            if min(map(len, rows), default=index + 1) <= index:
+                short = next(number for number, row in enumerate(rows) if len(row) <= index)
+                raise ValueError(
+                    f"Row {numbers[short]} has {len(rows[short])} fields, expected at least "
+                    f"{index + 1} (column {name!r})"
+                )
+            converted = _convert_column([row[index] for row in rows], convert, name, numbers)
+            for row, value in zip(rows, converted):
+                row[index] = value
+        yield [(rename or {}).get(name, name) for name in header], rows
+
+
+def write_csv_batches(
+    batches: Iterable[Tuple[List[str], List[List[Any]]]],
+    stream: TextIO,
+    progress: Optional[Callable[[StreamStats], None]] = None,
+) -> StreamStats:
+    """
+    Write CSV row batches to a stream.
+
+    Args:
+        batches (Iterable[Tuple[List[str], List[List[Any]]]]): Header and row batches
+        stream (TextIO): The text stream to write to
+        progress (Callable[[StreamStats], None], optional): Called after every batch
+            (default: None)
+
+    Returns:
+        StreamStats: The number of rows written and the elapsed time
+    """
+    writer = csv.writer(stream)
+    start = time.perf_counter()
+    rows = 0
+    wrote_header = False
+    for header, batch in batches:
+        if not wrote_header:
+            writer.writerow(header)
+            wrote_header = True
+        writer.writerows(batch)
+        rows += len(batch)
+        if progress is not None:
+            progress(StreamStats(rows, time.perf_counter() - start))
+    return StreamStats(rows, time.perf_counter() - start)
+
+
+def convert_csv(
+    source: str,
+    destination: str,
+    columns: Dict[str, Callable],
+    rename: Optional[Dict[str, str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    progress: Optional[Callable[[StreamStats], None]] = None,
+) -> StreamStats:
+    """
+    Convert columns of a CSV file into a new CSV file with bounded memory.
+
+    Args:
+        source (str): Path of the CSV file to read
+        destination (str): Path of the CSV file to write
+        columns (Dict[str, Callable]): Conversion for each column, e.g.
+            ``{"weight_lb": lb_to_kg}``
+        rename (Dict[str, str], optional): New names for output columns, e.g.
+            ``{"weight_lb": "weight_kg"}`` (default: None)
+        batch_size (int): Rows converted per batch (default: 10000)
+        buffer_size (int): Read and write buffer size in bytes (default: 1 MiB)
+        progress (Callable[[StreamStats], None], optional): Called after every batch
+            (default: None)
+
+    Returns:
+        StreamStats: The number of rows converted and the elapsed time
+
+    Raises:
+        ValueError: If a column is missing or a value cannot be converted
+    """
+    with open(source, newline="", buffering=buffer_size) as reader, open(
+        destination, "w", newline="", buffering=buffer_size
+    ) as writer:
+        batches = iter_csv_batches(reader, batch_size)
+        return write_csv_batches(convert_csv_batches(batches, columns, rename), writer, progress)
+
+
+def iter_ndjson_batches(
+    stream: TextIO, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Read a line-delimited JSON stream in batches of records.
+
+    Blank lines are skipped.
+
+    Args:
+        stream (TextIO): A text stream with one JSON object per line
+        batch_size (int): Maximum records per batch (default: 10000)
+
+    Yields:
+        List[Dict[str, Any]]: A batch of records
+    """
+    batch: List[Dict[str, Any]] = []
+    for line in stream:
+        if line.strip():
+            batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def convert_ndjson_batches(
+    batches: Iterable[List[Dict[str, Any]]],
+    fields: Dict[str, Callable],
+    rename: Optional[Dict[str, str]] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Convert fields of NDJSON record batches.
+
+    Args:
+        batches (Iterable[List[Dict[str, Any]]]): Record batches
+        fields (Dict[str, Callable]): Conversion for each field name
+        rename (Dict[str, str], optional): New names for output fields (default: None)
+
+    Yields:
+        List[Dict[str, Any]]: The converted records
+
+    Raises:
+        ValueError: If a field is missing or a value cannot be converted
+    """
+    converters = {name: batch_function(conversion) for name, conversion in fields.items()}
+    first_row = 1
+    for records in batches:
+        for name, convert in converters.items():
+            try:
+                cells = [record[name] for record in records]
+            except KeyError:
+                missing = next(
+                    offset for offset, record in enumerate(records) if name not in record
+                )
+                raise ValueError(
+                    f"Record has no field {name!r} (row {first_row + missing})"
+                ) from None
+            target = (rename or {}).get(name, name)
+            numbers = range(first_row, first_row + len(records))
+            for record, value in zip(records, _convert_column(cells, convert, name, numbers)):
+                if target != name:
+                    del record[name]
+                record[target] = value
+        first_row += len(records)
+        yield records
+
+
+def write_ndjson_batches(
+    batches: Iterable[List[Dict[str, Any]]],
+    stream: TextIO,
+    progress: Optional[Callable[[StreamStats], None]] = None,
+) -> StreamStats:
+    """
+    Write NDJSON record batches to a stream.
+
+    Args:
+        batches (Iterable[List[Dict[str, Any]]]): Record batches
+        stream (TextIO): The text stream to write to
+        progress (Callable[[StreamStats], None], optional): Called after every batch
+            (default: None)
+
+    Returns:
+        StreamStats: The number of records written and the elapsed time
+    """
+    start = time.perf_counter()
+    rows = 0
+    encode = json.JSONEncoder(separators=(",", ":")).encode
+    for records in batches:
+        stream.write("".join([encode(record) + "\n" for record in records]))
+        rows += len(records)
+        if progress is not None:
+            progress(StreamStats(rows, time.perf_counter() - start))
+    return StreamStats(rows, time.perf_counter() - start)
+
+
+def convert_ndjson(
+    source: str,
+    destination: str,
+    fields: Dict[str, Callable],
+    rename: Optional[Dict[str, str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    progress: Optional[Callable[[StreamStats], None]] = None,
+) -> StreamStats:
+    """
+    Convert fields of an NDJSON file into a new NDJSON file with bounded memory.
+
+    Args:
+        source (str): Path of the NDJSON file to read
+        destination (str): Path of the NDJSON file to write
+        fields (Dict[str, Callable]): Conversion for each field, e.g.
+            ``{"weight_lb": lb_to_kg}``
+        rename (Dict[str, str], optional): New names for output fields (default: None)
+        batch_size (int): Records converted per batch (default: 10000)
+        buffer_size (int): Read and write buffer size in bytes (default: 1 MiB)
+        progress (Callable[[StreamStats], None], optional): Called after every batch
+            (default: None)
+
+    Returns:
+        StreamStats: The number of records converted and the elapsed time
+
+    Raises:
+        ValueError: If a field is missing or a value cannot be converted
+    """
+    with open(source, buffering=buffer_size) as reader, open(
+        destination, "w", buffering=buffer_size
+    ) as writer:
+        batches = iter_ndjson_batches(reader, batch_size)
+        return write_ndjson_batches(
+            convert_ndjson_batches(batches, fields, rename), writer, progress
+        )
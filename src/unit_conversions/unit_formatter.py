@@ -0,0 +1,310 @@
+"""
+Unit Formatter Module
+
+This module renders batches of distance or weight values as human-readable
+compound measurements such as ``"5 ft 3 in"`` or ``"2 lb 4.5 oz"``.
+
+A style is a sequence of units of one dimension in decreasing size, each a whole
+multiple of the next (``("ft", "in")``, ``("lb", "oz")``, ``("km", "m")``, ...).
+Values are converted to the smallest unit and rounded once, to a number of
+decimals with one of the rounding modes of :mod:`.fixed_point`, so a rounded
+``"5 ft 12 in"`` cannot occur. The split into fields is integer arithmetic on
+whole columns, in preallocated buffers reused from chunk to chunk (vectorized when
+NumPy is installed). Each line is then produced by a single ``str.format`` call
+with a template precomputed for its combination of zero fields, so no string is
+built per field. Lines are appended to a list or written to a file chunk by chunk.
+"""
+
+import math
+import operator
+from array import array
+from itertools import repeat
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+
+from .fixed_point import _check_rounding
+from .helper_functions.buffers import CHUNK_SIZE, FloatBuffer, as_float_view, is_ndarray, np
+from .unit_registry import FACTORS, RATIONAL_FACTORS, _lookup_error, _validate
+
+# Named compound styles
+STYLES: Dict[str, Tuple[str, ...]] = {
+    "mi_ft": ("mi", "ft"),
+    "ft_in": ("ft", "in"),
+    "mi_ft_in": ("mi", "ft", "in"),
+    "km_m": ("km", "m"),
+    "m_cm": ("m", "cm"),
+    "km_m_cm": ("km", "m", "cm"),
+    "lb_oz": ("lb", "oz"),
+    "kg_g": ("kg", "g"),
+    "g_mg": ("g", "mg"),
+}
+
+# Rounding of non-negative floats to integers, by rounding mode name
+_ROUND: Dict[str, Callable[[float], int]] = {
+    "half_even": round,
+    "half_up": lambda value: math.floor(value + 0.5),
+    "floor": math.floor,
+    "ceiling": math.ceil,
+    "down": math.trunc,
+}
+
+# Largest scaled value rounded in int64 by the NumPy path
+_INT64_LIMIT = float(1 << 62)
+
+
+class _Plan:
+    """Precomputed factor, field moduli and line templates of one format call."""
+
+    __slots__ = ("factor", "scale", "moduli", "templates")
+
+    def __init__(self, unit: str, units: Sequence[str], decimals: int, keep_zeros: bool):
+        if not units:
+            raise ValueError("A style needs at least one unit")
+        for larger, smaller in zip(units, units[1:]):
+            if (larger, smaller) not in FACTORS:
+                raise ValueError(_lookup_error(larger, smaller))
+            ratio = RATIONAL_FACTORS[larger, smaller]
+            if ratio <= 1 or ratio.denominator != 1:
+                raise ValueError(
+                    f"Each unit of a style must be a whole multiple of the next, "
+                    f"but 1 {larger} is {ratio} {smaller}"
+                )
+        if (unit, units[-1]) not in FACTORS:
+            raise ValueError(_lookup_error(unit, units[-1]))
+        if decimals < 0:
+            raise ValueError("decimals cannot be negative")
+        self.factor = FACTORS[unit, units[-1]]
+        self.scale = 10**decimals
+        # Size of each field but the last, in scaled units of the last field
+        self.moduli = []
+        for position in range(len(units) - 1):
+            size = self.scale
+            for larger, smaller in zip(units[position:], units[position + 1 :]):
+                size *= int(RATIONAL_FACTORS[larger, smaller])
+            self.moduli.append(size)
+        self.templates = self._templates(units, decimals, keep_zeros)
+
+    @staticmethod
+    def _templates(units: Sequence[str], decimals: int, keep_zeros: bool) -> List[str]:
+        """
+        Build one template per combination of non-zero fields and fractional last field.
+
+        Templates are indexed by a key whose bit i is set if field i is non-zero and
+        whose top bit is set if the last field has a fractional part. They format the
+        arguments (field 0, ..., field n-2, last field whole part, last field value).
+
+        Args:
+            units (Sequence[str]): The units of the fields
+            decimals (int): Decimals shown when the last field is fractional
+            keep_zeros (bool): Show zero fields
+
+        Returns:
+            List[str]: The templates
+        """
+        last = len(units) - 1
+        templates = []
+        for key in range(1 << (last + 2)):
+            fractional = key >> (last + 1)
+            parts = []
+            for position, unit in enumerate(units):
+                if not (keep_zeros or key >> position & 1):
+                    continue
+                if position < last:
+                    parts.append(f"{{{position}}} {unit}")
+                elif fractional:
+                    parts.append(f"{{{last + 1}:.{decimals}f}} {unit}")
+                else:
+                    parts.append(f"{{{last}}} {unit}")
+            templates.append(" ".join(parts) or f"0 {units[-1]}")
+        return templates
+
+
+def _scaled_python(chunk: FloatBuffer, plan: _Plan, rounding: str) -> List[int]:
+    """Round one chunk to integers in scaled units of the last field."""
+    round_value = _ROUND[rounding]
+    return list(map(round_value, map((plan.factor * plan.scale).__mul__, chunk)))
+
+
+def _lines_python(scaled: List[int], plan: _Plan) -> List[str]:
+    """Split scaled integers into fields column by column and format the lines."""
+    columns = []
+    rest = scaled
+    key = [0] * len(scaled)
+    for position, modulus in enumerate(plan.moduli):
+        column = list(map(operator.floordiv, rest, repeat(modulus)))
+        rest = list(map(operator.mod, rest, repeat(modulus)))
+        columns.append(column)
+        key = list(
+            map(operator.or_, key, map(operator.lshift, map(bool, column), repeat(position)))
+        )
+    last = len(plan.moduli)
+    whole = list(map(operator.floordiv, rest, repeat(plan.scale)))
+    fraction = list(map(operator.mod, rest, repeat(plan.scale)))
+    key = list(map(operator.or_, key, map(operator.lshift, map(bool, rest), repeat(last))))
+    key = list(map(operator.or_, key, map(operator.lshift, map(bool, fraction), repeat(last + 1))))
+    values = map(operator.truediv, rest, repeat(plan.scale))
+    templates = [template.format for template in plan.templates]
+    return [templates[index](*fields) for index, fields in zip(key, zip(*columns, whole, values))]
+
+
+class _Scratch:
+    """NumPy work buffers of one chunk, allocated once and reused for every chunk."""
+
+    __slots__ = ("scaled", "rest", "column", "key", "flags")
+
+    def __init__(self, size: int):
+        self.scaled = np.empty(size, dtype=np.float64)
+        self.rest = np.empty(size, dtype=np.int64)
+        self.column = np.empty(size, dtype=np.int64)
+        self.key = np.empty(size, dtype=np.int64)
+        self.flags = np.empty(size, dtype=np.int64)
+
+
+_NUMPY_ROUND = {
+    "half_even": lambda values: np.rint(values, out=values),
+    "half_up": lambda values: np.floor(np.add(values, 0.5, out=values), out=values),
+    "floor": lambda values: np.floor(values, out=values),
+    "ceiling": lambda values: np.ceil(values, out=values),
+    "down": lambda values: np.trunc(values, out=values),
+}
+
+
+def _lines_numpy(chunk: Any, plan: _Plan, rounding: str, scratch: _Scratch) -> List[str]:
+    """Round, split and format one chunk with NumPy, in the scratch buffers."""
+    size = len(chunk)
+    scaled, rest, column = scratch.scaled[:size], scratch.rest[:size], scratch.column[:size]
+    key, flags = scratch.key[:size], scratch.flags[:size]
+    np.multiply(chunk, plan.factor * plan.scale, out=scaled)
+    _NUMPY_ROUND[rounding](scaled)
+    rest[:] = scaled
+    key[:] = 0
+    columns = []
+    for position, modulus in enumerate(plan.moduli):
+        np.floor_divide(rest, modulus, out=column)
+        np.remainder(rest, modulus, out=rest)
+        np.left_shift(column != 0, position, out=flags)
+        np.bitwise_or(key, flags, out=key)
+        columns.append(column.tolist())
+    last = len(plan.moduli)
+    np.left_shift(rest != 0, last, out=flags)
+    np.bitwise_or(key, flags, out=key)
+    np.left_shift(rest % plan.scale != 0, last + 1, out=flags)
+    np.bitwise_or(key, flags, out=key)
+    whole = (rest // plan.scale).tolist()
+    values = (rest / plan.scale).tolist()
+    templates = [template.format for template in plan.templates]
+    return [
+        templates[index](*fields)
+        for index, fields in zip(key.tolist(), zip(*columns, whole, values))
+    ]
+
+
+def format_batch(
+    values: FloatBuffer,
+    unit: str,
+    style: Union[str, Sequence[str]] = "ft_in",
+    decimals: int = 0,
+    rounding: str = "half_even",
+    keep_zeros: bool = False,
+    out: Any = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Any:
+    """
+    Format a batch of values as compound measurements.
+
+    Zero fields are left out (``"5 ft"`` rather than ``"5 ft 0 in"``) unless keep_zeros
+    is set, and an all-zero value is shown as zero of the smallest unit. The last field
+    shows decimals only when it is not a whole number after rounding.
+
+    Args:
+        values (FloatBuffer): The values, as any float64 buffer, NumPy array or sequence
+        unit (str): The unit of the values
+        style (Union[str, Sequence[str]]): A name from STYLES or a sequence of units in
+            decreasing size (default: ``"ft_in"``)
+        decimals (int): Decimals of the last field (default: 0)
+        rounding (str): One of the fixed_point rounding modes (default: ``"half_even"``)
+        keep_zeros (bool): Show zero fields (default: False)
+        out (Any, optional): A list to append the lines to, or a writable text file to
+            write them to, one per line (default: None, a new list)
+        chunk_size (int): Number of values formatted per step (default: CHUNK_SIZE)
+
+    Returns:
+        Any: out, or a new list of lines
+
+    Raises:
+        ValueError: If the style is unknown or invalid, the unit cannot be converted to
+            the style's units, the rounding mode is unknown, or a value is negative or
+            not finite
+
+    Example:
+        >>> format_batch([63.0, 60.0, 0.2], "in")
+        ['5 ft 3 in', '5 ft', '0 in']
+        >>> format_batch([2.28125, 1.0], "lb", "lb_oz", decimals=1)
+        ['2 lb 4.5 oz', '1 lb']
+    """
+    units = STYLES.get(style) if isinstance(style, str) else tuple(style)
+    if units is None:
+        raise ValueError(f"Unknown style {style!r}, expected one of {tuple(STYLES)}")
+    _check_rounding(rounding)
+    plan = _Plan(unit, units, decimals, keep_zeros)
+    view = as_float_view(values)
+    lines = [] if out is None else out
+    write = getattr(out, "write", None)
+    use_numpy = np is not None and len(view) >= 64
+    scratch = _Scratch(min(chunk_size, len(view))) if use_numpy else None
+    for start in range(0, len(view), chunk_size):
+        chunk = view[start : start + chunk_size]
+        if use_numpy:
+            chunk = chunk if is_ndarray(chunk) else np.frombuffer(chunk, dtype=np.float64)
+            low, high = float(chunk.min()), float(chunk.max())
+        else:
+            low, high = min(chunk), max(chunk)
+        if low < 0:
+            _validate(low, unit)
+        if not (math.isfinite(low) and math.isfinite(high)):
+            raise ValueError("Cannot format values that are not finite")
+        if use_numpy and high * plan.factor * plan.scale < _INT64_LIMIT:
+            chunk_lines = _lines_numpy(chunk, plan, rounding, scratch)
+        else:
+            chunk_lines = _lines_python(_scaled_python(chunk, plan, rounding), plan)
+        if write is not None:
+            write("\n".join(chunk_lines))
+            write("\n")
+        else:
+            lines.extend(chunk_lines)
+    return lines
+
+
+def format_value(
+    value: float,
+    unit: str,
+    style: Union[str, Sequence[str]] = "ft_in",
+    decimals: int = 0,
+    rounding: str = "half_even",
+    keep_zeros: bool = False,
+) -> str:
+    """
+    Format a single value as a compound measurement.
+
+    Args:
+        value (float): The value
+        unit (str): The unit of the value
+        style (Union[str, Sequence[str]]): A name from STYLES or a sequence of units in
+            decreasing size (default: ``"ft_in"``)
+        decimals (int): Decimals of the last field (default: 0)
+        rounding (str): One of the fixed_point rounding modes (default: ``"half_even"``)
+        keep_zeros (bool): Show zero fields (default: False)
+
+    Returns:
+        str: The formatted measurement
+
+    Raises:
+        ValueError: If the style is invalid, the rounding mode is unknown, or the value
+            is negative or not finite
+
+    Example:
+        >>> format_value(1.75, "m", "m_cm", keep_zeros=True)
+        '1 m 75 cm'
+    """
+    return format_batch(
+        array("d", [value]), unit, style, decimals, rounding, keep_zeros, chunk_size=1
+    )[0]
@@ -0,0 +1,208 @@
+"""
+Unit Parser Module
+
+This module parses free-text measurements such as ``"5.2 km"``, ``"12 lb 3 oz"`` or
+``5'3"`` into values in a chosen unit, for feeding the conversion functions.
+
+Every unit of the registry is recognised by its symbol and common names (``"kms"``,
+``"metres"``, ``"lbs"``, ``"feet"``, ...), case-insensitively. The aliases are
+compiled once into a character trie, which is rendered as a single regular
+expression so that each measurement is matched by the C regex engine rather than
+character by character in Python. A compound measurement lists units of one
+dimension in decreasing size (``"1 mi 300 ft"``), optionally separated by commas.
+
+Batches are parsed in one pass. Rows that cannot be parsed do not raise: their
+value is NaN and the reason is reported per row.
+"""
+
+import math
+import re
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from .helper_functions.buffers import FloatBuffer, as_output_view
+from .helper_functions.patterns import trie_pattern
+from .quantity import Quantity
+from .unit_registry import FACTORS, UNIT_DIMENSIONS, _lookup_error, _validate
+
+# Symbols and names recognised for each registered unit, lower case
+UNIT_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "m": ("m", "meter", "meters", "metre", "metres"),
+    "km": ("km", "kms", "kilometer", "kilometers", "kilometre", "kilometres"),
+    "cm": ("cm", "centimeter", "centimeters", "centimetre", "centimetres"),
+    "mi": ("mi", "mile", "miles"),
+    "ft": ("ft", "foot", "feet", "'", "′"),
+    "in": ("in", "inch", "inches", '"', "″"),
+    "kg": ("kg", "kgs", "kilo", "kilos", "kilogram", "kilograms", "kilogramme", "kilogrammes"),
+    "g": ("g", "gram", "grams", "gramme", "grammes"),
+    "mg": ("mg", "milligram", "milligrams"),
+    "lb": ("lb", "lbs", "pound", "pounds"),
+    "oz": ("oz", "ounce", "ounces"),
+}
+
+# Alias to unit symbol
+ALIASES: Dict[str, str] = {
+    alias: unit for unit, aliases in UNIT_ALIASES.items() for alias in aliases
+}
+
+_NUMBER = r"(?:\d+(?:\.\d*)?|\.\d+)(?:e[+-]?\d+)?"
+
+_UNIT = trie_pattern(ALIASES)
+# The first component may carry a sign; later ones may be preceded by a comma
+_FIRST = re.compile(rf"\s*([+-]?{_NUMBER})\s*({_UNIT})(?![a-z])", re.IGNORECASE)
+_NEXT = re.compile(rf"\s*,?\s*({_NUMBER})\s*({_UNIT})(?![a-z])", re.IGNORECASE)
+
+
+class ParseResult(NamedTuple):
+    """Parsed values in the target unit together with the reason each bad row failed."""
+
+    values: FloatBuffer
+    errors: Dict[int, str]
+
+
+def _components(text: str) -> List[Tuple[float, str]]:
+    """
+    Split a measurement into (magnitude, unit) components.
+
+    Args:
+        text (str): The measurement, e.g. ``"5 ft 3 in"``
+
+    Returns:
+        List[Tuple[float, str]]: The components, in order
+
+    Raises:
+        ValueError: If the text is not a measurement, a component is negative, or the
+            units of a compound measurement are not of one dimension in decreasing size
+    """
+    if not isinstance(text, str):
+        raise ValueError(f"Expected a string, got {type(text).__name__}")
+    match = _FIRST.match(text)
+    if match is None:
+        raise ValueError(f"Cannot parse {text!r}: expected a number followed by a unit")
+    components = []
+    while match is not None:
+        magnitude, unit = float(match.group(1)), ALIASES[match.group(2).lower()]
+        if components:
+            previous = components[-1][1]
+            if (unit, previous) not in FACTORS:
+                raise ValueError(_lookup_error(unit, previous))
+            if FACTORS[unit, previous] >= 1:
+                raise ValueError(
+                    f"Cannot parse {text!r}: units must decrease in size, "
+                    f"but {unit!r} follows {previous!r}"
+                )
+        elif magnitude < 0:
+            _validate(magnitude, unit)
+        components.append((magnitude, unit))
+        position = match.end()
+        match = _NEXT.match(text, position)
+    if text[position:].strip():
+        raise ValueError(f"Cannot parse {text!r}: unexpected {text[position:].strip()!r}")
+    return components
+
+
+def parse_value(text: str, to_unit: str) -> float:
+    """
+    Parse a measurement into a value in a given unit.
+
+    Args:
+        text (str): The measurement, e.g. ``"5.2 km"`` or ``"12 lb 3 oz"``
+        to_unit (str): The unit of the result
+
+    Returns:
+        float: The measured value in to_unit
+
+    Raises:
+        ValueError: If the text cannot be parsed, a value is negative, or a unit
+            cannot be converted to to_unit
+
+    Example:
+        >>> parse_value("5.2 km", "m")
+        5200.0
+        >>> parse_value("12 lb 3 oz", "oz")
+        195.0
+    """
+    total = 0.0
+    for magnitude, unit in _components(text):
+        try:
+            total += magnitude * FACTORS[unit, to_unit]
+        except KeyError:
+            raise ValueError(_lookup_error(unit, to_unit)) from None
+    return total
+
+
+def parse_quantity(text: str) -> Quantity:
+    """
+    Parse a measurement into a quantity in its smallest unit.
+
+    Args:
+        text (str): The measurement, e.g. ``"5 ft 3 in"``
+
+    Returns:
+        Quantity: The measured quantity
+
+    Raises:
+        ValueError: If the text cannot be parsed or a value is negative
+
+    Example:
+        >>> parse_quantity("5 ft 3 in")
+        Quantity(63.0, 'in')
+        >>> parse_quantity("2 Kilometres")
+        Quantity(2.0, 'km')
+    """
+    components = _components(text)
+    unit = components[-1][1]
+    return Quantity(sum(magnitude * FACTORS[part, unit] for magnitude, part in components), unit)
+
+
+def parse_batch(texts: Iterable[str], to_unit: str, out: FloatBuffer = None) -> ParseResult:
+    """
+    Parse a batch of measurements into values in a given unit, without raising on bad rows.
+
+    Args:
+        texts (Iterable[str]): The measurements; must support ``len`` if out is given
+        to_unit (str): The unit of the results
+        out (FloatBuffer, optional): Float64 buffer to write results into
+            (default: None)
+
+    Returns:
+        ParseResult: The values (out if given, otherwise a new ``array('d')``) with NaN
+        for rows that failed, and the error message of each failed row by row index
+
+    Raises:
+        ValueError: If to_unit is unknown, or out is not a writable float64 buffer of
+            matching length
+
+    Example:
+        >>> result = parse_batch(["5 ft 3 in", "2 m", "3 kg"], "in")
+        >>> [round(value, 6) for value in result.values]
+        [63.0, 78.740157, nan]
+        >>> result.errors
+        {2: 'Cannot convert weight in kilograms to distance in inches'}
+    """
+    if to_unit not in UNIT_DIMENSIONS:
+        raise ValueError(_lookup_error(to_unit, to_unit))
+    factors = {
+        unit: FACTORS[unit, to_unit] for unit in UNIT_DIMENSIONS if (unit, to_unit) in FACTORS
+    }
+    nan = math.nan
+    values = array("d")
+    errors: Dict[int, str] = {}
+    for index, text in enumerate(texts):
+        try:
+            components = _components(text)
+            total = 0.0
+            for magnitude, unit in components:
+                total += magnitude * factors[unit]
+        except KeyError:
+            errors[index] = _lookup_error(unit, to_unit)
+            total = nan
+        except ValueError as error:
+            errors[index] = str(error)
+            total = nan
+        values.append(total)
+    if out is None:
+        return ParseResult(values, errors)
+    target = as_output_view(out, len(values))
+    target[:] = memoryview(values)
+    return ParseResult(out, errors)
@@ -0,0 +1,438 @@
+"""
+Unit Registry Module
+
+This module builds a registry of every unit known to the distance and weight
+conversion modules and precomputes the conversion factor between every pair of
+units in the same dimension, so that any-to-any conversions cost one dictionary
+lookup and one multiplication.
+
+The registry is derived from the ``<FROM>_TO_<TO>`` constants of
+``distance_conversions`` and ``weight_conversions``. Each pair of units is linked
+by a single authoritative factor: the imperial-to-metric factor for cross-system
+pairs, and the factor greater than one (1000, 12, 16, ...) for same-system pairs.
+Same-system links are taken first and cross-system links are added in declaration
+order only if they connect units that were not already reachable, so the factor
+matrix is free of conflicting cycles. Each authoritative factor is read as the
+exact decimal it is written as (``0.3048`` is 3048/10000), factors along a path are
+multiplied as exact fractions and rounded once to float. The exact fractions are
+kept in ``RATIONAL_FACTORS`` for integer arithmetic.
+"""
+
+import math
+import re
+from fractions import Fraction
+from functools import partial
+from types import ModuleType
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import distance_conversions, weight_conversions
+from .helper_functions.buffers import (
+    CHUNK_SIZE,
+    FloatBuffer,
+    as_float_view,
+    as_output_view,
+    first_negative_index,
+    new_float_buffer,
+    scale_into,
+)
+from .helper_functions.reductions import summarize
+
+# Dimensions and the modules whose constants and validators define them
+_DIMENSION_MODULES: Dict[str, Tuple[ModuleType, Callable[[float, str], None]]] = {
+    "distance": (distance_conversions, distance_conversions._validate_distance),
+    "weight": (weight_conversions, weight_conversions._validate_weight),
+}
+
+# Unit names used in error messages, matching the scalar conversion functions
+UNIT_NAMES: Dict[str, str] = {
+    "m": "meters",
+    "km": "kilometers",
+    "cm": "centimeters",
+    "mi": "miles",
+    "ft": "feet",
+    "in": "inches",
+    "kg": "kilograms",
+    "g": "grams",
+    "mg": "milligrams",
+    "lb": "pounds",
+    "oz": "ounces",
+}
+
+BatchFunction = Callable[[FloatBuffer], FloatBuffer]
+
+_IMPERIAL_UNITS = frozenset(("mi", "ft", "in", "lb", "oz"))
+
+_FACTOR_NAME = re.compile(r"^([A-Z]+)_TO_([A-Z]+)$")
+
+
+def _module_factors(module: ModuleType) -> List[Tuple[str, str, float]]:
+    """
+    Collect the ``<FROM>_TO_<TO>`` constants of a conversion module.
+
+    Args:
+        module (ModuleType): The conversion module
+
+    Returns:
+        List[Tuple[str, str, float]]: (from_unit, to_unit, factor) in declaration order
+    """
+    factors = []
+    for name, value in vars(module).items():
+        match = _FACTOR_NAME.match(name)
+        if match and isinstance(value, float):
+            factors.append((match.group(1).lower(), match.group(2).lower(), value))
+    return factors
+
+
+def _authoritative_links(factors: List[Tuple[str, str, float]]) -> List[Tuple[str, str, float]]:
+    """
+    Reduce a list of directed factors to one authoritative link per unit pair.
+
+    Args:
+        factors (List[Tuple[str, str, float]]): Directed factors in declaration order
+
+    Returns:
+        List[Tuple[str, str, float]]: Same-system links first, then cross-system links,
+        each in declaration order
+    """
+    links: Dict[frozenset, Tuple[str, str, float]] = {}
+    for from_unit, to_unit, factor in factors:
+        pair = frozenset((from_unit, to_unit))
+        cross_system = (from_unit in _IMPERIAL_UNITS) != (to_unit in _IMPERIAL_UNITS)
+        preferred = from_unit in _IMPERIAL_UNITS if cross_system else factor >= 1
+        if pair not in links or preferred:
+            links[pair] = (from_unit, to_unit, factor)
+
+    def is_cross_system(link: Tuple[str, str, float]) -> bool:
+        return (link[0] in _IMPERIAL_UNITS) != (link[1] in _IMPERIAL_UNITS)
+
+    ordered = list(links.values())
+    return [link for link in ordered if not is_cross_system(link)] + [
+        link for link in ordered if is_cross_system(link)
+    ]
+
+
+def _factor_closure(links: List[Tuple[str, str, float]]) -> Dict[Tuple[str, str], Fraction]:
+    """
+    Compute the exact factor between every pair of units connected by a set of links.
+
+    Args:
+        links (List[Tuple[str, str, float]]): Authoritative links in priority order
+
+    Returns:
+        Dict[Tuple[str, str], Fraction]: Factor for every reachable (from_unit, to_unit)
+        pair
+    """
+    parent: Dict[str, str] = {}
+
+    def root(unit: str) -> str:
+        while parent.setdefault(unit, unit) != unit:
+            unit = parent[unit]
+        return unit
+
+    tree: Dict[str, List[Tuple[str, Fraction]]] = {}
+    for from_unit, to_unit, factor in links:
+        tree.setdefault(from_unit, [])
+        tree.setdefault(to_unit, [])
+        from_root, to_root = root(from_unit), root(to_unit)
+        if from_root == to_root:
+            continue
+        parent[from_root] = to_root
+        exact = Fraction(repr(factor))
+        tree[from_unit].append((to_unit, exact))
+        tree[to_unit].append((from_unit, 1 / exact))
+
+    factors: Dict[Tuple[str, str], Fraction] = {}
+    for source in tree:
+        pending = [(source, Fraction(1))]
+        seen = {source}
+        while pending:
+            unit, factor = pending.pop()
+            factors[source, unit] = factor
+            for neighbour, step in tree[unit]:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    pending.append((neighbour, factor * step))
+    return factors
+
+
+def _build_registry() -> Tuple[Dict[Tuple[str, str], Fraction], Dict[str, str]]:
+    """
+    Build the exact factor matrix and unit-to-dimension table from the conversion modules.
+
+    Returns:
+        Tuple[Dict[Tuple[str, str], Fraction], Dict[str, str]]: The factor matrix and
+        the dimension of every unit
+    """
+    factors: Dict[Tuple[str, str], Fraction] = {}
+    dimensions: Dict[str, str] = {}
+    for dimension, (module, _) in _DIMENSION_MODULES.items():
+        closure = _factor_closure(_authoritative_links(_module_factors(module)))
+        factors.update(closure)
+        for unit, _ in closure:
+            dimensions[unit] = dimension
+    return factors, dimensions
+
+
+RATIONAL_FACTORS, UNIT_DIMENSIONS = _build_registry()
+FACTORS: Dict[Tuple[str, str], float] = {
+    pair: float(factor) for pair, factor in RATIONAL_FACTORS.items()
+}
+
+
+def units(dimension: Optional[str] = None) -> List[str]:
+    """
+    List the registered units.
+
+    Args:
+        dimension (str, optional): Only list units of this dimension (default: None, all)
+
+    Returns:
+        List[str]: Unit symbols
+
+    Example:
+        >>> units("weight")
+        ['kg', 'g', 'mg', 'lb', 'oz']
+    """
+    return [unit for unit, dim in UNIT_DIMENSIONS.items() if dimension in (None, dim)]
+
+
+def conversion_factor(from_unit: str, to_unit: str) -> float:
+    """
+    Look up the factor that converts values from one unit to another.
+
+    Args:
+        from_unit (str): The unit to convert from, e.g. ``"mi"``
+        to_unit (str): The unit to convert to, e.g. ``"in"``
+
+    Returns:
+        float: The multiplicative conversion factor
+
+    Raises:
+        ValueError: If either unit is unknown or the units have different dimensions
+
+    Example:
+        >>> conversion_factor("mi", "in")
+        63360.0
+    """
+    try:
+        return FACTORS[from_unit, to_unit]
+    except KeyError:
+        raise ValueError(_lookup_error(from_unit, to_unit)) from None
+
+
+def _lookup_error(from_unit: str, to_unit: str) -> str:
+    """
+    Describe why a unit pair is not in the factor matrix.
+
+    Args:
+        from_unit (str): The unit to convert from
+        to_unit (str): The unit to convert to
+
+    Returns:
+        str: The error message
+    """
+    for unit in (from_unit, to_unit):
+        if unit not in UNIT_DIMENSIONS:
+            return f"Unknown unit: {unit!r}"
+    return (
+        f"Cannot convert {UNIT_DIMENSIONS[from_unit]} in {UNIT_NAMES[from_unit]} "
+        f"to {UNIT_DIMENSIONS[to_unit]} in {UNIT_NAMES[to_unit]}"
+    )
+
+
+def _validate(value: float, from_unit: str) -> None:
+    """
+    Validate a value with the validator of its unit's dimension.
+
+    Args:
+        value (float): The value to validate
+        from_unit (str): The unit of the value
+
+    Raises:
+        ValueError: If the value is negative
+    """
+    _, validator = _DIMENSION_MODULES[UNIT_DIMENSIONS[from_unit]]
+    validator(value, UNIT_NAMES[from_unit])
+
+
+def convert(value: float, from_unit: str, to_unit: str) -> float:
+    """
+    Convert a value between any two units of the same dimension.
+
+    Args:
+        value (float): The value to convert
+        from_unit (str): The unit to convert from, e.g. ``"mi"``
+        to_unit (str): The unit to convert to, e.g. ``"in"``
+
+    Returns:
+        float: The converted value
+
+    Raises:
+        ValueError: If value is negative, either unit is unknown, or the units have
+            different dimensions
+
+    Example:
+        >>> convert(1, "mi", "in")
+        63360.0
+        >>> round(convert(convert(3, "kg", "lb"), "lb", "kg"), 12)
+        3.0
+    """
+    try:
+        factor = FACTORS[from_unit, to_unit]
+    except KeyError:
+        raise ValueError(_lookup_error(from_unit, to_unit)) from None
+    if value < 0:
+        _validate(value, from_unit)
+    return value * factor
+
+
+def convert_batch(
+    values: FloatBuffer,
+    from_unit: str,
+    to_unit: str,
+    out: FloatBuffer = None,
+    validated: bool = False,
+) -> FloatBuffer:
+    """
+    Convert a batch of values between any two units of the same dimension.
+
+    Args:
+        values (FloatBuffer): The values to convert, as any float64 buffer or NumPy array
+        from_unit (str): The unit to convert from
+        to_unit (str): The unit to convert to
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+
+    Returns:
+        FloatBuffer: The converted values; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+
+    Raises:
+        ValueError: If any value is negative (unless validated), either unit is unknown,
+            or the units have different dimensions
+
+    Example:
+        >>> from array import array
+        >>> convert_batch(array("d", [1.0, 2.0]), "ft", "in")
+        array('d', [12.0, 24.0])
+    """
+    factor = conversion_factor(from_unit, to_unit)
+    view = as_float_view(values)
+    index = None if validated else first_negative_index(view)
+    if index is not None:
+        _validate(float(view[index]), from_unit)
+    return scale_into(view, factor, out)
+
+
+def convert_sum(
+    values: Iterable[float], from_unit: str, to_unit: str, chunk_size: int = CHUNK_SIZE
+) -> float:
+    """
+    Sum a batch of values converted to another unit, without converting each value.
+
+    The values are validated and summed with compensated, chunked summation in their
+    own unit, and the total is multiplied by the conversion factor once.
+
+    Args:
+        values (Iterable[float]): Any float64 buffer, NumPy array or iterable of numbers
+        from_unit (str): The unit of the values
+        to_unit (str): The unit of the sum
+        chunk_size (int): Number of values per chunk (default: CHUNK_SIZE)
+
+    Returns:
+        float: The sum in to_unit
+
+    Raises:
+        ValueError: If any value is negative or not finite, either unit is unknown, or
+            the units have different dimensions
+
+    Example:
+        >>> convert_sum([1.0, 2.0, 3.0], "km", "m")
+        6000.0
+    """
+    factor = conversion_factor(from_unit, to_unit)
+    summary = summarize(values, chunk_size)
+    # A NaN makes the sum NaN and can hide negative values from the minimum
+    if summary.count and (
+        math.isnan(summary.sum) or math.isinf(summary.minimum) or math.isinf(summary.maximum)
+    ):
+        raise ValueError("Cannot sum values that are not finite")
+    if summary.minimum < 0:
+        _validate(summary.minimum, from_unit)
+    return summary.sum * factor
+
+
+def mark_batch(function: BatchFunction) -> BatchFunction:
+    """
+    Mark a function as converting whole buffers, so ``batch_function`` uses it as is.
+
+    Args:
+        function (BatchFunction): A function ``(values, out=None) -> FloatBuffer``
+
+    Returns:
+        BatchFunction: The same function
+    """
+    function.__batch__ = True
+    return function
+
+
+def _convert_each(
+    conversion: Callable[[float], float], values: FloatBuffer, out: FloatBuffer = None
+) -> FloatBuffer:
+    """
+    Convert a batch by calling a scalar conversion on each value.
+
+    Args:
+        conversion (Callable[[float], float]): The scalar conversion
+        values (FloatBuffer): The values, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+
+    Returns:
+        FloatBuffer: out if given, otherwise a new ``array('d')`` (or ``ndarray``)
+    """
+    view = as_float_view(values)
+    if out is None:
+        out = new_float_buffer(len(view), like=view)
+    target = as_output_view(out, len(view))
+    for index, value in enumerate(view.tolist()):
+        target[index] = conversion(value)
+    return out
+
+
+def batch_function(conversion: Callable) -> BatchFunction:
+    """
+    Resolve a conversion to a function that converts a whole buffer.
+
+    Scalar conversion functions such as ``weight_conversions.lb_to_kg`` are replaced
+    by their ``*_batch`` variant. The ``*_batch`` functions themselves and functions
+    marked with ``mark_batch`` (such as compiled ``ConversionPipeline`` batch
+    functions) are used as they are. Any other callable is taken to convert one value
+    and is called on each value in turn.
+
+    Args:
+        conversion (Callable): A scalar conversion function or a batch function
+
+    Returns:
+        BatchFunction: A function mapping a float64 buffer to converted values
+
+    Example:
+        >>> batch_function(weight_conversions.lb_to_oz).__name__
+        'lb_to_oz_batch'
+        >>> batch_function(lambda value: value * 2)([1.0, 2.5])
+        array('d', [2.0, 5.0])
+    """
+    name = getattr(conversion, "__name__", "")
+    original = getattr(conversion, "__wrapped__", conversion)
+    for module, _ in _DIMENSION_MODULES.values():
+        function = getattr(module, name, None)
+        if getattr(function, "__wrapped__", function) is original:
+            variant = getattr(module, f"{name}_batch", None)
+            if variant is not None:
+                return variant
+            if name.endswith("_batch"):
+                return conversion
+    if getattr(conversion, "__batch__", False):
+        return conversion
+    # A partial, unlike a closure, can be pickled for worker processes
+    return mark_batch(partial(_convert_each, conversion))
@@ -0,0 +1,122 @@
+"""
+Validation Policies Module
+
+This module converts batches of distance or weight values under a selectable error
+policy instead of raising on the first negative value. Validation is a single scan
+that collects the indices of every negative value; the conversion itself then runs
+on the pre-validated fast path of the ``*_batch`` functions.
+
+Policies:
+
+- ``"raise"``: raise ValueError if any value is negative (the default behaviour)
+- ``"mask"``: convert every value and report the offending indices
+- ``"nan"``: write NaN at the offending positions
+- ``"clip"``: treat offending values as zero
+- ``"skip"``: drop offending values from the result
+"""
+
+import inspect
+import operator
+from array import array
+from itertools import compress
+from typing import Any, Callable, Dict, NamedTuple
+
+from .helper_functions.buffers import (
+    FloatBuffer,
+    as_float_view,
+    as_output_view,
+    is_ndarray,
+    negative_indices,
+    np,
+)
+from .unit_registry import batch_function
+
+ERROR_POLICIES = ("raise", "mask", "nan", "clip", "skip")
+
+
+class ConversionResult(NamedTuple):
+    """Converted values together with the indices of the offending inputs."""
+
+    values: FloatBuffer
+    invalid: FloatBuffer
+
+
+def _validated_keyword(convert: Callable) -> Dict[str, Any]:
+    """
+    Build the keyword that skips a batch function's own validation, if it has one.
+
+    Args:
+        convert (Callable): The batch function
+
+    Returns:
+        Dict[str, Any]: ``{"validated": True}``, or nothing for functions without a
+        ``validated`` parameter
+    """
+    try:
+        parameters = inspect.signature(convert).parameters
+    except (TypeError, ValueError):
+        return {}
+    return {"validated": True} if "validated" in parameters else {}
+
+
+def convert_with_policy(
+    values: FloatBuffer,
+    conversion: Callable,
+    errors: str = "raise",
+    out: FloatBuffer = None,
+) -> ConversionResult:
+    """
+    Convert a batch of values, handling negative values according to a policy.
+
+    Args:
+        values (FloatBuffer): The values, as any float64 buffer or NumPy array
+        conversion (Callable): A distance or weight conversion such as ``kg_to_lb``
+            (its ``*_batch`` variant is used), a ``*_batch`` function, or any other
+            conversion accepted by ``unit_registry.batch_function``; the validation of
+            functions without a ``validated`` parameter still runs on every value
+        errors (str): One of ``"raise"``, ``"mask"``, ``"nan"``, ``"clip"`` or
+            ``"skip"`` (default: ``"raise"``)
+        out (FloatBuffer, optional): Float64 buffer to write results into; not
+            supported with ``"skip"`` (default: None)
+
+    Returns:
+        ConversionResult: The converted values (out if given) and the indices of
+        the negative inputs, as an ``array('q')`` (or integer ``ndarray`` for NumPy
+        input)
+
+    Raises:
+        ValueError: If errors is not a known policy, out is given with ``"skip"``,
+            or errors is ``"raise"`` and a value is negative
+
+    Example:
+        >>> from src.unit_conversions.distance_conversions import km_to_m
+        >>> convert_with_policy([1.0, -2.0, 3.0], km_to_m, errors="clip")
+        ConversionResult(values=array('d', [1000.0, 0.0, 3000.0]), invalid=array('q', [1]))
+        >>> convert_with_policy([1.0, -2.0, 3.0], km_to_m, errors="skip").values
+        array('d', [1000.0, 3000.0])
+    """
+    if errors not in ERROR_POLICIES:
+        raise ValueError(f"Unknown error policy {errors!r}, expected one of {ERROR_POLICIES}")
+    if errors == "skip" and out is not None:
+        raise ValueError("An out buffer cannot be used with errors='skip'")
+    convert = batch_function(conversion)
+    view = as_float_view(values)
+    invalid = negative_indices(view)
+    if len(invalid) and errors == "raise":
+        convert(view[int(invalid[0]) : int(invalid[0]) + 1])
+    if errors == "skip" and len(invalid):
+        if is_ndarray(view):
+            view = np.delete(view, invalid)
+        else:
+            keep = map(operator.not_, map((0.0).__gt__, view))
+            view = memoryview(array("d", compress(view, keep)))
+    result = convert(view, out=out, **_validated_keyword(convert))
+    if errors in ("nan", "clip") and len(invalid):
+        fill = float("nan") if errors == "nan" else 0.0
+        if is_ndarray(result):
+            result[invalid] = fill
+        else:
+            target = as_output_view(result, len(view))
+            for index in invalid:
+                target[index] = fill
+    return ConversionResult(result, invalid)
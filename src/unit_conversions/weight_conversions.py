@@ -3,8 +3,16 @@ Weight Conversion Module
 
 This module provides functions for converting between common weight units.
 All conversions use helper functions from simple_arithmetic for calculations.
+Each conversion also has a ``*_batch`` variant that converts a whole buffer of
+values at once, optionally into a caller-supplied ``out`` buffer.
 """
 
+from .helper_functions.buffers import (
+    FloatBuffer,
+    as_float_view,
+    first_negative_index,
+    scale_into,
+)
 from .helper_functions.simple_arithmetic import multiply
 
 
@@ -15,10 +23,10 @@ G_TO_MG = 1000.0
 MG_TO_G = 0.001
 LB_TO_OZ = 16.0
 OZ_TO_LB = 1 / 16.0
-KG_TO_LB = 2.20462
 LB_TO_KG = 0.453592
-G_TO_OZ = 0.035274
+KG_TO_LB = 1 / LB_TO_KG
 OZ_TO_G = 28.3495
+G_TO_OZ = 1 / OZ_TO_G
 
 
 def _validate_weight(value: float, unit: str) -> None:
@@ -36,6 +44,33 @@ def _validate_weight(value: float, unit: str) -> None:
         raise ValueError(f"Weight in {unit} cannot be negative: {value}")
 
 
+def _convert_weight_batch(
+    values: FloatBuffer, factor: float, unit: str, out: FloatBuffer, validated: bool
+) -> FloatBuffer:
+    """
+    Validate a batch of weight values in one pass and scale it by a factor.
+    
+    Args:
+        values (FloatBuffer): The weight values to convert
+        factor (float): The conversion factor
+        unit (str): The unit name for error messaging
+        out (FloatBuffer): Buffer to write results into, or None to allocate one
+        validated (bool): If True, the values are known to be non-negative and are
+            not checked
+    
+    Returns:
+        FloatBuffer: The converted values
+    
+    Raises:
+        ValueError: If any value is negative, or out is not a matching float64 buffer
+    """
+    view = as_float_view(values)
+    index = None if validated else first_negative_index(view)
+    if index is not None:
+        _validate_weight(float(view[index]), unit)
+    return scale_into(view, factor, out)
+
+
 def kg_to_g(kilograms: float) -> float:
     """
     Convert kilograms to grams.
@@ -264,3 +299,273 @@ def oz_to_g(ounces: float) -> float:
     """
     _validate_weight(ounces, "ounces")
     return multiply(ounces, OZ_TO_G)
+
+
+def kg_to_g_batch(
+    kilograms: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of weights from kilograms to grams.
+    
+    Args:
+        kilograms (FloatBuffer): Weights in kilograms, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Weights in grams; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in kilograms is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> kg_to_g_batch(array("d", [1.0, 2.5]))
+        array('d', [1000.0, 2500.0])
+    """
+    return _convert_weight_batch(kilograms, KG_TO_G, "kilograms", out, validated)
+
+
+def g_to_kg_batch(
+    grams: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of weights from grams to kilograms.
+    
+    Args:
+        grams (FloatBuffer): Weights in grams, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Weights in kilograms; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in grams is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> g_to_kg_batch(array("d", [1000.0, 2500.0]))
+        array('d', [1.0, 2.5])
+    """
+    return _convert_weight_batch(grams, G_TO_KG, "grams", out, validated)
+
+
+def g_to_mg_batch(
+    grams: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of weights from grams to milligrams.
+    
+    Args:
+        grams (FloatBuffer): Weights in grams, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Weights in milligrams; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in grams is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> g_to_mg_batch(array("d", [1.0, 2.5]))
+        array('d', [1000.0, 2500.0])
+    """
+    return _convert_weight_batch(grams, G_TO_MG, "grams", out, validated)
+
+
+def mg_to_g_batch(
+    milligrams: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of weights from milligrams to grams.
+    
+    Args:
+        milligrams (FloatBuffer): Weights in milligrams, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Weights in grams; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in milligrams is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> mg_to_g_batch(array("d", [1000.0, 2500.0]))
+        array('d', [1.0, 2.5])
+    """
+    return _convert_weight_batch(milligrams, MG_TO_G, "milligrams", out, validated)
+
+
+def lb_to_oz_batch(
+    pounds: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of weights from pounds to ounces.
+    
+    Args:
+        pounds (FloatBuffer): Weights in pounds, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Weights in ounces; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in pounds is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> lb_to_oz_batch(array("d", [1.0, 2.5]))
+        array('d', [16.0, 40.0])
+    """
+    return _convert_weight_batch(pounds, LB_TO_OZ, "pounds", out, validated)
+
+
+def oz_to_lb_batch(
+    ounces: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of weights from ounces to pounds.
+    
+    Args:
+        ounces (FloatBuffer): Weights in ounces, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Weights in pounds; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in ounces is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> oz_to_lb_batch(array("d", [16.0, 32.0]))
+        array('d', [1.0, 2.0])
+    """
+    return _convert_weight_batch(ounces, OZ_TO_LB, "ounces", out, validated)
+
+
+def kg_to_lb_batch(
+    kilograms: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of weights from kilograms to pounds.
+    
+    Args:
+        kilograms (FloatBuffer): Weights in kilograms, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Weights in pounds; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in kilograms is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> [round(x, 2) for x in kg_to_lb_batch(array("d", [1.0, 10.0]))]
+        [2.2, 22.05]
+    """
+    return _convert_weight_batch(kilograms, KG_TO_LB, "kilograms", out, validated)
+
+
+def lb_to_kg_batch(
+    pounds: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of weights from pounds to kilograms.
+    
+    Args:
+        pounds (FloatBuffer): Weights in pounds, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Weights in kilograms; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in pounds is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> [round(x, 2) for x in lb_to_kg_batch(array("d", [1.0, 10.0]))]
+        [0.45, 4.54]
+    """
+    return _convert_weight_batch(pounds, LB_TO_KG, "pounds", out, validated)
+
+
+def g_to_oz_batch(
+    grams: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of weights from grams to ounces.
+    
+    Args:
+        grams (FloatBuffer): Weights in grams, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Weights in ounces; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in grams is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> [round(x, 2) for x in g_to_oz_batch(array("d", [100.0, 500.0]))]
+        [3.53, 17.64]
+    """
+    return _convert_weight_batch(grams, G_TO_OZ, "grams", out, validated)
+
+
+def oz_to_g_batch(
+    ounces: FloatBuffer, out: FloatBuffer = None, validated: bool = False
+) -> FloatBuffer:
+    """
+    Convert a batch of weights from ounces to grams.
+    
+    Args:
+        ounces (FloatBuffer): Weights in ounces, as any float64 buffer or NumPy array
+        out (FloatBuffer, optional): Float64 buffer to write results into (default: None)
+        validated (bool): Skip the negative-value check for data known to be clean
+            (default: False)
+    
+    Returns:
+        FloatBuffer: Weights in grams; out if given, otherwise a new ``array('d')``
+        (or ``ndarray`` for NumPy input)
+    
+    Raises:
+        ValueError: If any value in ounces is negative and validated is False
+    
+    Example:
+        >>> from array import array
+        >>> [round(x, 2) for x in oz_to_g_batch(array("d", [1.0, 5.0]))]
+        [28.35, 141.75]
+    """
+    return _convert_weight_batch(ounces, OZ_TO_G, "ounces", out, validated)
@@ -0,0 +1,273 @@
+"""
+Word Count Module
+
+This module counts words in texts too large to hold in memory, with the same
+result as ``simple_string.count_words`` (``len(text.split())``): a word is a maximal
+run of non-whitespace characters.
+
+Text is consumed chunk by chunk from files, memory maps, byte buffers or any
+iterable of ``str`` or ``bytes`` chunks. Byte chunks are decoded incrementally, so a
+character split across two chunks is decoded once. Each piece of text is reduced to
+a ``WordCount`` that also records whether it starts or ends inside a word, so the
+counts of consecutive pieces can be merged without double counting a word that
+spans a boundary. Large files are split into byte ranges counted by separate
+processes, each mapping the file on its own, and their counts are merged in order.
+"""
+
+import codecs
+import mmap
+import os
+from functools import reduce
+from multiprocessing import get_context
+from typing import Iterable, Iterator, List, NamedTuple, Tuple, Union
+
+# Number of bytes decoded per chunk
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Files smaller than this are counted in the calling process
+DEFAULT_MIN_PARALLEL_SIZE = 1 << 26
+
+# Encodings whose text can be decoded from any character boundary, and how to find one
+_SPLITTABLE_ENCODINGS = {"utf-8": True, "ascii": False, "iso8859-1": False}
+
+Chunk = Union[str, bytes, bytearray, memoryview]
+
+
+class WordCount(NamedTuple):
+    """The words in a piece of text, and whether it starts and ends inside a word."""
+
+    words: int
+    characters: int
+    starts_in_word: bool
+    ends_in_word: bool
+
+    def merge(self, other: "WordCount") -> "WordCount":
+        """
+        Combine this count with the count of the text that directly follows it.
+
+        Args:
+            other (WordCount): The count of the following text
+
+        Returns:
+            WordCount: The count of both pieces of text together
+
+        Example:
+            >>> count_text("hello wo").merge(count_text("rld again"))
+            WordCount(words=3, characters=17, starts_in_word=True, ends_in_word=True)
+        """
+        if not self.characters:
+            return other
+        if not other.characters:
+            return self
+        return WordCount(
+            self.words + other.words - (self.ends_in_word and other.starts_in_word),
+            self.characters + other.characters,
+            self.starts_in_word,
+            other.ends_in_word,
+        )
+
+
+EMPTY = WordCount(0, 0, False, False)
+
+
+def count_text(text: str) -> WordCount:
+    """
+    Count the words in one piece of text.
+
+    Args:
+        text (str): The text
+
+    Returns:
+        WordCount: The count, mergeable with the counts of neighbouring text
+
+    Example:
+        >>> count_text(" hello world")
+        WordCount(words=2, characters=12, starts_in_word=False, ends_in_word=True)
+    """
+    if not text:
+        return EMPTY
+    return WordCount(len(text.split()), len(text), not text[0].isspace(), not text[-1].isspace())
+
+
+def scan_chunks(
+    chunks: Iterable[Chunk], encoding: str = "utf-8", errors: str = "strict"
+) -> WordCount:
+    """
+    Count the words in consecutive chunks of text.
+
+    Args:
+        chunks (Iterable[Chunk]): ``str`` chunks, or bytes-like chunks of encoded text
+        encoding (str): Encoding of bytes-like chunks (default: ``"utf-8"``)
+        errors (str): Decoding error handler, as for ``bytes.decode``
+            (default: ``"strict"``)
+
+    Returns:
+        WordCount: The count of the whole text
+
+    Raises:
+        UnicodeDecodeError: If a bytes-like chunk cannot be decoded and errors is
+            ``"strict"``
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    total = EMPTY
+    for chunk in chunks:
+        text = chunk if isinstance(chunk, str) else decoder.decode(chunk)
+        total = total.merge(count_text(text))
+    return total.merge(count_text(decoder.decode(b"", True)))
+
+
+def count_words_chunks(
+    chunks: Iterable[Chunk], encoding: str = "utf-8", errors: str = "strict"
+) -> int:
+    """
+    Count the words in consecutive chunks of text.
+
+    Args:
+        chunks (Iterable[Chunk]): ``str`` chunks, or bytes-like chunks of encoded text
+        encoding (str): Encoding of bytes-like chunks (default: ``"utf-8"``)
+        errors (str): Decoding error handler (default: ``"strict"``)
+
+    Returns:
+        int: The number of words, as ``count_words`` of the joined chunks
+
+    Example:
+        >>> count_words_chunks(["hello wo", "rld", " ", "again"])
+        3
+        >>> count_words_chunks([b"caf\\xc3", b"\\xa9 au lait"])
+        3
+    """
+    return scan_chunks(chunks, encoding, errors).words
+
+
+def _buffer_chunks(buffer: Chunk, start: int, stop: int, chunk_size: int) -> Iterator[Chunk]:
+    """
+    Slice a range of a buffer into chunks.
+
+    Args:
+        buffer (Chunk): A bytes-like object or memory map
+        start (int): First byte of the range
+        stop (int): End of the range
+        chunk_size (int): Bytes per chunk
+
+    Yields:
+        Chunk: Consecutive slices of the range
+    """
+    for offset in range(start, stop, chunk_size):
+        yield buffer[offset : min(offset + chunk_size, stop)]
+
+
+def count_words_buffer(
+    buffer: Chunk,
+    encoding: str = "utf-8",
+    errors: str = "strict",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Count the words in encoded text held in a buffer or memory map, chunk by chunk.
+
+    Args:
+        buffer (Chunk): ``bytes``, ``bytearray``, ``memoryview`` or ``mmap.mmap``
+        encoding (str): Encoding of the text (default: ``"utf-8"``)
+        errors (str): Decoding error handler (default: ``"strict"``)
+        chunk_size (int): Bytes decoded per chunk (default: 1048576)
+
+    Returns:
+        int: The number of words
+
+    Example:
+        >>> count_words_buffer(b"one two  three", chunk_size=4)
+        3
+    """
+    return count_words_chunks(_buffer_chunks(buffer, 0, len(buffer), chunk_size), encoding, errors)
+
+
+def _count_range(task: Tuple[str, int, int, str, str, int]) -> WordCount:
+    """
+    Count the words in a byte range of a file (runs in a worker).
+
+    Args:
+        task (Tuple[str, int, int, str, str, int]): The path, the start and stop byte
+            offsets, the encoding, the error handler and the chunk size
+
+    Returns:
+        WordCount: The count of the range
+    """
+    path, start, stop, encoding, errors, chunk_size = task
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return scan_chunks(_buffer_chunks(mapped, start, stop, chunk_size), encoding, errors)
+
+
+def _split_points(mapped: mmap.mmap, parts: int, utf_8: bool) -> List[int]:
+    """
+    Choose byte offsets that split a file into parts at character boundaries.
+
+    Args:
+        mapped (mmap.mmap): The mapped file
+        parts (int): The number of parts
+        utf_8 (bool): Whether offsets must skip UTF-8 continuation bytes
+
+    Returns:
+        List[int]: Increasing offsets, starting with 0 and ending with the file size
+    """
+    size = len(mapped)
+    points = [0]
+    for part in range(1, parts):
+        offset = max(size * part // parts, points[-1])
+        while utf_8 and offset < size and 0x80 <= mapped[offset] < 0xC0:
+            offset += 1
+        points.append(offset)
+    points.append(size)
+    return points
+
+
+def count_words_file(
+    path: Union[str, os.PathLike],
+    encoding: str = "utf-8",
+    errors: str = "strict",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+    min_parallel_size: int = DEFAULT_MIN_PARALLEL_SIZE,
+) -> int:
+    """
+    Count the words in a text file in constant memory, optionally in parallel.
+
+    The file is memory-mapped and decoded chunk by chunk. With several workers, files
+    of at least min_parallel_size bytes are split into byte ranges counted by worker
+    processes; this requires an encoding in which a character boundary can be found
+    from any offset (UTF-8, ASCII or Latin-1), and other encodings are counted in the
+    calling process.
+
+    Args:
+        path (Union[str, os.PathLike]): Path of the file
+        encoding (str): Encoding of the file (default: ``"utf-8"``)
+        errors (str): Decoding error handler (default: ``"strict"``)
+        chunk_size (int): Bytes decoded per chunk (default: 1048576)
+        workers (int): Number of processes (default: 1, the calling process)
+        min_parallel_size (int): Smallest file counted in parallel (default: 64 MiB)
+
+    Returns:
+        int: The number of words, as ``count_words`` of the decoded file
+
+    Raises:
+        ValueError: If workers or chunk_size is less than 1
+        UnicodeDecodeError: If the file cannot be decoded and errors is ``"strict"``
+    """
+    if workers < 1 or chunk_size < 1:
+        raise ValueError("workers and chunk_size must be at least 1")
+    path = os.fspath(path)
+    size = os.path.getsize(path)
+    if not size:
+        return 0
+    utf_8 = _SPLITTABLE_ENCODINGS.get(codecs.lookup(encoding).name)
+    if workers == 1 or size < min_parallel_size or utf_8 is None:
+        return _count_range((path, 0, size, encoding, errors, chunk_size)).words
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        points = _split_points(mapped, workers * 4, utf_8)
+    tasks = [
+        (path, start, stop, encoding, errors, chunk_size)
+        for start, stop in zip(points, points[1:])
+        if start < stop
+    ]
+    with get_context().Pool(workers) as pool:
+        counts = pool.map(_count_range, tasks)
+    return reduce(WordCount.merge, counts, EMPTY).words